@@ -0,0 +1,115 @@
+import os
+import time
+import threading
+import pygame
+
+
+# Posted by pygame when the current music clip finishes or is stopped
+PLAYBACK_FINISHED = pygame.USEREVENT + 1
+
+
+class AudioPlayer:
+    """Plays in-memory mp3 and WAV clips through pygame.mixer.music.
+
+    Completion is signalled by the mixer's end event, which a dispatcher
+    thread turns into a threading.Event, so callers wake up as soon as a clip
+    ends instead of sleep-polling get_busy(). stop() also posts an end event;
+    one still queued when the next clip starts is dropped, or ignored while
+    that clip is playing, so it cannot cut the next clip short.
+    """
+
+    def __init__(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        self.finished = threading.Event()
+        self.finished.set()
+        self.lock = threading.Lock()
+        # Held while a clip starts or stops and while an end event is handled
+        self.state_lock = threading.Lock()
+        self.events_enabled = self._init_events()
+
+        if self.events_enabled:
+            threading.Thread(target=self._dispatch_events, daemon=True).start()
+
+    def _init_events(self):
+        """Enable the pygame event queue headlessly so end events can be received."""
+        try:
+            driver = os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            if not pygame.display.get_init():
+                # The dummy driver opens no window and may be initialized from any thread (the
+                # player is created lazily, e.g. by the GUI's warm-up thread); a real one may not
+                if driver != "dummy" and threading.current_thread() is not threading.main_thread():
+                    return False
+                pygame.display.init()
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed(PLAYBACK_FINISHED)
+            pygame.mixer.music.set_endevent(PLAYBACK_FINISHED)
+            return True
+        except pygame.error:
+            return False
+
+    def _dispatch_events(self):
+        """Wake waiting players whenever the mixer reports the end of a clip."""
+        while True:
+            event = pygame.event.wait(1000)
+            if event.type == PLAYBACK_FINISHED:
+                with self.state_lock:
+                    # A late event from a stopped clip while the next one is already playing
+                    if not pygame.mixer.music.get_busy():
+                        self.finished.set()
+
+    def play(self, audio, wait=True):
+        """Play a file-like mp3 or WAV clip, optionally blocking until it ends."""
+        with self.lock:
+            with self.state_lock:
+                if self.events_enabled:
+                    pygame.event.clear(PLAYBACK_FINISHED)
+                self.finished.clear()
+                pygame.mixer.music.load(audio, clip_format(audio))
+                pygame.mixer.music.play()
+            if wait:
+                self._wait_until_finished()
+                self.finished.set()
+                pygame.mixer.music.unload()
+
+    def _wait_until_finished(self):
+        if not self.events_enabled:
+            while pygame.mixer.music.get_busy():
+                time.sleep(0.02)
+            return
+
+        # The end event normally wakes us; get_busy() is only a safety net
+        # in case an event is ever dropped.
+        while not self.finished.wait(1.0):
+            if not pygame.mixer.music.get_busy():
+                break
+
+    def stop(self):
+        """Stop the current clip immediately."""
+        with self.state_lock:
+            pygame.mixer.music.stop()
+            self.finished.set()
+
+    def is_playing(self):
+        """Return True while a clip is playing."""
+        return not self.finished.is_set()
+
+
+def clip_format(audio):
+    """Tell WAV clips (from the offline TTS engines) from mp3 by their header."""
+    header = audio.read(4)
+    audio.seek(0)
+    return "wav" if header == b"RIFF" else "mp3"
+
+
+_player = None
+_player_lock = threading.Lock()
+
+
+def get_player():
+    """Return the process-wide player; pygame has only one music channel."""
+    global _player
+    with _player_lock:
+        if _player is None:
+            _player = AudioPlayer()
+        return _player
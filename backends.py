@@ -0,0 +1,251 @@
+"""Pluggable speech recognition (stt), language model (llm) and speech synthesis (tts) engines.
+
+Engines are registered by kind and name and created from configuration:
+
+    stt = create_backend("stt", STT_BACKEND, language="en-IN")
+    text = stt.transcribe(pcm, sample_rate)          # 16-bit mono PCM -> text, "" if nothing heard
+
+    llm = create_backend("llm", LLM_BACKEND)
+    model = llm.model(model_name, static_prefix)     # has generate_content(prompt, stream=False)
+
+    tts = create_backend("tts", TTS_BACKEND, language="en-IN", tld="co.in")
+    audio = tts.synthesize(text)                     # mp3 or WAV bytes; tts.voice tells voices apart
+
+Engine libraries are imported when an engine is first used, so only the
+configured ones need to be installed. "google", "gemini" and "gtts" are the
+network engines; "sphinx", "vosk", "llama_cpp" and "pyttsx3" run locally
+on the CPU; "fake" engines have configurable latency for tests and benchmarks.
+"""
+import os
+import tempfile
+import threading
+from config import (VOSK_MODEL_PATH, LOCAL_LLM_MODEL_PATH, LOCAL_LLM_THREADS, LOCAL_LLM_MAX_TOKENS,
+                    FAKE_STT_DELAY, FAKE_LLM_DELAY, FAKE_TTS_DELAY)
+
+BACKENDS = {"stt": {}, "llm": {}, "tts": {}}
+
+
+def register_backend(kind, name):
+    """Decorator registering an engine class (or factory function) under BACKENDS[kind][name]."""
+    def register(cls):
+        BACKENDS[kind][name] = cls
+        return cls
+    return register
+
+
+def available_backends(kind):
+    return sorted(BACKENDS[kind])
+
+
+def create_backend(kind, name, **options):
+    """Create the engine registered as `name` for `kind` with the given options."""
+    try:
+        cls = BACKENDS[kind][name]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} backend '{name}'; available: {', '.join(available_backends(kind))}")
+    return cls(**options)
+
+
+@register_backend("stt", "google")
+class GoogleRecognizer:
+    """Google Web Speech API through speech_recognition (network)."""
+
+    def __init__(self, language="en-IN"):
+        self.language = language
+
+    def transcribe(self, pcm, sample_rate):
+        import speech_recognition as sr
+        try:
+            return sr.Recognizer().recognize_google(sr.AudioData(pcm, sample_rate, 2), language=self.language)
+        except sr.UnknownValueError:
+            return ""
+
+
+@register_backend("stt", "sphinx")
+class SphinxRecognizer:
+    """CMU Sphinx through speech_recognition; offline, needs pocketsphinx."""
+
+    def __init__(self, language="en-IN"):
+        # Sphinx ships US English only
+        self.language = "en-US"
+
+    def transcribe(self, pcm, sample_rate):
+        import speech_recognition as sr
+        try:
+            return sr.Recognizer().recognize_sphinx(sr.AudioData(pcm, sample_rate, 2), language=self.language)
+        except sr.UnknownValueError:
+            return ""
+
+
+@register_backend("stt", "vosk")
+class VoskRecognizer:
+    """Offline Kaldi recognizer; needs the vosk package and a model at VOSK_MODEL_PATH."""
+
+    def __init__(self, language="en-IN", model_path=VOSK_MODEL_PATH):
+        self.language = language
+        self.model_path = model_path
+        self.model = None
+        self.lock = threading.Lock()
+
+    def transcribe(self, pcm, sample_rate):
+        import json
+        import vosk
+        with self.lock:
+            if self.model is None:
+                self.model = vosk.Model(self.model_path)
+        recognizer = vosk.KaldiRecognizer(self.model, sample_rate)
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+
+@register_backend("stt", "fake")
+def fake_recognizer(language=None, delay=FAKE_STT_DELAY, transcript="haan boliye"):
+    from fake_backends import FakeRecognizer
+    return FakeRecognizer(delay, transcript, language)
+
+
+@register_backend("llm", "gemini")
+class GeminiEngine:
+    """Gemini models bound to a static prefix, with server-side context caching (network)."""
+
+    def model(self, model_name, static_prefix):
+        from context_cache import gemini_prefix_model
+        return gemini_prefix_model(model_name, static_prefix)
+
+
+class LocalResponse:
+    """A reply from a local model, shaped like a Gemini response or stream chunk."""
+
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class LocalUsage:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.cached_content_token_count = 0
+
+
+class LocalPrefixModel:
+    """A static prefix bound to the shared llama.cpp model, with Gemini's generate_content().
+
+    llama.cpp keeps the evaluated prompt and reuses it when the next prompt
+    starts the same way, so the common prefix is only evaluated once.
+    """
+
+    def __init__(self, engine, static_prefix):
+        self.engine = engine
+        self.static_prefix = static_prefix
+
+    def generate_content(self, prompt, stream=False):
+        full_prompt = f"{self.static_prefix}\n\n{prompt}" if self.static_prefix else prompt
+        if stream:
+            return self._stream(full_prompt)
+        with self.engine.lock:
+            result = self.engine.llm.create_completion(full_prompt, max_tokens=self.engine.max_tokens)
+        usage = result.get("usage", {})
+        return LocalResponse(result["choices"][0]["text"],
+                             LocalUsage(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)))
+
+    def _stream(self, full_prompt):
+        # One model, one request at a time; the lock is held until the stream ends
+        with self.engine.lock:
+            for chunk in self.engine.llm.create_completion(full_prompt, max_tokens=self.engine.max_tokens,
+                                                           stream=True):
+                text = chunk["choices"][0]["text"]
+                if text:
+                    yield LocalResponse(text)
+
+
+@register_backend("llm", "llama_cpp")
+class LlamaCppEngine:
+    """A small local GGUF model run on the CPU with llama-cpp-python.
+
+    The model file is loaded once, on the first model() call, and shared
+    by every prefix and agent.
+    """
+
+    def __init__(self, model_path=LOCAL_LLM_MODEL_PATH, threads=LOCAL_LLM_THREADS,
+                 max_tokens=LOCAL_LLM_MAX_TOKENS, context_tokens=4096):
+        self.model_path = model_path
+        self.threads = threads
+        self.max_tokens = max_tokens
+        self.context_tokens = context_tokens
+        self.llm = None
+        self.lock = threading.Lock()
+
+    def model(self, model_name, static_prefix):
+        with self.lock:
+            if self.llm is None:
+                from llama_cpp import Llama
+                self.llm = Llama(model_path=self.model_path, n_ctx=self.context_tokens,
+                                 n_threads=self.threads, verbose=False)
+        return LocalPrefixModel(self, static_prefix)
+
+
+@register_backend("llm", "fake")
+class FakeEngine:
+    """FakeStreamingModel per prefix, with FAKE_LLM_DELAY to the first token."""
+
+    def __init__(self, first_token_delay=FAKE_LLM_DELAY, chunk_delay=0.05):
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+
+    def model(self, model_name, static_prefix):
+        from fake_backends import FakeStreamingModel
+        return FakeStreamingModel(first_token_delay=self.first_token_delay, chunk_delay=self.chunk_delay,
+                                  system_instruction=static_prefix)
+
+
+@register_backend("tts", "gtts")
+class GTTSEngine:
+    """Google Translate TTS through gTTS (network); returns mp3."""
+
+    def __init__(self, language="en-IN", tld="co.in"):
+        self.language = language
+        self.tld = tld
+        # gTTS voices differ by tld; keeps the cache keys of earlier versions
+        self.voice = tld
+
+    def synthesize(self, text):
+        import io
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.language, slow=False, tld=self.tld).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+@register_backend("tts", "pyttsx3")
+class Pyttsx3Engine:
+    """The system's offline voices (eSpeak, SAPI5, NSSpeechSynthesizer) through pyttsx3; returns WAV."""
+
+    voice = "pyttsx3"
+
+    def __init__(self, language="en-IN", tld=None):
+        self.language = language
+        self.engine = None
+        self.lock = threading.Lock()
+
+    def synthesize(self, text):
+        # pyttsx3 can only render to a file, and its engine is not thread-safe
+        with self.lock:
+            if self.engine is None:
+                import pyttsx3
+                self.engine = pyttsx3.init()
+            fd, path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            try:
+                self.engine.save_to_file(text, path)
+                self.engine.runAndWait()
+                with open(path, "rb") as f:
+                    return f.read()
+            finally:
+                os.remove(path)
+
+
+@register_backend("tts", "fake")
+def fake_speech_engine(language=None, tld=None, delay=FAKE_TTS_DELAY):
+    from fake_backends import FakeSpeechEngine
+    return FakeSpeechEngine(delay)
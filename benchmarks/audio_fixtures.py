@@ -0,0 +1,60 @@
+"""Synthetic recorded-call WAV fixtures for the capture and endpointing benchmarks.
+
+A fixture is a 16-bit mono WAV built from (kind, seconds) segments, where
+kind is "noise" (low-level background hiss) or "speech" (a louder, voiced
+tone with syllable-like amplitude modulation).
+"""
+import math
+import wave
+import array
+import random
+
+SAMPLE_RATE = 16000
+NOISE_LEVEL = 120
+SPEECH_LEVEL = 6000
+
+# A caller answering three agent prompts with natural pauses in between
+DEFAULT_SEGMENTS = [
+    ("noise", 1.2), ("speech", 1.5), ("noise", 2.0),
+    ("speech", 2.2), ("noise", 0.3), ("speech", 0.8), ("noise", 2.0),
+    ("speech", 1.0), ("noise", 2.0)
+]
+
+
+def synthesize_segments(segments, sample_rate=SAMPLE_RATE, seed=7):
+    """Return 16-bit PCM samples for a list of (kind, seconds) segments."""
+    rng = random.Random(seed)
+    samples = array.array("h")
+    for kind, seconds in segments:
+        for n in range(int(seconds * sample_rate)):
+            t = n / sample_rate
+            value = rng.gauss(0, NOISE_LEVEL)
+            if kind == "speech":
+                envelope = 0.6 + 0.4 * math.sin(2 * math.pi * 4 * t)
+                value += SPEECH_LEVEL * envelope * math.sin(2 * math.pi * 180 * t)
+            samples.append(max(-32768, min(32767, int(value))))
+    return samples
+
+
+def write_fixture(path, segments=DEFAULT_SEGMENTS, sample_rate=SAMPLE_RATE, pause_seconds=0.8):
+    """Write a fixture WAV and return the end time of every utterance.
+
+    Speech segments separated by less than pause_seconds of noise count as
+    one utterance, the way a listener would hear them.
+    """
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(synthesize_segments(segments, sample_rate).tobytes())
+
+    utterance_ends = []
+    elapsed = 0.0
+    for kind, seconds in segments:
+        if kind == "noise" and utterance_ends and seconds < pause_seconds \
+                and utterance_ends[-1] == elapsed:
+            utterance_ends.pop()
+        elapsed += seconds
+        if kind == "speech":
+            utterance_ends.append(elapsed)
+    return utterance_ends
@@ -0,0 +1,98 @@
+"""Latency and throughput of every registered STT, LLM and TTS engine.
+
+Each engine gets one warm-up request (model loading, connection setup),
+then --requests requests from --concurrency threads. For LLM engines the
+time to the first streamed chunk is reported as well. Engines whose
+library, model file or network is unavailable are listed with the reason.
+From the repo root:
+
+    python -m benchmarks.backends --requests 20 --concurrency 4
+    python -m benchmarks.backends --kinds llm --names fake,llama_cpp
+"""
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from backends import BACKENDS, create_backend
+from config import GEMINI_MODEL_NAME
+from metrics import latency_summary, format_latency_summary
+from benchmarks.audio_fixtures import synthesize_segments, SAMPLE_RATE
+
+SYSTEM_PROMPT = "You are Parul, a polite sales agent calling in Hinglish. Keep replies to two sentences."
+PROMPTS = ["Customer: haan boliye, kaun bol raha hai?",
+           "Customer: demo kitne time ka hoga?",
+           "Customer: abhi busy hoon, baad mein call karo"]
+SENTENCES = ["Namaskar! Main Parul Sharma bol rahi hoon TechSolutions se.",
+             "Kya aap kal subah 11 baje demo ke liye free hain?",
+             "Aapka invoice number 4521 abhi tak pending hai."]
+
+
+def stt_request(engine, pcm):
+    return lambda i: engine.transcribe(pcm, SAMPLE_RATE)
+
+
+def llm_request(model, first_chunk_latencies):
+    def request(i):
+        start = time.perf_counter()
+        for n, chunk in enumerate(model.generate_content(PROMPTS[i % len(PROMPTS)], stream=True)):
+            if n == 0:
+                first_chunk_latencies.append(time.perf_counter() - start)
+    return request
+
+
+def tts_request(engine):
+    return lambda i: engine.synthesize(SENTENCES[i % len(SENTENCES)])
+
+
+def measure(request, requests, concurrency):
+    """Run request(i) for i in range(requests) on a thread pool; return latencies and wall time."""
+    def timed(i):
+        start = time.perf_counter()
+        request(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+def benchmark(kind, name, args, pcm):
+    first_chunk = []
+    try:
+        if kind == "stt":
+            request = stt_request(create_backend("stt", name), pcm)
+        elif kind == "llm":
+            request = llm_request(create_backend("llm", name).model(GEMINI_MODEL_NAME, SYSTEM_PROMPT), first_chunk)
+        else:
+            request = tts_request(create_backend("tts", name))
+        request(0)
+    except Exception as e:
+        return f"unavailable: {type(e).__name__}: {str(e)[:80]}"
+
+    first_chunk.clear()
+    latencies, elapsed = measure(request, args.requests, args.concurrency)
+    line = f"{format_latency_summary(latency_summary(latencies))}, {args.requests / elapsed:.1f} req/s"
+    if first_chunk:
+        line += f", first chunk p50 {sorted(first_chunk)[len(first_chunk) // 2] * 1000:.0f} ms"
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kinds", default="stt,llm,tts")
+    parser.add_argument("--names", default=None, help="comma-separated engine names (default: all)")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    pcm = synthesize_segments([("noise", 0.3), ("speech", 1.5), ("noise", 0.3)]).tobytes()
+    names = args.names.split(",") if args.names else None
+    for kind in args.kinds.split(","):
+        print(f"{kind}:")
+        for name in sorted(BACKENDS[kind]):
+            if names is None or name in names:
+                print(f"  {name:<10} {benchmark(kind, name, args, pcm)}")
+
+
+if __name__ == "__main__":
+    main()
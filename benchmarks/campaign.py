@@ -0,0 +1,83 @@
+"""Run a payment-reminder campaign over a generated contact list with stub backends.
+
+Writes a data/payment_data.json-style file with N contacts to a temporary
+directory and dials through it with Campaign and CallEngine, using stub
+STT/LLM/TTS. A fraction of TTS requests fails to exercise retries. With
+--interrupt-after the first run stops early and a second run resumes from
+the checkpoint. From the repo root:
+
+    python -m benchmarks.campaign --contacts 200 --concurrency 20 --interrupt-after 80
+"""
+import os
+import json
+import asyncio
+import argparse
+import tempfile
+from call_engine import CallEngine, CallSession
+from campaign import Campaign
+from cold_call_agent import ColdCallAgent
+from fake_backends import FakeStreamingModel, StubAudioInput, StubAudioOutput, StubSTT, StubTTS
+from scenario_data import iter_contacts
+
+CALLER_UTTERANCES = ["haan boliye", "kaunsa invoice?", "agle hafte tak kar denge", "bye"]
+
+
+def write_contacts(data_dir, count):
+    data = {
+        "customer": [{"name": f"Customer {i}", "company": f"Company {i} Pvt Ltd",
+                      "phone": f"+91 90000 {i:05d}"} for i in range(count)],
+        "invoice": [{"amount": f"{(i % 50 + 1) * 10000:,}", "invoice_number": f"INV-2025-{i:04d}"}
+                    for i in range(count)]
+    }
+    with open(os.path.join(data_dir, "payment_data.json"), 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+async def run_campaign(args, data_dir, checkpoint_path, limit=None):
+    engine = CallEngine(StubSTT(args.stt_delay), StubTTS(args.tts_delay, args.failure_rate, seed=1),
+                        max_concurrent_llm=args.concurrency, save_logs=False)
+    model = FakeStreamingModel(first_token_delay=args.llm_delay, chunk_delay=0)
+    outcome_model = FakeStreamingModel(reply="{}", first_token_delay=0, chunk_delay=0)
+
+    def make_session(index, record):
+        agent = ColdCallAgent("payment", model=model, outcome_model=outcome_model, record=record)
+        return CallSession(index, agent, StubAudioInput(CALLER_UTTERANCES, args.speaking_time),
+                           StubAudioOutput(0))
+
+    campaign = Campaign(engine, make_session, concurrency=args.concurrency,
+                        max_retries=args.max_retries, retry_delay=0.05,
+                        calls_per_minute=args.calls_per_minute, checkpoint_path=checkpoint_path,
+                        log_callback=print)
+    try:
+        return await campaign.run(iter_contacts("payment", data_dir), limit=limit)
+    finally:
+        engine.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument("--calls-per-minute", type=float, default=None)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--interrupt-after", type=int, default=None,
+                        help="stop the first run after this many calls, then resume")
+    parser.add_argument("--llm-delay", type=float, default=0.2)
+    parser.add_argument("--stt-delay", type=float, default=0.05)
+    parser.add_argument("--tts-delay", type=float, default=0.05)
+    parser.add_argument("--speaking-time", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_contacts(data_dir, args.contacts)
+        checkpoint_path = os.path.join(data_dir, "campaign_checkpoint.jsonl")
+        if args.interrupt_after:
+            report = asyncio.run(run_campaign(args, data_dir, checkpoint_path, args.interrupt_after))
+            print(f"interrupted: {Campaign.format_report(report)}")
+        report = asyncio.run(run_campaign(args, data_dir, checkpoint_path))
+        print(f"completed:   {Campaign.format_report(report)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Per-turn capture overhead: fresh calibration per turn vs a persistent session.
+
+Plays a synthetic recorded call through WavFileSource in real time and
+reports, per turn, the calibration cost and the session's own timing
+(waiting for speech, speech captured, total capture time). From the repo root:
+
+    python -m benchmarks.capture_latency
+"""
+import os
+import argparse
+import tempfile
+from microphone_session import MicrophoneSession, WavFileSource
+from benchmarks.audio_fixtures import write_fixture, DEFAULT_SEGMENTS
+
+
+def per_turn_calibration(path, turns, calibration_seconds):
+    """Model the old path: every turn recalibrates before listening."""
+    timings = []
+    with WavFileSource(path, realtime=True) as source:
+        session = MicrophoneSession(source, calibration_seconds=calibration_seconds)
+        for _ in range(turns):
+            session.calibrate()
+            session.listen(timeout=5)
+            timings.append((session.calibration_time, session.last_timing))
+    return timings
+
+
+def persistent_session(path, turns, calibration_seconds):
+    """Calibrate once, then keep the stream open across turns."""
+    timings = []
+    with MicrophoneSession(WavFileSource(path, realtime=True),
+                           calibration_seconds=calibration_seconds) as session:
+        for turn in range(turns):
+            session.listen(timeout=5)
+            calibration = session.calibration_time if turn == 0 else 0.0
+            timings.append((calibration, session.last_timing))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calibration-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "call.wav")
+    # Leading calibration noise, then the caller's turns
+    turns = len(write_fixture(path, [("noise", args.calibration_seconds)] + DEFAULT_SEGMENTS))
+
+    for name, run in (("per-turn calibration", per_turn_calibration),
+                      ("persistent session", persistent_session)):
+        print(f"{name}:")
+        try:
+            for turn, (calibration, timing) in enumerate(run(path, turns, args.calibration_seconds), 1):
+                print(f"  turn {turn}: calibration {calibration * 1000:.0f} ms, "
+                      f"waited {timing['wait'] * 1000:.0f} ms, "
+                      f"speech {timing['speech'] * 1000:.0f} ms, "
+                      f"capture {timing['capture'] * 1000:.0f} ms")
+        except Exception as e:
+            print(f"  stopped early: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Input tokens and latency per turn with and without the cached static preamble.
+
+Runs several short calls, each with a different contact, against the local
+stub model: once sending the full prompt every turn, and with the static
+preamble bound to a shared model through ContextCache. The stub reports the
+bound preamble as cached from the second request. The "Gemini minimum" run
+applies CONTEXT_CACHE_MIN_TOKENS, the smallest prefix Gemini caches for the
+configured model; the preambles are far below it, so that row is what to
+expect from the real backend: no cached input tokens. Token counts come
+from ConversationLogger. From the repo root:
+
+    python -m benchmarks.context_caching --calls 5 --turns 6
+"""
+import time
+import argparse
+from cold_call_agent import ColdCallAgent
+from context_cache import ContextCache, CONTEXT_CACHE_MIN_TOKENS
+from fake_backends import FakeStreamingModel
+from metrics import latency_summary, format_latency_summary
+from prompt_builder import SCENARIO_TEMPLATES, estimate_tokens
+from scenario_data import SCENARIO_SECTIONS
+
+USER_LINES = ["haan boliye", "kaunsa invoice?", "amount thoda zyada lag raha hai",
+              "agle hafte tak kar denge", "UPI se kar sakte hain?", "theek hai"]
+
+
+def contact(call):
+    """A contact whose fields differ from every other call's."""
+    return {section: {"name": f"Contact {call}", "company": f"Company {call}", "amount": f"{call + 1},00,000",
+                      "invoice_number": f"INV-{call}", "position": f"Engineer {call}"}
+            for section in SCENARIO_SECTIONS}
+
+
+def run(scenario, calls, turns, per_input_token_delay, cached, min_cached_tokens=0):
+    def stub(model_name=None, static_prefix=None):
+        return FakeStreamingModel(first_token_delay=0.05, chunk_delay=0, system_instruction=static_prefix,
+                                  per_input_token_delay=per_input_token_delay, min_cached_tokens=min_cached_tokens)
+
+    context_cache = ContextCache(stub) if cached else None
+    latencies = []
+    totals = {"input": 0, "cached": 0, "output": 0}
+    for call in range(calls):
+        if cached:
+            agent = ColdCallAgent(scenario, context_cache=context_cache, record=contact(call))
+        else:
+            agent = ColdCallAgent(scenario, model=stub(), record=contact(call))
+        for turn in range(turns):
+            start = time.perf_counter()
+            agent.generate_response(USER_LINES[turn % len(USER_LINES)])
+            latencies.append(time.perf_counter() - start)
+        for key, count in agent.logger.token_usage().items():
+            totals[key] += count
+    return totals, latencies, context_cache.stats()["models"] if cached else calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", default="payment", choices=["demo", "interview", "payment"])
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--per-input-token-delay", type=float, default=0.0005,
+                        help="stub prefill cost per uncached input token (seconds)")
+    args = parser.parse_args()
+
+    print(f"static preamble: {estimate_tokens(SCENARIO_TEMPLATES[args.scenario])} tokens; "
+          f"Gemini caches prefixes from {CONTEXT_CACHE_MIN_TOKENS} tokens (CONTEXT_CACHE_MIN_TOKENS)")
+    runs = (("full prompt", False, 0), ("cached prefix", True, 0),
+            ("Gemini minimum", True, CONTEXT_CACHE_MIN_TOKENS))
+    for name, cached, min_cached_tokens in runs:
+        totals, latencies, models = run(args.scenario, args.calls, args.turns,
+                                        args.per_input_token_delay, cached, min_cached_tokens)
+        turns = args.calls * args.turns
+        uncached = totals["input"] - totals["cached"]
+        print(f"{name:<15} input {totals['input'] / turns:.0f} tok/turn "
+              f"(uncached {uncached / turns:.0f}), output {totals['output'] / turns:.0f} tok/turn, "
+              f"{models} model(s) for {args.calls} contacts")
+        print(f"{'':<15} latency: {format_latency_summary(latency_summary(latencies))}")
+
+
+if __name__ == "__main__":
+    main()
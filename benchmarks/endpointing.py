@@ -0,0 +1,64 @@
+"""Measure VAD endpointing and barge-in detection latency on recorded fixtures.
+
+Endpointing latency is how long after the caller stops speaking the turn is
+closed; barge-in latency is how long after the caller starts talking over
+the agent playback is stopped. Both are measured in audio time on synthetic
+WAV fixtures, so the run is fast and repeatable. From the repo root:
+
+    python -m benchmarks.endpointing --pause 0.5 --pause 0.8
+"""
+import os
+import argparse
+import tempfile
+import threading
+from microphone_session import MicrophoneSession, WavFileSource
+from benchmarks.audio_fixtures import write_fixture, DEFAULT_SEGMENTS
+from metrics import latency_summary, format_latency_summary
+
+
+def endpointing_latencies(path, utterance_ends, pause_seconds):
+    """Return per-turn delay between end of speech and the endpoint decision."""
+    latencies = []
+    with MicrophoneSession(WavFileSource(path), pause_seconds=pause_seconds) as session:
+        for utterance_end in utterance_ends:
+            session.listen(timeout=10)
+            latencies.append(session.last_timing["endpoint_at"] - utterance_end)
+    return latencies
+
+
+def barge_in_latency(path, speech_start):
+    """Return the delay between the caller talking over playback and detection."""
+    detected_at = []
+    with MicrophoneSession(WavFileSource(path)) as session:
+        session.watch_for_barge_in(lambda: detected_at.append(session.position),
+                                   threading.Event())
+    return detected_at[0] - speech_start if detected_at else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pause", type=float, action="append",
+                        help="trailing-silence thresholds to compare (seconds)")
+    args = parser.parse_args()
+    pauses = args.pause or [0.5, 0.8]
+
+    workdir = tempfile.mkdtemp()
+    call_path = os.path.join(workdir, "call.wav")
+    segments = [("noise", 1.0)] + DEFAULT_SEGMENTS
+    utterance_ends = write_fixture(call_path, segments)
+
+    for pause in pauses:
+        latencies = endpointing_latencies(call_path, utterance_ends, pause)
+        print(f"Endpointing (pause {pause:.2f} s): {format_latency_summary(latency_summary(latencies))}")
+
+    barge_path = os.path.join(workdir, "barge_in.wav")
+    write_fixture(barge_path, [("noise", 1.0), ("noise", 1.5), ("speech", 1.0)])
+    latency = barge_in_latency(barge_path, speech_start=2.5)
+    if latency is None:
+        print("Barge-in: not detected")
+    else:
+        print(f"Barge-in detection: {latency * 1000:.0f} ms after the caller started talking")
+
+
+if __name__ == "__main__":
+    main()
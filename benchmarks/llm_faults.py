@@ -0,0 +1,153 @@
+"""LLM scheduler behaviour against a fault-injecting stub model.
+
+Each scenario sends requests from several threads to a FaultyModel. It
+compares calling the model directly with going through an LLMScheduler,
+counts replies from the primary and the fallback model and failed
+requests, and checks the property the scenario is about. The script exits
+non-zero if a check fails. From the repo root:
+
+    python -m benchmarks.llm_faults
+    python -m benchmarks.llm_faults --scenarios tail,outage --requests 300
+"""
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fake_backends import FakeStreamingModel, FaultyModel
+from llm_scheduler import LLMScheduler, CircuitBreaker
+from metrics import latency_summary, format_latency_summary
+
+PRIMARY_REPLY = "Ji, main aapka payment note kar leti hoon."
+FALLBACK_REPLY = "Ji, main note kar leti hoon, thodi der mein confirm karti hoon."
+
+
+def primary_model(delay):
+    return FakeStreamingModel(reply=PRIMARY_REPLY, first_token_delay=delay, chunk_delay=0)
+
+
+def run_requests(send, requests, concurrency):
+    """Send requests from `concurrency` threads; return (outcomes, latencies, elapsed)."""
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            text = send(i).text
+            outcome = "primary" if text == PRIMARY_REPLY else "fallback"
+        except Exception:
+            outcome = "failed"
+        return outcome, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(requests)))
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return outcomes, [latency for _, latency in results], time.perf_counter() - start
+
+
+def compare(faulty, scheduler, args, fallback_delay=0.05):
+    fallback = FakeStreamingModel(reply=FALLBACK_REPLY, first_token_delay=fallback_delay, chunk_delay=0)
+    direct = run_requests(lambda i: faulty.generate_content("prompt"), args.requests, args.concurrency)
+    scheduled = run_requests(lambda i: scheduler.generate(faulty, "prompt", fallback=lambda: fallback),
+                             args.requests, args.concurrency)
+    for label, (outcomes, latencies, elapsed) in (("direct", direct), ("scheduler", scheduled)):
+        print(f"  {label:<9} {outcomes}  {format_latency_summary(latency_summary(latencies))}  "
+              f"{elapsed:.1f} s")
+    print(f"  stats     {scheduler.stats()}")
+    scheduler.close()
+    return direct, scheduled
+
+
+def transient(args):
+    """15% 503s and 5% 429s: jittered retries recover nearly every request."""
+    faulty = FaultyModel(primary_model(args.delay), error_rate=0.15, rate_limit_rate=0.05, seed=1)
+    direct, scheduled = compare(faulty, LLMScheduler(retry_base_delay=0.05, seed=1), args)
+    return scheduled[0].get("primary", 0) / args.requests >= 0.97
+
+
+def tail(args):
+    """5% of requests take 2 s extra: hedging after the p90 latency trims the tail."""
+    faulty = FaultyModel(primary_model(args.delay), slow_rate=0.05, slow_delay=2.0, seed=2)
+    direct, scheduled = compare(faulty, LLMScheduler(hedge_percentile=90, seed=2), args)
+    return latency_summary(scheduled[1])["p99"] < latency_summary(direct[1])["p99"] / 2
+
+
+def outage(args):
+    """The model is down for 0.7 s: the breaker opens, serves the fallback, then closes again."""
+    faulty = FaultyModel(primary_model(args.delay), seed=3)
+    scheduler = LLMScheduler(retry_base_delay=0.05, breaker=CircuitBreaker(failure_threshold=3, cooldown=0.2),
+                             seed=3)
+    fallback = FakeStreamingModel(reply=FALLBACK_REPLY, first_token_delay=0.05, chunk_delay=0)
+
+    def toggle():
+        time.sleep(0.3)
+        faulty.outage = True
+        time.sleep(0.7)
+        faulty.outage = False
+
+    def send(i):
+        # Pace requests so the run outlasts the outage
+        time.sleep(0.02)
+        return scheduler.generate(faulty, "prompt", fallback=lambda: fallback)
+
+    threading.Thread(target=toggle, daemon=True).start()
+    outcomes, latencies, elapsed = run_requests(send, args.requests, args.concurrency)
+    stats = scheduler.stats()
+    print(f"  scheduler {outcomes}  {format_latency_summary(latency_summary(latencies))}  {elapsed:.1f} s")
+    print(f"  stats     {stats}")
+    scheduler.close()
+    return (outcomes.get("failed", 0) == 0 and outcomes.get("fallback", 0) > 0
+            and stats["circuit_opened"] >= 1 and stats["circuit"] == "closed")
+
+
+def deadline(args):
+    """Every request hangs for 3 s: the deadline cuts it off and the fallback answers."""
+    faulty = FaultyModel(primary_model(args.delay), slow_rate=1.0, slow_delay=3.0, seed=4)
+    scheduler = LLMScheduler(deadline=0.8, breaker=CircuitBreaker(failure_threshold=10 ** 6), seed=4)
+    fallback = FakeStreamingModel(reply=FALLBACK_REPLY, first_token_delay=0.05, chunk_delay=0)
+    outcomes, latencies, elapsed = run_requests(
+        lambda i: scheduler.generate(faulty, "prompt", fallback=lambda: fallback),
+        min(args.requests, 40), args.concurrency)
+    print(f"  scheduler {outcomes}  {format_latency_summary(latency_summary(latencies))}  {elapsed:.1f} s")
+    print(f"  stats     {scheduler.stats()}")
+    scheduler.close()
+    return outcomes.get("fallback", 0) == min(args.requests, 40) and max(latencies) < 1.5
+
+
+def quota(args):
+    """A 600 requests/minute quota with a burst of 5: the token bucket spaces requests out."""
+    requests = 40
+    scheduler = LLMScheduler(requests_per_minute=600, burst=5, seed=5)
+    outcomes, latencies, elapsed = run_requests(
+        lambda i: scheduler.generate(primary_model(0.01), "prompt"), requests, args.concurrency)
+    print(f"  scheduler {outcomes}  {elapsed:.1f} s for {requests} requests "
+          f"(at least {(requests - 5) / 10:.1f} s at 10 requests/s)")
+    scheduler.close()
+    return outcomes.get("primary", 0) == requests and elapsed >= (requests - 5) / 10 * 0.95
+
+
+SCENARIOS = {"transient": transient, "tail": tail, "outage": outage, "deadline": deadline, "quota": quota}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.05, help="primary model latency in seconds")
+    args = parser.parse_args()
+
+    failed = []
+    for name in args.scenarios.split(","):
+        scenario = SCENARIOS[name]
+        print(f"{name}: {scenario.__doc__}")
+        ok = scenario(args)
+        print(f"  {'ok' if ok else 'FAILED'}")
+        if not ok:
+            failed.append(name)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Drive N simulated concurrent calls through the asyncio CallEngine.
+
+Uses stub STT/LLM/TTS backends with fixed latencies and reports turn latency
+percentiles (caller stops speaking -> agent audio starts). From the repo root:
+
+    python -m benchmarks.load_test --calls 50 --llm-concurrency 8
+"""
+import time
+import asyncio
+import argparse
+from call_engine import CallEngine, CallSession
+from cold_call_agent import ColdCallAgent
+from fake_backends import (FakeStreamingModel, StubAudioInput, StubAudioOutput,
+                           StubSTT, StubTTS)
+from metrics import latency_summary, format_latency_summary
+
+CALLER_UTTERANCES = [
+    "haan boliye",
+    "abhi thoda busy hoon",
+    "demo kitne time ka hoga",
+    "theek hai kal subah chalega",
+    "bye"
+]
+
+
+async def run_load_test(args):
+    engine = CallEngine(StubSTT(args.stt_delay), StubTTS(args.tts_delay),
+                        max_concurrent_llm=args.llm_concurrency, save_logs=False)
+    sessions = []
+    outcome_model = FakeStreamingModel(reply="{}", first_token_delay=0, chunk_delay=0)
+    for call_id in range(args.calls):
+        model = FakeStreamingModel(first_token_delay=args.llm_delay, chunk_delay=0)
+        agent = ColdCallAgent(args.scenario, model=model, outcome_model=outcome_model)
+        sessions.append(CallSession(call_id, agent,
+                                    StubAudioInput(CALLER_UTTERANCES, args.speaking_time),
+                                    StubAudioOutput(args.play_per_char)))
+
+    start = time.perf_counter()
+    try:
+        await engine.run_calls(sessions)
+    finally:
+        engine.close()
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for session in sessions for latency in session.turn_latencies]
+    outcomes = {}
+    for session in sessions:
+        outcomes[session.outcome] = outcomes.get(session.outcome, 0) + 1
+
+    print(f"{args.calls} calls, {len(latencies)} turns in {elapsed:.1f} s "
+          f"(LLM concurrency {args.llm_concurrency})")
+    print(f"Turn latency: {format_latency_summary(latency_summary(latencies))}")
+    print(f"Outcomes: {outcomes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--scenario", default="demo", choices=["demo", "interview", "payment"])
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--llm-delay", type=float, default=0.8)
+    parser.add_argument("--stt-delay", type=float, default=0.3)
+    parser.add_argument("--tts-delay", type=float, default=0.3)
+    parser.add_argument("--speaking-time", type=float, default=0.5)
+    parser.add_argument("--play-per-char", type=float, default=0.001)
+    asyncio.run(run_load_test(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Ingest and query times of the SQLite log store over many synthetic call logs.
+
+Writes N per-call JSON logs (the ConversationLogger format) to a temporary
+directory, then compares answering per-scenario metrics by globbing and
+parsing every file with ingesting once and querying the store. Re-ingest
+times show the incremental path. From the repo root:
+
+    python -m benchmarks.log_store --logs 100000
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+from log_store import LogStore, format_metrics
+from metrics import percentile
+
+SCENARIOS = ["demo", "interview", "payment"]
+OUTCOMES = ["ended_by_user", "hangup", "max_turns", "error"]
+LINES = {
+    "user": ["haan boliye", "kaunsa invoice?", "UPI se kar sakte hain?", "abhi busy hoon",
+             "demo kitne time ka hoga", "agle hafte tak kar denge", "salary range kya hai?"],
+    "ai": ["Ji bilkul, main aapko details bhej deti hoon.", "Kya kal subah 11 baje ka slot chalega?",
+           "Invoice INV-2023-045 ka payment pending hai.", "UPI aur NEFT dono options available hain."]
+}
+
+
+def write_logs(directory, count, seed=0, first_index=0):
+    rng = random.Random(seed)
+    start = 1_750_000_000.0
+    for i in range(first_index, first_index + count):
+        scenario = rng.choice(SCENARIOS)
+        call_start = start + i * 30
+        now = call_start
+        turns = []
+        for _ in range(rng.randint(2, 8)):
+            now += rng.uniform(2, 6)
+            turns.append({"timestamp": now, "speaker": "user", "text": rng.choice(LINES["user"])})
+            now += rng.lognormvariate(0, 0.4)
+            turns.append({"timestamp": now, "speaker": "ai", "text": rng.choice(LINES["ai"])})
+        log = {"scenario": scenario, "start_time": call_start, "end_time": now,
+               "duration": now - call_start, "metadata": {"outcome": rng.choice(OUTCOMES)},
+               "token_usage": {"input": 180, "cached": 120, "output": 40}, "turns": turns}
+        path = os.path.join(directory, f"conversation_{scenario}_{int(call_start)}_{i:08x}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(log, f, ensure_ascii=False, indent=2)
+
+
+def scan_metrics(directory):
+    """Answer the same questions the old way: parse every log file."""
+    per_scenario = {}
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            log = json.load(f)
+        stats = per_scenario.setdefault(log["scenario"], {"calls": 0, "turns": 0, "latencies": []})
+        stats["calls"] += 1
+        stats["turns"] += len(log["turns"])
+        for user, ai in zip(log["turns"][::2], log["turns"][1::2]):
+            stats["latencies"].append(ai["timestamp"] - user["timestamp"])
+    return {scenario: (stats["calls"], percentile(stats["latencies"], 95))
+            for scenario, stats in per_scenario.items()}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=100000)
+    parser.add_argument("--new-logs", type=int, default=1000, help="logs added before the incremental ingest")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = os.path.join(tmp, "logs")
+        os.makedirs(log_dir)
+        _, elapsed = timed(write_logs, log_dir, args.logs)
+        print(f"wrote {args.logs} logs in {elapsed:.1f} s")
+
+        _, scan_time = timed(scan_metrics, log_dir)
+        print(f"glob + parse every file:   {scan_time:.2f} s per question")
+
+        store = LogStore(os.path.join(tmp, "conversations.db"))
+        counts, elapsed = timed(store.ingest, [log_dir])
+        print(f"initial ingest:            {elapsed:.2f} s ({counts['calls']} calls, {counts['turns']} turns)")
+        _, elapsed = timed(store.ingest, [log_dir])
+        print(f"re-ingest, nothing new:    {elapsed:.2f} s")
+        write_logs(log_dir, args.new_logs, seed=1, first_index=args.logs)
+        counts, elapsed = timed(store.ingest, [log_dir])
+        print(f"{'re-ingest, %d new:' % counts['files']:<27}{elapsed:.2f} s")
+
+        metrics, elapsed = timed(store.scenario_metrics)
+        print(f"scenario metrics query:    {elapsed * 1000:.1f} ms")
+        payment, elapsed = timed(store.scenario_metrics, "payment")
+        print(f"one scenario query:        {elapsed * 1000:.1f} ms")
+        hits, elapsed = timed(store.search, "UPI", None, 20)
+        print(f"keyword search (20 hits):  {elapsed * 1000:.1f} ms")
+        print(format_metrics(metrics))
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
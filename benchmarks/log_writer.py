@@ -0,0 +1,83 @@
+"""Caller-side cost of conversation logging: one JSON file per call vs streamed JSONL.
+
+Simulates many concurrent calls logging turns from their own threads and
+measures how long log_turn and save_log block the caller, plus the number
+of files left in the log directory. Runs in a temporary directory. From the
+repo root:
+
+    python -m benchmarks.log_writer --calls 200 --turns 20
+"""
+import os
+import time
+import argparse
+import tempfile
+import threading
+from conversation_logger import ConversationLogger
+from log_writer import LogWriter
+from metrics import latency_summary, format_latency_summary
+
+TURN_TEXT = ("Ji bilkul, invoice INV-2025-0042 ka payment 15th March tak due tha. "
+             "Kya aap is hafte UPI ya NEFT se transfer kar payenge?")
+
+
+def simulate_call(log_format, writer, turns, turn_times, save_times):
+    logger = ConversationLogger("payment", log_format=log_format, writer=writer)
+    for turn in range(turns):
+        start = time.perf_counter()
+        logger.log_turn("user" if turn % 2 == 0 else "ai", TURN_TEXT,
+                        tokens=None if turn % 2 == 0 else {"input": 180, "cached": 120, "output": 40})
+        turn_times.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    logger.save_log({"scenario": "payment", "turns_count": turns // 2})
+    save_times.append(time.perf_counter() - start)
+
+
+def run(log_format, calls, turns, flush_interval, segment_bytes):
+    writer = None
+    if log_format == "jsonl":
+        writer = LogWriter("logs", max_segment_bytes=segment_bytes, flush_interval=flush_interval)
+    turn_times, save_times = [], []
+    start = time.perf_counter()
+    threads = [threading.Thread(target=simulate_call,
+                                args=(log_format, writer, turns, turn_times, save_times))
+               for _ in range(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if writer:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    return turn_times, save_times, elapsed, writer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--segment-bytes", type=int, default=256 * 1024)
+    parser.add_argument("--group-commit", type=float, default=0.05,
+                        help="flush interval for the group-commit run (seconds)")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    for name, log_format, flush_interval in (("json per call", "json", 0),
+                                              ("jsonl", "jsonl", 0),
+                                              ("jsonl grouped", "jsonl", args.group_commit)):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            os.makedirs("logs")
+            try:
+                turn_times, save_times, elapsed, writer = run(log_format, args.calls, args.turns,
+                                                              flush_interval, args.segment_bytes)
+                files = os.listdir("logs")
+            finally:
+                os.chdir(cwd)
+        print(f"{name:<14} log_turn: {format_latency_summary(latency_summary(turn_times), 'us')}")
+        print(f"{'':<14} save_log: {format_latency_summary(latency_summary(save_times), 'us')}")
+        detail = f", {writer.stats()['flushes']} flushes" if writer else ""
+        print(f"{'':<14} {len(files)} files in {elapsed:.2f} s{detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Accuracy and reply-path cost of call outcome extraction on labelled calls.
+
+Each call is played through a ColdCallAgent whose replies come from a
+zero-latency fake, with its log streamed so turns that fall out of the
+prompt window are spilled from memory as in production. Outcome extraction gets its own fake model with
+--llm-delay of latency, which answers with the call's labelled model
+answer. The report shows the extracted fields, how many caller turns went
+to the model and in how many requests, how long finish_turn() (the only
+extraction work on the reply path) takes, and how long the results take
+once the call ends. The script exits non-zero if a call's fields differ
+from its labels or finish_turn() is slower than --max-turn-cost-ms at
+p99. From the repo root:
+
+    python -m benchmarks.outcomes --llm-delay 0.4
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+from log_writer import LogWriter
+from cold_call_agent import ColdCallAgent, END_CALL_PHRASES
+from fake_backends import FakeStreamingModel
+from metrics import latency_summary, format_latency_summary
+from benchmarks.replay import load_conversations, DEFAULT_LOGS
+
+# (name, scenario, [(caller turn, agent reply)], model answer for undecided turns, expected fields)
+SCRIPTED_CALLS = [
+    ("demo, one of two slots", "demo",
+     [("haan boliye", "Humara ERP demo sirf 20 minute ka hai. Kya aap kal subah 11 baje ya parson dopahar 3 baje "
+                      "free hain?"),
+      ("haan wahi doosra wala rakh lo", "Zaroor, main invite bhej deti hoon.")],
+     {"demo_agreed": True, "demo_slot": "parson dopahar 3 baje"},
+     {"demo_agreed": True, "demo_slot": "parson dopahar 3 baje"}),
+    ("demo, declined", "demo",
+     [("haan boliye", "Kya aap ek chhota demo dekhna chahenge?"),
+      ("nahi, humein iski zarurat nahi hai", "Koi baat nahi, dhanyavaad.")],
+     None, {"demo_agreed": False, "demo_slot": None}),
+    ("payment, vague date", "payment",
+     [("kaunsa invoice hai", "INV-2023-045, 13,50,000 rupaye ka."),
+      ("15 tarikh ke aas paas dekhte hain", "Theek hai, main follow up karti hoon.")],
+     {"payment_committed": True, "payment_date": "15 tarikh"},
+     {"payment_committed": True, "payment_date": "15 tarikh"}),
+    ("payment, disputed", "payment",
+     [("yeh amount galat hai, humne pehle hi payment kar diya hai", "Main check karke aapko batati hoon.")],
+     None, {"payment_committed": False, "payment_date": None}),
+    ("demo, haan only as a backchannel", "demo",
+     [("haan boliye", "Kya aap kal subah 11 baje free hain?"),
+      ("haan haan, pehle price bataiye", "Pricing users ke hisaab se hoti hai.")],
+     None, {"demo_agreed": None, "demo_slot": None}),
+    ("demo, yesterday is not yes", "demo",
+     [("yesterday maine aapki website dekhi thi", "Achha! Kya aap kal subah 11 baje free hain?"),
+      ("ok, aur features bataiye", "Inventory aur accounts ek jagah manage hote hain.")],
+     None, {"demo_agreed": None, "demo_slot": None}),
+    ("payment, haan only as a backchannel", "payment",
+     [("haan", "Kya aap agle hafte friday tak payment kar denge?"),
+      ("haan, aapka naam kya tha", "Main Amita, accounts department se.")],
+     None, {"payment_committed": None, "payment_date": None}),
+    ("interview, no keywords", "interview",
+     [("haan main available hoon", "Apne kaam ke baare mein bataiye."),
+      ("maine ek inventory tool banaya tha jo warehouse ke saare orders track karta tha",
+       "Achha, usmein aapka role kya tha?"),
+      ("backend ka poora design aur slow queries theek karna mera kaam tha, teen saal se",
+       "Bahut badhiya, dhanyavaad.")],
+     {"skills": ["python"], "experience_years": 3, "problem_solving": True},
+     {"skills": ["python"], "experience_years": 3, "problem_solving_answers": 1}),
+    ("demo, agreed in one long turn", "demo",
+     [("haan boliye", "Kya aap ek chhota demo dekhna chahenge?"),
+      ("demo theek hai, Thursday ko rakh lo. " + "Hamare yahan sau log kaam karte hain aur system purana hai. " * 60,
+       "Zaroor, main invite bhej deti hoon.")],
+     None, {"demo_agreed": True, "demo_slot": "thursday"}),
+]
+
+# Expected fields of the recorded calls in benchmarks/replay_logs
+RECORDED_EXPECTED = {
+    "demo": {"demo_agreed": True, "demo_slot": "kal subah 11 baje"},
+    "payment": {"payment_committed": True, "payment_date": "agle hafte friday"},
+    "interview": {"skills": ["python", "react", "cloud"], "experience_years": 4, "problem_solving_answers": 1},
+}
+
+
+def labelled_calls():
+    calls = [(call_id, scenario, exchanges, None, RECORDED_EXPECTED[scenario])
+             for call_id, scenario, exchanges in load_conversations([DEFAULT_LOGS])
+             if scenario in RECORDED_EXPECTED]
+    return calls + SCRIPTED_CALLS
+
+
+def play(call, llm_delay, writer):
+    """Play one call; returns (results, finish_turn durations, seconds from hang-up to results)."""
+    name, scenario, exchanges, answer, _ = call
+    model = FakeStreamingModel(first_token_delay=0, chunk_delay=0)
+    outcome_model = FakeStreamingModel(reply=json.dumps(answer or {}), first_token_delay=llm_delay, chunk_delay=0)
+    agent = ColdCallAgent(scenario, model=model, outcome_model=outcome_model, log_writer=writer)
+    turn_costs = []
+    for user_text, reply in exchanges:
+        if user_text in END_CALL_PHRASES:
+            break
+        model.reply = reply or "Ji."
+        agent.generate_response(user_text)
+        start = time.perf_counter()
+        agent.finish_turn()
+        turn_costs.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    results = agent.finish_outcomes().result()
+    return results, turn_costs, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-delay", type=float, default=0.4, help="latency of the extraction model, seconds")
+    parser.add_argument("--max-turn-cost-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    writer = LogWriter(tempfile.mkdtemp(), compress=False)
+    ok = True
+    turn_costs = []
+    end_waits = []
+    requests = turns_sent = 0
+    for call in labelled_calls():
+        name, _, _, _, expected = call
+        results, costs, end_wait = play(call, args.llm_delay, writer)
+        turn_costs.extend(costs)
+        end_waits.append(end_wait)
+        requests += results["llm_requests"]
+        turns_sent += results["llm_turns"]
+        fields = {key: results["fields"][key] for key in expected}
+        matches = fields == expected
+        ok = ok and matches
+        sources = sorted(set(results["sources"].values()))
+        print(f"{name[:36]:<36} {'ok  ' if matches else 'DIFF'} {json.dumps(fields, ensure_ascii=False)} "
+              f"[{'+'.join(sources) or 'none'}]")
+        if not matches:
+            print(f"{'':<36} expected {json.dumps(expected, ensure_ascii=False)}")
+
+    cost = latency_summary(turn_costs)
+    print(f"{turns_sent} caller turns sent to the model in {requests} requests")
+    print(f"finish_turn on the reply path: {format_latency_summary(cost, 'us')}")
+    print(f"results after hang-up:         {format_latency_summary(latency_summary(end_waits))}")
+    ok = ok and cost["p99"] * 1000 <= args.max_turn_cost_ms
+    print("ok" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""First-audio and total latency of speaking a complete multi-sentence reply.
+
+Compares one synthesis request for the whole reply (SpeechProcessor.speak)
+with StreamingSpeaker.speak_text, which synthesizes the sentences on a
+thread pool and plays them in order, for several pool sizes. The fake TTS
+charges a fixed round trip per request plus a per-character cost, like
+gTTS, and plays clips for as long as the text takes to say. From the repo
+root:
+
+    python -m benchmarks.parallel_tts --turns 3 --workers 1,2,4
+"""
+import time
+import argparse
+from fake_backends import FakeTTS
+from streaming_pipeline import StreamingSpeaker
+
+# A five-sentence demo-scenario reply
+REPLY = ("Namaste Rahul ji, main Parul bol rahi hoon TechSolutions se. "
+         "Humara ERP system aapke inventory aur accounts dono ko ek jagah manage karta hai. "
+         "Aapki team ka kaafi time reports banane mein bachega. "
+         "Bahut saare manufacturing clients ise already use kar rahe hain. "
+         "Kya aap kal subah 11 baje ya parson dopahar 3 baje ek chhote demo ke liye free hain?")
+
+
+def single_shot(tts):
+    """Synthesize the whole reply in one request, then play it."""
+    start = time.perf_counter()
+    audio = tts.synthesize(REPLY)
+    first_audio = time.perf_counter() - start
+    tts.play_audio(audio)
+    return {"first_token": None, "first_audio": first_audio, "total": time.perf_counter() - start,
+            "sentences": 1}
+
+
+def sentence_turn(tts, workers):
+    """Synthesize the reply's sentences on `workers` threads and play them in order."""
+    return StreamingSpeaker(tts, synthesis_workers=workers).speak_text(REPLY)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--synth-delay", type=float, default=0.6, help="seconds per TTS request")
+    parser.add_argument("--synth-per-char", type=float, default=0.004)
+    parser.add_argument("--play-per-char", type=float, default=0.01)
+    args = parser.parse_args()
+
+    def make_tts():
+        return FakeTTS(args.synth_delay, args.synth_per_char, args.play_per_char)
+
+    runs = [("single", None)] + [(f"{workers} worker{'s' if workers > 1 else ''}", workers)
+                                 for workers in map(int, args.workers.split(","))]
+    for name, workers in runs:
+        first_audio, total = [], []
+        for _ in range(args.turns):
+            timing = single_shot(make_tts()) if workers is None else sentence_turn(make_tts(), workers)
+            first_audio.append(timing["first_audio"])
+            total.append(timing["total"])
+        print(f"{name:<10} first audio {sum(first_audio) / len(first_audio) * 1000:6.0f} ms, "
+              f"total {sum(total) / len(total) * 1000:6.0f} ms ({timing['sentences']} clips)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare per-utterance playback overhead: shared mp3 file vs in-memory buffer.
+
+The old path saved each clip to response.mp3, loaded it from disk, polled
+get_busy() every 100 ms, unloaded it and deleted the file. The new path
+plays the clip from a BytesIO buffer through AudioPlayer.play, which is
+woken by pygame's end-of-music event. Both run through pygame's mixer on
+SDL's dummy audio driver (no sound card needed), which plays in real time,
+and the report is the time each path takes beyond the clip's length. The
+mixer reports the end once the last buffer is handed to the device, so
+this can be slightly negative; compare the two paths. From the repo root:
+
+    python -m benchmarks.playback_overhead --utterances 20
+"""
+import io
+import os
+import time
+import wave
+import random
+import argparse
+import tempfile
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from audio_player import AudioPlayer
+from metrics import latency_summary, format_latency_summary
+
+SAMPLE_RATE = 22050
+
+
+def wav_clip(seconds, seed):
+    """A mono 16-bit WAV clip of low-level noise, as the offline TTS engines produce."""
+    rng = random.Random(seed)
+    frames = int(SAMPLE_RATE * seconds)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(bytes(rng.getrandbits(8) & 0x0f for _ in range(frames * 2)))
+    return buffer.getvalue()
+
+
+def file_playback(clip, path):
+    """The old path: write the clip to disk, play it, poll get_busy() and delete the file."""
+    with open(path, "wb") as f:
+        f.write(clip)
+    pygame.mixer.music.load(path)
+    pygame.mixer.music.play()
+    while pygame.mixer.music.get_busy():
+        time.sleep(0.1)
+    pygame.mixer.music.unload()
+    os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--utterances", type=int, default=20)
+    parser.add_argument("--min-seconds", type=float, default=0.2)
+    parser.add_argument("--max-seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    player = AudioPlayer()
+    if not player.events_enabled:
+        print("pygame end events unavailable; AudioPlayer falls back to polling")
+    path = os.path.join(tempfile.gettempdir(), "response.wav")
+    rng = random.Random(0)
+    results = {"file+poll": [], "AudioPlayer": []}
+    for index in range(args.utterances):
+        duration = rng.uniform(args.min_seconds, args.max_seconds)
+        clip = wav_clip(duration, index)
+
+        start = time.perf_counter()
+        file_playback(clip, path)
+        results["file+poll"].append(time.perf_counter() - start - duration)
+
+        start = time.perf_counter()
+        player.play(io.BytesIO(clip))
+        results["AudioPlayer"].append(time.perf_counter() - start - duration)
+
+    print(f"Time beyond clip length, {args.utterances} clips of {args.min_seconds}-{args.max_seconds} s:")
+    for name, values in results.items():
+        print(f"  {name:<12} {format_latency_summary(latency_summary(values))}")
+
+
+if __name__ == "__main__":
+    main()
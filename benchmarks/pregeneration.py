@@ -0,0 +1,87 @@
+"""Turn latency with and without pre-generating replies during playback.
+
+Runs payment-reminder calls through the CallEngine with stub STT/TTS and
+the local stub model. Callers answer mostly with one of the scenario's
+intents, in varying Hinglish phrasing, and sometimes go off script. The
+same calls are run without and with a PreGenerator per call; the report
+shows turn latency, hit rate, model time saved and the extra model
+requests spent on candidates that were not used. From the repo root:
+
+    python -m benchmarks.pregeneration --calls 20 --off-script 0.25
+"""
+import random
+import asyncio
+import argparse
+from call_engine import CallEngine, CallSession
+from cold_call_agent import ColdCallAgent
+from fake_backends import FakeStreamingModel, StubAudioInput, StubAudioOutput, StubSTT, StubTTS
+from metrics import latency_summary, format_latency_summary
+from pregeneration import PreGenerator
+
+ON_SCRIPT = [
+    "agle hafte tak payment kar denge", "main kal tak bhej dunga", "next week tak kar dunga",
+    "kaunsa invoice hai?", "details bata dijiye", "kitna amount hai bhai",
+    "yeh galat hai, humne pehle hi pay kar diya hai", "yeh amount galat hai",
+    "abhi paise nahi hain", "thoda time chahiye please",
+]
+OFF_SCRIPT = ["aap kaun bol rahe ho?", "mera manager abhi office mein nahi hai", "UPI se chalega kya?"]
+
+
+def caller_script(rng, turns, off_script):
+    return [rng.choice(OFF_SCRIPT) if rng.random() < off_script else rng.choice(ON_SCRIPT)
+            for _ in range(turns)]
+
+
+async def run(args, pregenerate):
+    rng = random.Random(args.seed)
+    engine = CallEngine(StubSTT(args.stt_delay), StubTTS(args.tts_delay), save_logs=False)
+    sessions = []
+    outcome_model = FakeStreamingModel(reply="{}", first_token_delay=0, chunk_delay=0)
+    for call_id in range(args.calls):
+        model = FakeStreamingModel(first_token_delay=args.llm_delay, chunk_delay=0)
+        agent = ColdCallAgent("payment", model=model, outcome_model=outcome_model)
+        pregenerator = PreGenerator(agent) if pregenerate else None
+        sessions.append(CallSession(call_id, agent, StubAudioInput(caller_script(rng, args.turns, args.off_script),
+                                                                   args.speaking_time),
+                                    StubAudioOutput(args.play_per_char), opening="Namaskar, main Parul bol rahi hoon.",
+                                    pregenerator=pregenerator))
+    try:
+        await engine.run_calls(sessions)
+    finally:
+        engine.close()
+    latencies = [latency for session in sessions for latency in session.turn_latencies]
+    requests = sum(session.agent.model.calls for session in sessions)
+    stats = [session.pregenerator.stats() for session in sessions if session.pregenerator]
+    return latencies, requests, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--off-script", type=float, default=0.25, help="share of caller turns matching no intent")
+    parser.add_argument("--llm-delay", type=float, default=0.8)
+    parser.add_argument("--stt-delay", type=float, default=0.1)
+    parser.add_argument("--tts-delay", type=float, default=0.1)
+    parser.add_argument("--speaking-time", type=float, default=0.5)
+    parser.add_argument("--play-per-char", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    latencies, requests, _ = asyncio.run(run(args, pregenerate=False))
+    print(f"no pre-generation: turn {format_latency_summary(latency_summary(latencies))}, "
+          f"{requests} model requests")
+
+    latencies, requests, stats = asyncio.run(run(args, pregenerate=True))
+    hits = sum(s["hits"] for s in stats)
+    misses = sum(s["misses"] for s in stats)
+    unclassified = sum(s["unclassified"] for s in stats)
+    saved = sum(s["time_saved"] for s in stats)
+    print(f"pre-generation:    turn {format_latency_summary(latency_summary(latencies))}, "
+          f"{requests} model requests")
+    print(f"  hit rate {hits / max(1, hits + misses):.0%} ({hits} hits, {misses} misses, "
+          f"{unclassified} unclassified), {saved:.1f} s of model time saved")
+
+
+if __name__ == "__main__":
+    main()
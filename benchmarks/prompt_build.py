@@ -0,0 +1,82 @@
+"""Prompt build time and prompt size over a long call.
+
+Compares the old approach (render all three scenario templates every turn,
+keep the last 6 history lines) with PromptBuilder (static block rendered
+once, token-budgeted window plus rolling summary). From the repo root:
+
+    python -m benchmarks.prompt_build --turns 50
+"""
+import time
+import argparse
+from prompt_builder import (PromptBuilder, SCENARIO_TEMPLATES, CONTEXT_TEMPLATES, INPUT_LABELS,
+                            PROMPT_HISTORY_TOKENS, estimate_tokens)
+from metrics import latency_summary, format_latency_summary
+
+CUSTOMER = {"name": "Rahul", "company": "XYZ Ltd", "interest": "ERP system",
+            "email": "rahul@example.com", "phone": "+91 98765 43210", "location": "Delhi"}
+JOB = {"position": "Data Scientist", "skills": "Python, ML, SQL", "experience": "2-4 years",
+       "salary": "20-25 LPA", "location": "Bangalore", "work_type": "Remote"}
+INVOICE = {"amount": "5,00,000", "days_late": "10", "invoice_number": "INV-2023-101",
+           "due_date": "31st March 2025", "payment_options": "UPI, NEFT, Cheque"}
+
+USER_LINES = [
+    "haan boliye, kya baat hai",
+    "humare paas abhi Tally hai, usse migrate karna mushkil hoga kya?",
+    "price ka idea de sakte ho? Humari team 40 logon ki hai aur teen branches hain.",
+    "theek hai"
+]
+AI_LINE = ("Bilkul, main samajh sakti hoon. Humara ERP Tally se data import support karta hai "
+           "aur migration mein humari team poori help karti hai. Kya main aapke liye kal "
+           "subah 11 baje ya Friday dopahar 3 baje ka demo schedule kar doon?")
+
+
+def legacy_prompt(scenario, user_input, history):
+    """Rebuild every scenario prompt and keep one, as the agent used to."""
+    history_text = "\n".join(history[-6:])
+    prompts = {}
+    for name, template in SCENARIO_TEMPLATES.items():
+        context = CONTEXT_TEMPLATES[name].format(customer=CUSTOMER, job=JOB, invoice=INVOICE)
+        static = f"{template}\n{context}"
+        prompts[name] = (f"{static}\n[Conversation History]\n{history_text}\n\n"
+                         f"[Current Input]\n{INPUT_LABELS[name]}: {user_input}\n\n"
+                         f"[Your Response in Hinglish]\n")
+    return prompts[scenario]
+
+
+def run_call(build, turns):
+    """Simulate a call and return (build times, prompt token estimates)."""
+    history = []
+    times = []
+    sizes = []
+    for turn in range(turns):
+        user_input = USER_LINES[turn % len(USER_LINES)]
+        history.append(f"User: {user_input}")
+        start = time.perf_counter()
+        prompt = build(user_input, history)
+        times.append(time.perf_counter() - start)
+        sizes.append(estimate_tokens(prompt))
+        history.append(f"AI: {AI_LINE}")
+    return times, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--scenario", default="demo", choices=list(SCENARIO_TEMPLATES))
+    parser.add_argument("--history-tokens", type=int, default=PROMPT_HISTORY_TOKENS)
+    args = parser.parse_args()
+
+    builder = PromptBuilder(args.scenario, CUSTOMER, JOB, INVOICE, history_tokens=args.history_tokens)
+    approaches = {
+        "legacy": lambda user_input, history: legacy_prompt(args.scenario, user_input, history),
+        "precompiled": builder.build
+    }
+    for name, build in approaches.items():
+        times, sizes = run_call(build, args.turns)
+        print(f"{name:<12} build: {format_latency_summary(latency_summary(times), 'us')}")
+        print(f"{'':<12} prompt size: first {sizes[0]} tokens, max {max(sizes)} tokens, "
+              f"last {sizes[-1]} tokens (estimated)")
+
+
+if __name__ == "__main__":
+    main()
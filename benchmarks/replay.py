@@ -0,0 +1,270 @@
+"""Replay recorded conversations and compare throughput, latency and memory with a baseline.
+
+The caller turns of recorded calls (logs/conversation_*.json or JSONL
+segments; by default the fixtures in benchmarks/replay_logs) are fed back
+through ColdCallAgent and SpeechProcessor. Stub backends with seeded
+latency distributions stand in for STT, the model and TTS, and the model
+answers with the recorded agent replies. With --mode audio each caller
+turn is synthesized to audio and recognized; with --mode text it goes
+straight to the agent.
+
+The report gives throughput, per-stage latency percentiles from the
+turns' tracing spans, and memory retained per live session. Results are
+compared with the baseline file, and the script exits non-zero if a
+metric regressed by more than --tolerance. From the repo root:
+
+    python -m benchmarks.replay                                  # compare with the baseline
+    python -m benchmarks.replay --update-baseline --release 1.4.0
+    python -m benchmarks.replay --logs logs/ --mode text --llm-latency lognormal:0.8,0.5
+"""
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import platform
+import resource
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import speech_recognition as sr
+from cold_call_agent import ColdCallAgent, END_CALL_PHRASES
+from fake_backends import FakeRecognizer, FakeSpeechEngine, FakeStreamingModel, Latency, utterance_pcm
+from log_writer import iter_log_records
+from metrics import latency_summary
+from speech_processor import SpeechProcessor
+from tracing import Tracer, STAGES, activate, latency_breakdown
+from tts_cache import TTSCache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LOGS = os.path.join(HERE, "replay_logs")
+DEFAULT_BASELINE = os.path.join(HERE, "replay_baseline.json")
+SAMPLE_RATE = 16000
+
+# Settings that must match for two runs to be comparable
+COMPARED_SETTINGS = ("mode", "concurrency", "repeat", "stt_latency", "llm_latency", "tts_latency", "seed")
+
+
+def load_conversations(paths):
+    """Return (call_id, scenario, [(user_text, recorded_reply)]) for every recorded call."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "conversation_*.json"))))
+            files.extend(sorted(glob.glob(os.path.join(path, "conversations-*.jsonl*"))))
+        else:
+            files.append(path)
+
+    calls = {}
+    for path in files:
+        if path.endswith(".json"):
+            with open(path, 'r', encoding='utf-8') as f:
+                log = json.load(f)
+            calls[os.path.basename(path)] = (log["scenario"], log.get("turns", []))
+        else:
+            for record in iter_log_records(path):
+                if record.get("type") == "start":
+                    calls[record["call_id"]] = (record["scenario"], [])
+                elif record.get("type") == "turn" and record["call_id"] in calls:
+                    calls[record["call_id"]][1].append(record)
+
+    conversations = []
+    for call_id, (scenario, turns) in sorted(calls.items()):
+        exchanges = []
+        for turn in turns:
+            if turn["speaker"] == "user":
+                exchanges.append([turn["text"], None])
+            elif exchanges and exchanges[-1][1] is None:
+                exchanges[-1][1] = turn["text"]
+        if exchanges:
+            conversations.append((call_id, scenario, [tuple(exchange) for exchange in exchanges]))
+    return conversations
+
+
+def corpus_digest(conversations):
+    return hashlib.sha256(json.dumps(conversations, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def build_speech(args, seed):
+    stt = FakeRecognizer(Latency(args.stt_latency, seed), transcript=None)
+    tts = FakeSpeechEngine(Latency(args.tts_latency, seed + 1), seconds_per_char=0.001)
+    # No TTS cache, so every reply pays the synthesis latency
+    return SpeechProcessor(tts_cache=TTSCache(max_bytes=0), stt=stt, tts=tts)
+
+
+def replay_call(conversation, speech, llm_latency, mode):
+    """Replay one call's caller turns; returns the agent with its logged, traced turns."""
+    call_id, scenario, exchanges = conversation
+    model = FakeStreamingModel(first_token_delay=llm_latency, chunk_delay=0)
+    outcome_model = FakeStreamingModel(reply="{}", first_token_delay=0, chunk_delay=0)
+    agent = ColdCallAgent(scenario, model=model, outcome_model=outcome_model)
+    agent.tracer = Tracer(call_id)
+    activate(agent.tracer)
+    for user_text, recorded_reply in exchanges:
+        if mode == "audio":
+            audio = sr.AudioData(utterance_pcm(user_text, SAMPLE_RATE, 0.005), SAMPLE_RATE, 2)
+            user_input = speech.transcribe(audio).lower()
+        else:
+            user_input = user_text.lower()
+        if user_input in END_CALL_PHRASES:
+            break
+        model.reply = recorded_reply or "Ji, bataiye."
+        reply = agent.generate_response(user_input)
+        speech.synthesize(reply).close()
+        agent.finish_turn()
+    return agent
+
+
+def measure_latency(args, conversations):
+    """Replay every call `repeat` times on `concurrency` threads; returns throughput and stage latencies."""
+    speech = build_speech(args, args.seed)
+    llm_latency = Latency(args.llm_latency, args.seed + 2)
+    calls = conversations * args.repeat
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        agents = list(pool.map(lambda call: replay_call(call, speech, llm_latency, args.mode), calls))
+    elapsed = time.perf_counter() - start
+
+    traced = [(agent.logger.call_id, turn.spans, 0.0)
+              for agent in agents for turn in agent.logger.turns if turn.spans]
+    breakdown = latency_breakdown(traced)
+    stages = {name: breakdown["stages"][name] for name in STAGES if name in breakdown["stages"]}
+    stages["turn"] = breakdown["turn_total"]
+    return {
+        "throughput": {"calls_per_second": len(calls) / elapsed, "turns_per_second": breakdown["turns"] / elapsed},
+        "latency": {name: summary_without_count(values) for name, values in stages.items()},
+        "turns": breakdown["turns"],
+        "elapsed": elapsed,
+    }
+
+
+def summary_without_count(values):
+    summary = latency_summary(values)
+    return {key: round(summary[key], 6) for key in ("mean", "p50", "p95", "p99")}
+
+
+def measure_memory(args, conversations):
+    """Memory retained per live session after its call, with every backend latency at zero."""
+    zero = argparse.Namespace(**{**vars(args), "stt_latency": "0", "tts_latency": "0"})
+    speech = build_speech(zero, args.seed)
+    sessions = max(args.memory_sessions // len(conversations), 1) * len(conversations)
+    # Warm up imports, caches and the shared scheduler before measuring
+    replay_call(conversations[0], speech, 0, args.mode)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    agents = [replay_call(conversations[i % len(conversations)], speech, 0, args.mode) for i in range(sessions)]
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del agents
+    return {"per_session_kb": round(retained / sessions / 1024, 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+
+def flatten(results):
+    """Compared metrics as {name: (value, higher_is_better)}."""
+    metrics = {f"throughput.{name}": (value, True) for name, value in results["throughput"].items()}
+    for stage, summary in results["latency"].items():
+        for key, value in summary.items():
+            metrics[f"latency.{stage}.{key}"] = (value, False)
+    metrics["memory.per_session_kb"] = (results["memory"]["per_session_kb"], False)
+    return metrics
+
+
+def compare(results, baseline, tolerance, min_latency_delta):
+    """Print each metric against the baseline; returns the names of regressed metrics."""
+    current = flatten(results)
+    previous = flatten(baseline)
+    regressions = []
+    print(f"compared with baseline from release {baseline['release']} ({baseline['timestamp']}):")
+    for name, (value, higher_is_better) in current.items():
+        if name not in previous:
+            continue
+        base = previous[name][0]
+        change = (value - base) / base if base else 0.0
+        if higher_is_better:
+            regressed = value < base * (1 - tolerance)
+        else:
+            regressed = value > base * (1 + tolerance)
+            if name.startswith("latency."):
+                # Sub-millisecond stages are noisy; ignore changes too small to hear
+                regressed = regressed and value - base > min_latency_delta
+        if regressed:
+            regressions.append(name)
+        if regressed or abs(change) > tolerance / 2:
+            print(f"  {name:<32} {base:>12.4f} -> {value:>12.4f} ({change:+.0%})"
+                  f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", nargs="+", default=[DEFAULT_LOGS], help="log files or directories")
+    parser.add_argument("--mode", choices=["audio", "text"], default="audio")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=4, help="replay every call this many times")
+    parser.add_argument("--stt-latency", default="lognormal:0.15,0.3")
+    parser.add_argument("--llm-latency", default="lognormal:0.4,0.4")
+    parser.add_argument("--tts-latency", default="lognormal:0.2,0.3")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--memory-sessions", type=int, default=300)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="write this run's results as the baseline")
+    parser.add_argument("--release", default="dev", help="label stored with the results")
+    parser.add_argument("--output", help="also write this run's results to a file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative change")
+    parser.add_argument("--min-latency-delta", type=float, default=0.005,
+                        help="latency changes below this many seconds never count as regressions")
+    args = parser.parse_args()
+
+    conversations = load_conversations(args.logs)
+    if not conversations:
+        print(f"No recorded conversations found in {', '.join(args.logs)}")
+        sys.exit(2)
+    turns = sum(len(exchanges) for _, _, exchanges in conversations)
+
+    timing = measure_latency(args, conversations)
+    results = {
+        "release": args.release,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "settings": {name: getattr(args, name) for name in COMPARED_SETTINGS},
+        "corpus": {"calls": len(conversations), "turns": turns, "digest": corpus_digest(conversations)},
+        "throughput": {name: round(value, 3) for name, value in timing["throughput"].items()},
+        "latency": timing["latency"],
+        "memory": measure_memory(args, conversations),
+    }
+
+    print(f"{len(conversations)} recorded calls x {args.repeat}, {timing['turns']} turns replayed in "
+          f"{timing['elapsed']:.1f} s ({args.mode} mode, concurrency {args.concurrency})")
+    print(f"throughput: {results['throughput']['calls_per_second']:.1f} calls/s, "
+          f"{results['throughput']['turns_per_second']:.1f} turns/s")
+    for stage, summary in results["latency"].items():
+        print(f"  {stage:<13} " + " ".join(f"{key}={value * 1000:.1f} ms" for key, value in summary.items()))
+    print(f"memory: {results['memory']['per_session_kb']:.1f} KB per session, "
+          f"peak RSS {results['memory']['peak_rss_mb']:.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline["settings"] != results["settings"] or baseline["corpus"] != results["corpus"]:
+        print("Baseline was recorded with other settings or another corpus; not comparing")
+        sys.exit(2)
+    regressions = compare(results, baseline, args.tolerance, args.min_latency_delta)
+    print(f"{len(regressions)} regressions" if regressions else "no regressions")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Hit rate and reply latency of the semantic response cache over a campaign.
+
+Simulates a payment-reminder campaign against the local stub model: each
+call picks caller utterances from a handful of intents, each said in
+several Hinglish spelling variants, for a different customer. The same
+campaign is run without and with a shared ResponseCache. A reply cached
+for one contact must never carry that contact's values into another
+contact's call; the script exits non-zero if one does. From the repo root:
+
+    python -m benchmarks.response_cache --calls 50 --turns 4
+"""
+import sys
+import time
+import random
+import argparse
+from cold_call_agent import ColdCallAgent
+from fake_backends import FakeStreamingModel
+from metrics import latency_summary, format_latency_summary
+from response_cache import ResponseCache
+
+# Intents per dialogue state, each as spelling and phrasing variants callers use
+INTENTS = [
+    [["haan boliye", "haan bolo", "ha boliye ji", "haan ji boliye"],
+     ["kaun bol raha hai?", "kaun bol rahe ho", "aap kaun bol rahe hain?"]],
+    [["kaunsa invoice?", "konsa invoice hai", "kaun sa invoice?"],
+     ["payment ho gaya hai", "payment ho gya hai", "payment kar diya hai"]],
+    [["agle hafte tak kar denge", "agle hafte kar denge", "next week tak kar denge"],
+     ["abhi paise nahi hain", "abhi paisa nahi hai", "abhi funds nahi hain"]],
+    [["theek hai", "thik hai", "theek hai ji"],
+     ["UPI se kar sakte hain?", "UPI se kar sakte hai kya", "upi chalega?"]]
+]
+CUSTOMERS = ["Rahul", "Sneha", "Imran", "Kavita", "Arjun", "Meena", "Vikram", "Pooja"]
+
+# Two contacts with no value in common, and replies the model gives the first one
+RAHUL = {"customer": {"name": "Rahul", "company": "XYZ Ltd"},
+         "invoice": {"amount": "13,50,000", "days_late": "25", "invoice_number": "INV-1",
+                     "due_date": "1st May 2025", "payment_options": "UPI, NEFT"}}
+SITA = {"customer": {"name": "Sita", "company": "ABC Traders"},
+        "invoice": {"amount": "2,00,000", "days_late": "3", "invoice_number": "INV-2",
+                    "due_date": "9th June 2025", "payment_options": "Cheque"}}
+RAHUL_REPLIES = [
+    "Rahul ji, aapka payment 25 din late hai, invoice INV-1 ka ₹13,50,000.",
+    "Rahul ji, aap 13.5 lakh UPI ya NEFT se bhej sakte hain.",
+    "Ji Rahul, XYZ Ltd ka payment aaj hi clear kar dijiye.",
+]
+
+
+def leaked_values(reply_text):
+    """Cache a model reply to Rahul, then look it up for Sita; return Rahul's values found in her reply."""
+    cache = ResponseCache()
+    model = FakeStreamingModel(reply=reply_text, first_token_delay=0, chunk_delay=0)
+    ColdCallAgent("payment", model=model, response_cache=cache, record=RAHUL).generate_response("kaunsa invoice?")
+    model.reply = "Sita ji, main aapko details bhejti hoon."
+    reply = ColdCallAgent("payment", model=model, response_cache=cache, record=SITA).generate_response(
+        "kaunsa invoice?")
+    values = [part.strip() for section in RAHUL.values() for value in section.values()
+              for part in value.split(", ")] + ["13.5", "25 din"]
+    return [value for value in values if value in reply]
+
+
+def run(calls, turns, first_token_delay, cache, seed):
+    rng = random.Random(seed)
+    model = FakeStreamingModel(reply="Ji {name}, main aapka payment note kar leti hoon.",
+                               first_token_delay=first_token_delay, chunk_delay=0)
+    latencies = []
+    for call in range(calls):
+        agent = ColdCallAgent("payment", model=model, response_cache=cache)
+        agent.customer_data = dict(agent.customer_data, name=CUSTOMERS[call % len(CUSTOMERS)])
+        model.reply = f"Ji {agent.customer_data['name']}, main aapka payment note kar leti hoon."
+        for turn in range(turns):
+            variants = rng.choice(INTENTS[min(turn, len(INTENTS) - 1)])
+            start = time.perf_counter()
+            reply = agent.generate_response(rng.choice(variants))
+            latencies.append(time.perf_counter() - start)
+            assert agent.customer_data["name"] in reply, reply
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--first-token-delay", type=float, default=0.05,
+                        help="stub model latency per request (seconds)")
+    parser.add_argument("--threshold", type=float, default=0.65)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    ok = True
+    for reply_text in RAHUL_REPLIES:
+        leaked = leaked_values(reply_text)
+        ok = ok and not leaked
+        print(f"{'LEAK' if leaked else 'ok  '} {reply_text} {leaked if leaked else ''}")
+
+    for name, cache in (("no cache", None), ("response cache", ResponseCache(args.threshold))):
+        latencies = run(args.calls, args.turns, args.first_token_delay, cache, args.seed)
+        print(f"{name:<15} latency: {format_latency_summary(latency_summary(latencies))}")
+        if cache:
+            stats = cache.stats()
+            print(f"{'':<15} hit rate {stats['hit_rate']:.0%} "
+                  f"({stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries, "
+                  f"{stats['rejected']} replies not cached)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
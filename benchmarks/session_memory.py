@@ -0,0 +1,88 @@
+"""Resident memory per active session, with every turn kept or with old turns spilled.
+
+Each mode runs in a fresh interpreter, which holds --sessions agents open
+at once, plays --turns exchanges on each with a zero-latency fake model,
+and reports the RSS growth divided by the number of sessions. In "json"
+mode the logger keeps every turn for the file it writes at the end. In
+"jsonl" mode turns stream to a LogWriter, and turns that fell out of the
+prompt window are dropped from memory. The script exits non-zero if the
+two modes build different prompts. From the repo root:
+
+    python -m benchmarks.session_memory --sessions 2000 --turns 40
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+SESSIONS_SNIPPET = """
+import gc, json, os, resource, tempfile
+from cold_call_agent import ColdCallAgent
+from context_cache import ContextCache
+from fake_backends import FakeStreamingModel
+from log_writer import LogWriter
+
+def rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+model = FakeStreamingModel(first_token_delay=0, chunk_delay=0)
+cache = ContextCache(model_factory=lambda model_name, static_prefix: model)
+log_dir = tempfile.mkdtemp()
+writer = LogWriter(log_dir, compress=False) if "{mode}" == "jsonl" else None
+
+def play(agent, call):
+    for turn in range({turns}):
+        model.reply = f"Ji, call {{call}} turn {{turn}}: demo Thursday ko 11 baje rakh lete hain, theek rahega?"
+        agent.generate_response(f"call {{call}} turn {{turn}}: haan, bataiye, demo ke baare mein aur details do")
+    return agent.get_scenario_prompt("aakhri sawaal")
+
+# Warm up imports, caches and the shared scheduler before measuring
+play(ColdCallAgent("{scenario}", context_cache=cache, log_writer=writer), -1)
+gc.collect()
+before = rss_kb()
+agents = [ColdCallAgent("{scenario}", context_cache=cache, log_writer=writer) for _ in range({sessions})]
+prompts = [play(agent, call) for call, agent in enumerate(agents)]
+gc.collect()
+after = rss_kb()
+kept = sum(len(agent.logger.turns.records) for agent in agents) / len(agents)
+print(json.dumps({{"per_session_kb": (after - before) / {sessions}, "turns_kept": kept,
+                  "last_prompt": prompts[-1]}}))
+"""
+
+
+def run_mode(args, mode):
+    """Run one mode in a new interpreter and return its JSON result, or None if it failed."""
+    snippet = SESSIONS_SNIPPET.format(mode=mode, scenario=args.scenario, sessions=args.sessions, turns=args.turns)
+    result = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"{mode} run failed")
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=40, help="exchanges played on every session")
+    parser.add_argument("--scenario", default="demo")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("json", "jsonl"):
+        results[mode] = run_mode(args, mode)
+        if results[mode] is None:
+            sys.exit(1)
+        print(f"{mode:<6} {results[mode]['per_session_kb']:7.1f} KB per session, "
+              f"{results[mode]['turns_kept']:.0f} turns kept in memory")
+
+    same = results["json"]["last_prompt"] == results["jsonl"]["last_prompt"]
+    print(f"{args.sessions} sessions x {args.turns} exchanges; prompts {'identical' if same else 'DIFFER'}")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Reply latency with and without speculation on partial transcripts.
+
+Feeds paced audio frames through the fake streaming recognizer, lets the
+SpeculativeResponder start the model request from partials, and measures
+the time from the final transcript to the reply being ready. Some finals
+differ from their partials to exercise misses. From the repo root:
+
+    python -m benchmarks.speculative_stt --turns 10
+"""
+import time
+import argparse
+from cold_call_agent import ColdCallAgent
+from fake_backends import FakeStreamingModel, FakeStreamingRecognizer
+from streaming_stt import SpeculativeResponder
+from metrics import latency_summary, format_latency_summary
+
+FRAME_SECONDS = 0.064
+TRAILING_SILENCE_SECONDS = 0.5
+
+UTTERANCES = [
+    ("abhi thoda busy hoon", None),
+    ("demo kitne time ka hoga", None),
+    ("kal subah gyarah baje chalega", "kal subah barah baje chalega"),
+    ("price kya hai", None),
+    ("theek hai bhej dijiye details", None)
+]
+
+
+def run_turn(agent, speculator, transcript, final_transcript):
+    """Stream one utterance and return the final-transcript-to-reply latency."""
+    recognizer = FakeStreamingRecognizer(transcript, final_transcript, frames_per_word=5)
+    recognizer.start()
+    frames = len(transcript.split()) * 5 + int(TRAILING_SILENCE_SECONDS / FRAME_SECONDS)
+    for _ in range(frames):
+        time.sleep(FRAME_SECONDS)
+        partial = recognizer.accept_frame(b"")
+        if partial and speculator:
+            speculator.on_partial(partial)
+
+    final = recognizer.finish()
+    start = time.perf_counter()
+    if speculator:
+        speculator.on_final(final)
+    else:
+        agent.generate_response(final)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--llm-delay", type=float, default=0.8)
+    args = parser.parse_args()
+
+    for name, speculate in (("baseline", False), ("speculative", True)):
+        agent = ColdCallAgent("demo", model=FakeStreamingModel(first_token_delay=args.llm_delay,
+                                                               chunk_delay=0))
+        speculator = SpeculativeResponder(agent) if speculate else None
+        latencies = []
+        for turn in range(args.turns):
+            transcript, final_transcript = UTTERANCES[turn % len(UTTERANCES)]
+            latencies.append(run_turn(agent, speculator, transcript, final_transcript))
+        print(f"{name:<12} reply latency: {format_latency_summary(latency_summary(latencies))}")
+        if speculator:
+            stats = speculator.stats()
+            print(f"{'':<12} speculation: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['time_saved']:.1f} s of model time saved")
+            speculator.close()
+
+
+if __name__ == "__main__":
+    main()
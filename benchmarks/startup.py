@@ -0,0 +1,90 @@
+"""Import time of the main modules and latency of the first agent and first reply.
+
+Each measurement runs in a fresh interpreter, so nothing is already
+imported or initialized. The first reply uses a fake model bound through a
+ContextCache, which is the path real agents take; the second agent shows
+that the model is shared rather than built again. From the repo root:
+
+    python -m benchmarks.startup --runs 5
+"""
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+
+MODULES = ["config", "cold_call_agent", "speech_processor", "call_engine", "cold_call_app", "server"]
+
+IMPORT_SNIPPET = """
+import time, json
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"import": time.perf_counter() - start}}))
+"""
+
+FIRST_CALL_SNIPPET = """
+import time, json
+start = time.perf_counter()
+from cold_call_agent import ColdCallAgent
+from context_cache import ContextCache
+from fake_backends import FakeStreamingModel
+imported = time.perf_counter()
+factory_calls = []
+
+def fake_prefix_model(model_name, static_prefix):
+    factory_calls.append(model_name)
+    return FakeStreamingModel(first_token_delay=0, chunk_delay=0)
+
+cache = ContextCache(model_factory=fake_prefix_model)
+agent = ColdCallAgent("payment", context_cache=cache)
+constructed = time.perf_counter()
+agent.generate_response("haan boliye")
+replied = time.perf_counter()
+ColdCallAgent("payment", context_cache=cache)
+second = time.perf_counter()
+print(json.dumps({{"import": imported - start, "first_agent": constructed - imported,
+                  "first_reply": replied - constructed, "second_agent": second - replied,
+                  "models_built": len(factory_calls)}}))
+"""
+
+
+def run_snippet(snippet):
+    """Run a snippet in a new interpreter and return its JSON result, or None if it failed."""
+    result = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median_runs(snippet, runs):
+    results = [run_snippet(snippet) for _ in range(runs)]
+    if any(result is None for result in results):
+        return None
+    return {key: statistics.median(result[key] for result in results) for key in results[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Import time, median of {args.runs} fresh interpreters:")
+    for module in MODULES:
+        timings = median_runs(IMPORT_SNIPPET.format(module=module), args.runs)
+        shown = f"{timings['import'] * 1000:7.1f} ms" if timings else "  unavailable (missing dependency)"
+        print(f"  {module:<17}{shown}")
+
+    timings = median_runs(FIRST_CALL_SNIPPET.format(), args.runs)
+    if timings is None:
+        print("First call: unavailable (missing dependency)")
+        return
+    print("First call with a fake model:")
+    print(f"  import agent     {timings['import'] * 1000:7.1f} ms")
+    print(f"  first agent      {timings['first_agent'] * 1000:7.1f} ms")
+    print(f"  first reply      {timings['first_reply'] * 1000:7.1f} ms")
+    print(f"  second agent     {timings['second_agent'] * 1000:7.1f} ms")
+    print(f"  models built     {timings['models_built']:7.0f}")
+
+
+if __name__ == "__main__":
+    main()
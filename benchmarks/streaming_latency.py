@@ -0,0 +1,49 @@
+"""Compare time-to-first-audio of the blocking and streaming response paths.
+
+Runs fully offline against the fake model and TTS. From the repo root:
+
+    python -m benchmarks.streaming_latency --turns 5
+"""
+import time
+import argparse
+from fake_backends import FakeStreamingModel, FakeTTS
+from streaming_pipeline import StreamingSpeaker
+
+
+def blocking_turn(model, tts):
+    """Generate the full reply, synthesize it, then play it."""
+    start = time.perf_counter()
+    text = model.generate_content("prompt").text
+    first_token = time.perf_counter() - start
+    audio = tts.synthesize(text)
+    first_audio = time.perf_counter() - start
+    tts.play_audio(audio)
+    return {"first_token": first_token, "first_audio": first_audio,
+            "total": time.perf_counter() - start, "sentences": 1}
+
+
+def streaming_turn(model, tts):
+    """Speak the reply sentence by sentence as it streams in."""
+    speaker = StreamingSpeaker(tts)
+    chunks = (chunk.text for chunk in model.generate_content("prompt", stream=True))
+    return speaker.speak_stream(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--first-token-delay", type=float, default=0.4)
+    parser.add_argument("--synth-delay", type=float, default=0.3)
+    parser.add_argument("--play-per-char", type=float, default=0.01)
+    args = parser.parse_args()
+
+    for name, run_turn in (("blocking", blocking_turn), ("streaming", streaming_turn)):
+        for turn in range(args.turns):
+            model = FakeStreamingModel(first_token_delay=args.first_token_delay)
+            tts = FakeTTS(synth_delay=args.synth_delay, play_per_char=args.play_per_char)
+            timing = run_turn(model, tts)
+            print(f"{name:<9} turn {turn + 1}: {StreamingSpeaker.format_timing(timing)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Cost of tracing spans, and a traced latency breakdown of simulated calls.
+
+Times span() with tracing off (the shared no-op tracer) and on, then runs
+calls through the CallEngine with stub backends and tracing enabled and
+prints the per-stage breakdown that `python tracing.py report` gives for
+real logs. From the repo root:
+
+    python -m benchmarks.tracing_overhead --calls 20
+"""
+import time
+import asyncio
+import argparse
+from call_engine import CallEngine, CallSession
+from cold_call_agent import ColdCallAgent
+from fake_backends import FakeStreamingModel, StubAudioInput, StubAudioOutput, StubSTT, StubTTS
+from tracing import Tracer, NULL_TRACER, activate, span, latency_breakdown, format_breakdown
+
+CALLER_UTTERANCES = ["haan boliye", "kaunsa invoice?", "agle hafte tak kar denge", "bye"]
+
+
+def span_cost(tracer, iterations):
+    """Mean seconds per `with span(...)` block on the given tracer."""
+    activate(tracer)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with span("stage"):
+            pass
+    elapsed = time.perf_counter() - start
+    tracer.take()
+    return elapsed / iterations
+
+
+async def traced_calls(args):
+    engine = CallEngine(StubSTT(args.stt_delay), StubTTS(args.tts_delay), save_logs=False)
+    sessions = []
+    outcome_model = FakeStreamingModel(reply="{}", first_token_delay=0, chunk_delay=0)
+    for call_id in range(args.calls):
+        agent = ColdCallAgent("payment", model=FakeStreamingModel(first_token_delay=args.llm_delay, chunk_delay=0),
+                              outcome_model=outcome_model)
+        agent.tracer = Tracer(agent.logger.call_id)
+        sessions.append(CallSession(call_id, agent, StubAudioInput(CALLER_UTTERANCES, 0.1),
+                                    StubAudioOutput(0.001)))
+    try:
+        await engine.run_calls(sessions)
+    finally:
+        engine.close()
+    return [(session.agent.logger.call_id, turn.spans, turn.clock_offset)
+            for session in sessions for turn in session.agent.logger.turns if turn.spans]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--llm-delay", type=float, default=0.4)
+    parser.add_argument("--stt-delay", type=float, default=0.15)
+    parser.add_argument("--tts-delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"span, tracing off: {span_cost(NULL_TRACER, args.iterations) * 1e9:.0f} ns")
+    print(f"span, tracing on:  {span_cost(Tracer(), args.iterations) * 1e9:.0f} ns")
+    print(format_breakdown(latency_breakdown(asyncio.run(traced_calls(args)))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Stress test of the GUI's batched update queue.
+
+Worker threads push log lines (and some status updates) into a UIQueue at
+a fixed total rate while the Tk main loop drains it on its timer. The
+report shows how long workers spend in log(), how late a 10 ms main-loop
+heartbeat fires (UI responsiveness), the drain batches, and the lines
+left in the widget. It first compares writing lines one at a time, like
+the old log_message, with one batched insert. The script exits non-zero
+if the widget exceeds its line cap, the queue is not drained or the
+heartbeat stalls. It needs a display. From the repo root:
+
+    python -m benchmarks.ui_stress --threads 8 --rate 5000 --seconds 5
+"""
+import sys
+import time
+import argparse
+import threading
+import tkinter as tk
+from tkinter import scrolledtext
+from metrics import latency_summary, format_latency_summary
+from ui_queue import UIQueue
+
+HEARTBEAT_MS = 10
+
+
+def line_write_cost(root, widget, lines):
+    """Seconds per line for per-line writes and for the UIQueue's batched write."""
+    start = time.perf_counter()
+    for i in range(lines):
+        widget.config(state=tk.NORMAL)
+        widget.insert(tk.END, f"per-line {i}\n")
+        widget.see(tk.END)
+        widget.config(state=tk.DISABLED)
+    widget.update_idletasks()
+    per_line = (time.perf_counter() - start) / lines
+
+    ui = UIQueue(root, widget, max_log_lines=lines * 2)
+    for i in range(lines):
+        ui.log(f"batched {i}")
+    start = time.perf_counter()
+    ui.drain()
+    widget.update_idletasks()
+    batched = (time.perf_counter() - start) / lines
+
+    widget.config(state=tk.NORMAL)
+    widget.delete("1.0", tk.END)
+    widget.config(state=tk.DISABLED)
+    return per_line, batched
+
+
+def worker(ui, index, rate, stop, put_latencies, label):
+    """Log `rate` lines per second, in 1 ms slices, until stopped; records the time spent in log()."""
+    latencies = []
+    sent = 0
+    start = time.perf_counter()
+    while not stop.is_set():
+        due = int((time.perf_counter() - start) * rate)
+        while sent < due:
+            t = time.perf_counter()
+            ui.log(f"[worker {index}] turn event {sent}: partial transcript, timings and cache stats")
+            latencies.append(time.perf_counter() - t)
+            sent += 1
+            if sent % 250 == 0:
+                ui.call(label.config, text=f"worker {index}: {sent} events")
+        time.sleep(0.001)
+    put_latencies.extend(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rate", type=int, default=5000, help="log events per second across all threads")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--interval-ms", type=int, default=50)
+    parser.add_argument("--max-lines", type=int, default=1000)
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Tk unavailable ({e}); run this benchmark with a display.")
+        sys.exit(1)
+    root.title("UI stress test")
+    label = tk.Label(root, text="starting")
+    label.pack()
+    log_text = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=80, height=20)
+    log_text.pack(fill=tk.BOTH, expand=True)
+    log_text.config(state=tk.DISABLED)
+    root.update()
+
+    per_line, batched = line_write_cost(root, log_text, 2000)
+    print(f"writing 2000 lines: per-line {per_line * 1e6:.0f} us/line, batched {batched * 1e6:.0f} us/line")
+
+    ui = UIQueue(root, log_text, interval_ms=args.interval_ms, max_log_lines=args.max_lines)
+    stop = threading.Event()
+    put_latencies = []
+    heartbeat_lateness = []
+    threads = [threading.Thread(target=worker, args=(ui, i, args.rate / args.threads, stop, put_latencies, label),
+                                daemon=True)
+               for i in range(args.threads)]
+
+    def heartbeat(expected):
+        now = time.perf_counter()
+        heartbeat_lateness.append(max(0.0, now - expected))
+        if not stop.is_set():
+            root.after(HEARTBEAT_MS, heartbeat, now + HEARTBEAT_MS / 1000)
+
+    def finish():
+        stop.set()
+        for thread in threads:
+            thread.join()
+        # Let the timer drain whatever is still queued, then quit
+        wait_for_backlog(time.perf_counter() + 5)
+
+    def wait_for_backlog(give_up_at):
+        if ui.queue.empty() or time.perf_counter() > give_up_at:
+            root.quit()
+        else:
+            root.after(args.interval_ms, wait_for_backlog, give_up_at)
+
+    ui.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    root.after(HEARTBEAT_MS, heartbeat, start + HEARTBEAT_MS / 1000)
+    root.after(int(args.seconds * 1000), finish)
+    root.mainloop()
+    elapsed = time.perf_counter() - start
+    ui.stop()
+
+    stats = ui.stats()
+    lines = int(log_text.index("end-1c").split(".")[0]) - 1
+    root.destroy()
+    lateness = latency_summary(heartbeat_lateness)
+    print(f"{len(put_latencies)} events from {args.threads} threads in {elapsed:.1f} s "
+          f"({len(put_latencies) / elapsed:.0f}/s)")
+    print(f"  log() call:      {format_latency_summary(latency_summary(put_latencies), 'us')} "
+          f"max={max(put_latencies) * 1e6:.0f} us")
+    print(f"  heartbeat delay: {format_latency_summary(lateness)}")
+    print(f"  drains:          {stats['batches']} batches, largest {stats['largest_batch']}, "
+          f"{stats['drain_ms']:.1f} ms each; {stats['lines_skipped']} lines skipped over the cap")
+    print(f"  widget:          {lines} lines (cap {args.max_lines}), backlog {stats['backlog']}")
+
+    ok = lines <= args.max_lines and stats["backlog"] == 0 and lateness["p99"] < 0.25
+    print("ok" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
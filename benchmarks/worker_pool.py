@@ -0,0 +1,121 @@
+"""Calls per second of the multi-process CallSupervisor against worker count.
+
+Each worker runs a CallEngine with CPU-bound local fakes: synthesis
+generates the reply's samples in Python and recognition makes energy
+passes over the caller's audio, both holding the GIL. The model is a
+stub with a short fixed delay. Caller and reply audio move through shared
+memory. A final run kills a worker mid-run and checks that every call
+still finishes and every logged call has its end record. The script exits
+non-zero if that check fails. From the repo root:
+
+    python -m benchmarks.worker_pool --workers 1,2,4 --calls 24
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+import tempfile
+import functools
+from call_engine import CallEngine
+from cold_call_agent import ColdCallAgent
+from fake_backends import CPUBoundSTT, CPUBoundTTS, FakeStreamingModel, utterance_pcm
+from log_writer import LogWriter, iter_log_records
+from metrics import format_latency_summary
+from worker_pool import CallSupervisor
+
+CALLER_UTTERANCES = ["haan boliye", "abhi thoda busy hoon", "demo kitne time ka hoga",
+                     "theek hai kal subah chalega", "bye"]
+
+
+def fake_worker(stt_passes, llm_delay):
+    """Worker setup: CPU-bound speech fakes and a stub model shared by the worker's agents."""
+    engine = CallEngine(CPUBoundSTT(stt_passes), CPUBoundTTS(), max_concurrent_llm=64)
+    model = FakeStreamingModel(first_token_delay=llm_delay, chunk_delay=0)
+    outcome_model = FakeStreamingModel(reply="{}", first_token_delay=0, chunk_delay=0)
+
+    def make_agent(scenario, record, log_writer):
+        return ColdCallAgent(scenario, model=model, outcome_model=outcome_model, record=record,
+                             log_writer=log_writer)
+    return engine, make_agent
+
+
+def submit_calls(supervisor, calls, first_id=0):
+    clips = [utterance_pcm(text) for text in CALLER_UTTERANCES]
+    return [supervisor.submit(f"call-{call_id}", "demo", clips, opening="Namaste, main Parul bol rahi hoon.")
+            for call_id in range(first_id, first_id + calls)]
+
+
+def run(args, workers, log_dir):
+    writer = LogWriter(log_dir, compress=False)
+    supervisor = CallSupervisor(functools.partial(fake_worker, args.stt_passes, args.llm_delay), workers=workers,
+                                log_writer=writer)
+    supervisor.start()
+    # Warm up: let every worker import and build its backends before timing
+    for future in submit_calls(supervisor, workers * 2, first_id=10 ** 6):
+        future.result()
+    start = time.perf_counter()
+    results = [future.result() for future in submit_calls(supervisor, args.calls)]
+    elapsed = time.perf_counter() - start
+    stats = supervisor.stats()
+    supervisor.close()
+    writer.close()
+    return results, elapsed, stats
+
+
+def crash_run(args, log_dir):
+    """Kill a worker while it has calls in flight; every call must still finish."""
+    writer = LogWriter(log_dir, compress=False)
+    supervisor = CallSupervisor(functools.partial(fake_worker, args.stt_passes, args.llm_delay), workers=2,
+                                log_writer=writer, log_callback=lambda message: print(f"  {message}"))
+    supervisor.start()
+    futures = submit_calls(supervisor, args.calls)
+    while supervisor.stats()["calls"] < args.calls // 4:
+        time.sleep(0.05)
+    os.kill(supervisor.processes[0].pid, signal.SIGKILL)
+    results = [future.result() for future in futures]
+    stats = supervisor.stats()
+    supervisor.close()
+    writer.close()
+
+    started, ended = set(), set()
+    for name in os.listdir(log_dir):
+        for record in iter_log_records(os.path.join(log_dir, name)):
+            if record["type"] == "start":
+                started.add(record["call_id"])
+            elif record["type"] == "end":
+                ended.add(record["call_id"])
+    finished = sum(1 for result in results if result["outcome"] == "hangup" or result["outcome"] == "ended_by_user")
+    print(f"  {finished}/{args.calls} calls finished, {stats['restarts']} restarts, {stats['retries']} calls retried, "
+          f"{len(started)} calls logged, {len(started - ended)} without an end record")
+    return finished == args.calls and stats["restarts"] >= 1 and started == ended
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--calls", type=int, default=24)
+    parser.add_argument("--stt-passes", type=int, default=2)
+    parser.add_argument("--llm-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU cores")
+    baseline = None
+    for workers in map(int, args.workers.split(",")):
+        with tempfile.TemporaryDirectory() as log_dir:
+            results, elapsed, stats = run(args, workers, log_dir)
+        rate = len(results) / elapsed
+        baseline = baseline or rate
+        print(f"{workers} worker{'s' if workers > 1 else ''}: {rate:5.1f} calls/s ({rate / baseline:.1f}x), "
+              f"{stats['cpu_seconds']:.1f} s CPU in workers, calls per worker {stats['worker_calls']}")
+        print(f"  turn {format_latency_summary(stats['turn_latency'])}, {stats['log_records']} log records")
+
+    print("worker crash:")
+    with tempfile.TemporaryDirectory() as log_dir:
+        ok = crash_run(args, log_dir)
+    print(f"  {'ok' if ok else 'FAILED'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Load generator for the WebSocket call server: many concurrent scripted callers.
+
+Each client opens a call, then for every scripted utterance either sends it
+as a text message or streams a synthetic speech clip as real-time PCM, and
+measures reply latency (end of the caller's turn -> first agent audio).
+Start a server first, e.g. `python server.py --fake`, then from the repo root:
+
+    python -m benchmarks.ws_load --url ws://localhost:8765 --clients 200
+    python -m benchmarks.ws_load --clients 50 --audio
+"""
+import json
+import time
+import asyncio
+import argparse
+import websockets
+from benchmarks.audio_fixtures import synthesize_segments, SAMPLE_RATE
+from metrics import latency_summary, format_latency_summary
+
+UTTERANCES = ["haan boliye", "kaunsa invoice?", "agle hafte tak kar denge", "bye"]
+CHUNK_SECONDS = 0.1
+
+
+async def next_audio(websocket):
+    """Wait for the next binary (audio) message, skipping events."""
+    while True:
+        message = await websocket.recv()
+        if isinstance(message, bytes):
+            return message
+
+
+async def send_speech(websocket, pcm, realtime):
+    chunk = int(SAMPLE_RATE * CHUNK_SECONDS) * 2
+    for i in range(0, len(pcm), chunk):
+        await websocket.send(pcm[i:i + chunk])
+        if realtime:
+            await asyncio.sleep(CHUNK_SECONDS)
+
+
+async def run_client(args, speech, silence, latencies, outcomes):
+    try:
+        async with websockets.connect(args.url, max_size=2 ** 22) as websocket:
+            await websocket.send(json.dumps({"type": "start", "scenario": args.scenario}))
+            await next_audio(websocket)  # opening line
+            if args.audio:
+                # Background noise first, so the server can calibrate its VAD
+                await send_speech(websocket, silence, args.realtime)
+            for text in UTTERANCES[:-1]:
+                if args.audio:
+                    await send_speech(websocket, speech + silence, args.realtime)
+                    # The caller stops speaking before the trailing silence
+                    turn_end = time.perf_counter() - (len(silence) / 2 / SAMPLE_RATE
+                                                      if args.realtime else 0)
+                else:
+                    await websocket.send(json.dumps({"type": "text", "text": text}))
+                    turn_end = time.perf_counter()
+                await next_audio(websocket)
+                latencies.append(time.perf_counter() - turn_end)
+            await websocket.send(json.dumps({"type": "text", "text": UTTERANCES[-1]}))
+            async for message in websocket:
+                if isinstance(message, str) and json.loads(message).get("type") == "ended":
+                    outcome = json.loads(message)["outcome"]
+                    outcomes[outcome] = outcomes.get(outcome, 0) + 1
+                    break
+    except (OSError, websockets.WebSocketException) as e:
+        outcomes[type(e).__name__] = outcomes.get(type(e).__name__, 0) + 1
+
+
+async def run_load(args):
+    speech = synthesize_segments([("speech", 1.0)]).tobytes()
+    silence = synthesize_segments([("noise", 0.8)]).tobytes()
+    latencies, outcomes = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(args, speech, silence, latencies, outcomes)
+                           for _ in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    print(f"{args.clients} concurrent calls in {elapsed:.1f} s "
+          f"({args.clients / elapsed:.1f} calls/s), outcomes {outcomes}")
+    print(f"Reply latency: {format_latency_summary(latency_summary(latencies))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://localhost:8765")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--scenario", default="payment", choices=["demo", "interview", "payment"])
+    parser.add_argument("--audio", action="store_true", help="stream PCM instead of sending text turns")
+    parser.add_argument("--realtime", action="store_true", help="pace audio like a live caller")
+    asyncio.run(run_load(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
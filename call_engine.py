@@ -0,0 +1,139 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from cold_call_agent import END_CALL_PHRASES
+from tracing import activate, span
+
+
+class CallSession:
+    """A single headless call: one agent plus its async audio input and output.
+
+    audio_input.read_utterance() returns the caller's next utterance as audio
+    (or None when the caller hangs up) and audio_output.play(audio) plays the
+    agent's synthesized reply. on_event, if given, is awaited with transcript
+    events as the call progresses. A PreGenerator, if given, prepares likely
+    next replies while the agent speaks; its requests are not counted
+    against the engine's LLM concurrency limit.
+    """
+
+    def __init__(self, call_id, agent, audio_input, audio_output, opening=None, max_turns=20,
+                 on_event=None, pregenerator=None):
+        self.call_id = call_id
+        self.agent = agent
+        self.audio_input = audio_input
+        self.audio_output = audio_output
+        self.opening = opening
+        self.max_turns = max_turns
+        self.on_event = on_event
+        self.pregenerator = pregenerator
+        self.turn_latencies = []
+        self.outcome = None
+        # Future of the log file, saved in the background once the call's outcomes are extracted
+        self.log_saved = None
+
+
+class CallEngine:
+    """Runs many ColdCallAgent sessions concurrently on one asyncio loop.
+
+    Speech recognition and synthesis go through shared async backends
+    (stt.transcribe(audio), tts.synthesize(text)). The blocking Gemini call
+    runs on a thread pool, and a semaphore bounds how many requests are in
+    flight toward the LLM at once.
+    """
+
+    def __init__(self, stt, tts, max_concurrent_llm=8, save_logs=True, log_callback=None):
+        self.stt = stt
+        self.tts = tts
+        self.max_concurrent_llm = max_concurrent_llm
+        self.save_logs = save_logs
+        self.log_callback = log_callback
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_llm,
+                                           thread_name_prefix="llm")
+        self._llm_slots = None
+
+    async def generate(self, agent, user_input):
+        """Run agent.generate_response off the loop under the LLM concurrency limit."""
+        if self._llm_slots is None:
+            self._llm_slots = asyncio.Semaphore(self.max_concurrent_llm)
+        async with self._llm_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, agent.generate_response, user_input)
+
+    async def emit(self, session, speaker, text):
+        """Send a transcript event to the session's listener, if any."""
+        if session.on_event:
+            await session.on_event({"type": "transcript", "speaker": speaker, "text": text})
+
+    async def say(self, session, text):
+        """Synthesize and play text on a session's audio output."""
+        with span("tts"):
+            audio = await self.tts.synthesize(text)
+        with span("playback"):
+            await session.audio_output.play(audio)
+
+    async def run_call(self, session):
+        """Drive one call until hang-up, an end phrase or the turn limit."""
+        # Each call runs in its own task, so its tracer is current only for this call
+        activate(session.agent.tracer)
+        try:
+            if session.opening:
+                await self.emit(session, "ai", session.opening)
+                if session.pregenerator:
+                    session.pregenerator.start()
+                await self.say(session, session.opening)
+                # The opening line is not part of any turn
+                session.agent.tracer.take()
+
+            session.outcome = "max_turns"
+            for _ in range(session.max_turns):
+                audio = await session.audio_input.read_utterance()
+                if audio is None:
+                    session.outcome = "hangup"
+                    break
+
+                # Turn latency: caller stops speaking -> agent audio starts
+                turn_start = time.perf_counter()
+                with span("stt"):
+                    user_input = (await self.stt.transcribe(audio)).lower()
+                if user_input:
+                    await self.emit(session, "user", user_input)
+                if user_input in END_CALL_PHRASES:
+                    session.outcome = "ended_by_user"
+                    break
+                if not user_input:
+                    continue
+
+                ai_response = None
+                if session.pregenerator:
+                    loop = asyncio.get_running_loop()
+                    ai_response = await loop.run_in_executor(self.executor, session.pregenerator.take,
+                                                             user_input)
+                if not ai_response:
+                    ai_response = await self.generate(session.agent, user_input)
+                await self.emit(session, "ai", ai_response)
+                with span("tts"):
+                    reply_audio = await self.tts.synthesize(ai_response)
+                session.turn_latencies.append(time.perf_counter() - turn_start)
+                if session.pregenerator:
+                    session.pregenerator.start()
+                with span("playback"):
+                    await session.audio_output.play(reply_audio)
+                session.agent.finish_turn()
+        except Exception as e:
+            session.outcome = "error"
+            if self.log_callback:
+                self.log_callback(f"Call {session.call_id} failed: {str(e)}")
+        finally:
+            if session.pregenerator:
+                session.pregenerator.close()
+            if self.save_logs:
+                session.log_saved = session.agent.end_conversation(session.outcome)
+        return session
+
+    async def run_calls(self, sessions):
+        """Run all sessions concurrently and return them once every call ends."""
+        return await asyncio.gather(*(self.run_call(session) for session in sessions))
+
+    def close(self):
+        """Release the LLM thread pool."""
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import asyncio
+
+
+class Campaign:
+    """Dials through a contact list with a CallEngine.
+
+    contacts is an iterable of (index, record) pairs, such as
+    scenario_data.iter_contacts(); it is consumed lazily by `concurrency`
+    workers, so the list is never copied per call. make_session(index, record)
+    returns the CallSession for one contact. Calls that end with an "error"
+    outcome are retried up to max_retries times with exponential backoff,
+    and call starts are spaced to stay under calls_per_minute.
+
+    Each finished contact is appended to the checkpoint file (JSON lines),
+    and contacts already in it are skipped, so an interrupted campaign
+    resumes where it stopped.
+    """
+
+    def __init__(self, engine, make_session, concurrency=4, max_retries=2, retry_delay=1.0,
+                 calls_per_minute=None, checkpoint_path=None, log_callback=None):
+        self.engine = engine
+        self.make_session = make_session
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.calls_per_minute = calls_per_minute
+        self.checkpoint_path = checkpoint_path
+        self.log_callback = log_callback
+        self.results = {}
+        self._next_start = 0.0
+        self._rate_lock = None
+        self._remaining = None
+        self.load_checkpoint()
+
+    def load_checkpoint(self):
+        """Read the outcomes of contacts finished in earlier runs."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    # A run killed mid-write can leave a partial last line
+                    continue
+                self.results[result["index"]] = result
+        if self.log_callback:
+            self.log_callback(f"Resuming campaign: {len(self.results)} contacts already done")
+
+    def _checkpoint(self, result):
+        if not self.checkpoint_path:
+            return
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    async def _wait_for_start(self):
+        """Space call starts evenly to respect calls_per_minute."""
+        if not self.calls_per_minute:
+            return
+        async with self._rate_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + 60.0 / self.calls_per_minute
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    async def call(self, index, record):
+        """Call one contact, retrying failed attempts, and record the outcome."""
+        started = time.time()
+        for attempt in range(1, self.max_retries + 2):
+            await self._wait_for_start()
+            session = None
+            try:
+                session = self.make_session(index, record)
+                await self.engine.run_call(session)
+                outcome = session.outcome
+            except Exception as e:
+                outcome = "error"
+                if self.log_callback:
+                    self.log_callback(f"Contact {index} could not be called: {str(e)}")
+            if outcome != "error" or attempt > self.max_retries:
+                break
+            await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+        result = {
+            "index": index,
+            "name": record.get("customer", {}).get("name"),
+            "outcome": outcome,
+            "attempts": attempt,
+            "turns": len(session.turn_latencies) if session else 0,
+            "started": started,
+            "duration": round(time.time() - started, 3)
+        }
+        self.results[index] = result
+        self._checkpoint(result)
+        return result
+
+    async def _worker(self, contacts):
+        for index, record in contacts:
+            if index in self.results:
+                continue
+            if self._remaining is not None:
+                if self._remaining <= 0:
+                    return
+                self._remaining -= 1
+            await self.call(index, record)
+
+    async def run(self, contacts, limit=None):
+        """Call every pending contact, at most `limit` of them, and return a report."""
+        self._rate_lock = asyncio.Lock()
+        self._remaining = limit
+        done_before = len(self.results)
+        contacts = iter(contacts)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(self._worker(contacts) for _ in range(self.concurrency)))
+        return self.report(len(self.results) - done_before, time.perf_counter() - start)
+
+    def report(self, calls, elapsed):
+        """Summarize this run's throughput and the outcomes of all contacts so far."""
+        outcomes = {}
+        for result in self.results.values():
+            outcomes[result["outcome"]] = outcomes.get(result["outcome"], 0) + 1
+        return {
+            "calls": calls,
+            "elapsed": elapsed,
+            "calls_per_minute": calls * 60.0 / elapsed if elapsed else 0.0,
+            "contacts_done": len(self.results),
+            "retries": sum(result["attempts"] - 1 for result in self.results.values()),
+            "outcomes": outcomes
+        }
+
+    @staticmethod
+    def format_report(report):
+        return (f"{report['calls']} calls in {report['elapsed']:.1f} s "
+                f"({report['calls_per_minute']:.1f} calls/min), "
+                f"{report['contacts_done']} contacts done, {report['retries']} retries, "
+                f"outcomes {report['outcomes']}")
@@ -1,121 +1,142 @@
-import os
-import json
-import random
 import time
-import google.generativeai as genai
+from concurrent.futures import Future
+from config import GEMINI_MODEL_NAME, LLM_FALLBACK_BACKEND, LLM_FALLBACK_MODEL_NAME
 from conversation_logger import ConversationLogger
-from dotenv import load_dotenv
+from prompt_builder import PromptBuilder
+from context_cache import get_context_cache, usage_tokens
+from llm_scheduler import get_llm_scheduler
+from outcome_extractor import OutcomeTracker
+from response_cache import TEMPLATE_FIELDS
+from scenario_data import load_scenario_file, scenario_record, contact_fields
+from tracing import new_tracer
 
+OPENING_MESSAGES = {
+    "demo": "Namaskar! Main Parul Sharma bol rahi hoon TechSolutions se. Kya main aapse baat kar sakta hoon ERP system ke demo ke baare mein?",
+    "interview": "Namaste! Main Priya Patel, HR manager. Aapka interview schedule kiya hai Software Engineer position ke liye. Kya abhi baat karna convenient hai?",
+    "payment": "Namaste! Main Amita Kumari accounts department se baat kar rahi hoon. Aapke payment ke regarding follow up karna tha."
+}
+DEFAULT_OPENING_MESSAGE = "Namaste! Main Apki kaise help kar sakti hoon?"
 
-# Load API keys and configurations from .env
-load_dotenv()
+CLOSING_MESSAGES = {
+    "demo": "Thank you for your time! Main jaldi hi aapse demo scheduling ke liye contact karunga. Have a nice day!",
+    "interview": "Interview ke liye dhanyavaad. Humari team aapko result ke baare mein jald hi contact karegi.",
+    "payment": "Baat karne ke liye dhanyavaad. Payment update ke liye wait kar rahe hain. Shubh din!"
+}
+DEFAULT_CLOSING_MESSAGE = "Dhanyavaad! Have a nice day!"
 
-# Configuration variables - move API keys to .env
-GEMINI_API_KEY = "XXXXXXXXXXXXXXXXXXXXX"
-# Configure Gemini API
-genai.configure(api_key=GEMINI_API_KEY)
+FALLBACK_RESPONSES = {
+    "demo": "Aapka time dene ke liye dhanyavaad. Kya main aapko ERP demo ke baare mein kuch bata sakta hoon?",
+    "interview": "Aapka interview process mein aane ke liye dhanyavaad. Kya aap apne experience ke baare mein bata sakte hain?",
+    "payment": "Namaste, main accounts se baat kar raha hoon. Kya aap payment status update kar sakte hain?"
+}
+DEFAULT_FALLBACK_RESPONSE = "Sorry, main aapki help kaise kar sakta hoon?"
 
-SPEECH_RECOGNITION_LANGUAGE = os.getenv("SPEECH_RECOGNITION_LANGUAGE", "en-IN")
-TEXT_TO_SPEECH_LANGUAGE = os.getenv("TEXT_TO_SPEECH_LANGUAGE", "en-IN")
-TEXT_TO_SPEECH_TLD = os.getenv("TEXT_TO_SPEECH_TLD", "co.in")
+END_CALL_PHRASES = ("bye", "goodbye", "end call", "stop", "end", "quit", "exit")
+
+
+def scripted_phrases():
+    """Return every fixed opening, closing and fallback line the agent can say."""
+    phrases = []
+    for messages in (OPENING_MESSAGES, CLOSING_MESSAGES, FALLBACK_RESPONSES):
+        phrases.extend(messages.values())
+    phrases.extend([DEFAULT_OPENING_MESSAGE, DEFAULT_CLOSING_MESSAGE, DEFAULT_FALLBACK_RESPONSE])
+    return phrases
 
 
 class ColdCallAgent:
     """AI agent for conducting cold calls in Hinglish."""
     
-    def __init__(self, scenario, log_callback=None):
+    def __init__(self, scenario, log_callback=None, model=None, context_cache=None,
+                 response_cache=None, record=None, scheduler=None, fallback_model=None, log_writer=None,
+                 outcome_model=None):
         self.scenario = scenario
-        self.model = genai.GenerativeModel("gemini-1.5-pro")
-        self.conversation_history = []
         self.log_callback = log_callback
-        self.logger = ConversationLogger(scenario)
+        self.response_cache = response_cache
+        # Every model request goes through the process-wide scheduler
+        self.scheduler = scheduler or get_llm_scheduler()
+        self._fallback_model = fallback_model
+        self.logger = ConversationLogger(scenario, writer=log_writer)
+        # The prompt history is the logger's list of turns, so each turn's text is stored once
+        self.conversation_history = self.logger.turns
+        self.tracer = new_tracer(self.logger.call_id)
         
         # Load scenario-specific data
-        self.load_scenario_data()
-        
-    def load_scenario_data(self):
-        """Load data specific to the selected scenario."""
-        # Default data for each scenario
-        self.customer_data = {
-            "name": "Customer",
-            "company": "ABC Corp",
-            "interest": "ERP system",
-            "email": "customer@example.com",
-            "phone": "+91 98765 43210",
-            "location": "Mumbai"
-        }
-
-        self.job_data = {
-            "position": "Software Engineer",
-            "skills": "Python, React, Cloud",
-            "experience": "3-5 years",
-            "salary": "30-35 LPA",
-            "location": "Bangalore",
-            "work_type": "Hybrid"
-        }
-
-        self.invoice_data = {
-            "amount": "13,50,000",
-            "days_late": "25",
-            "invoice_number": "INV-2023-045",
-            "due_date": "15th March 2025",
-            "payment_options": "UPI, NEFT, Cheque"
-        }
-
-        # Load custom data if available
-        try:
-            scenario_file = f"data/{self.scenario}_data.json"
-            if os.path.exists(scenario_file):
-                with open(scenario_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                if "customer" in data:
-                    if isinstance(data["customer"], list) and data["customer"]:
-                        self.customer_data.update(data["customer"][0])
-                    else:
-                        self.customer_data.update(data["customer"])
-
-                if "job" in data:
-                    if isinstance(data["job"], list) and data["job"]:
-                        self.job_data.update(data["job"][0])
-                    else:
-                        self.job_data.update(data["job"])
-
-                if "invoice" in data:
-                    if isinstance(data["invoice"], list) and data["invoice"]:
-                        self.invoice_data.update(data["invoice"][0])
-                    else:
-                        self.invoice_data.update(data["invoice"])
+        self.load_scenario_data(record)
+        self.prompt_builder = PromptBuilder(scenario, self.customer_data, self.job_data, self.invoice_data)
+        
+        # Bind the static preamble to a shared model so each turn only sends the dynamic suffix.
+        # An explicitly passed model gets the full prompt every turn.
+        if model is not None and context_cache is None:
+            self.model = model
+            self.prefix_cached = False
+        else:
+            context_cache = context_cache or get_context_cache()
+            self.model = context_cache.get_model(GEMINI_MODEL_NAME, self.prompt_builder.static_block)
+            self.prefix_cached = True
+        
+        # Outcome fields are extracted in the background after each turn, by outcome_model
+        # or else the model configured for extraction (none: rules only)
+        self.outcomes = OutcomeTracker(scenario, self.job_data, model=outcome_model, log_callback=log_callback)
+        
+    def load_scenario_data(self, record=None):
+        """Load data specific to the selected scenario.
 
+        record is one contact as {"customer": ..., "job": ..., "invoice": ...};
+        its fields override the defaults.
+        """
+        if record is None:
+            # Without an explicit contact, use the first one in the scenario data file
+            try:
+                data = load_scenario_file(self.scenario)
+                if data is not None:
+                    record = scenario_record(data)
+                    if self.log_callback:
+                        self.log_callback(f"Loaded custom data for {self.scenario} scenario")
+            except Exception as e:
                 if self.log_callback:
-                    self.log_callback(f"Loaded custom data for {self.scenario} scenario")
-        except Exception as e:
-            if self.log_callback:
-                self.log_callback(f"Could not load scenario data: {str(e)}")
+                    self.log_callback(f"Could not load scenario data: {str(e)}")
+
+        # Read-only views over the shared defaults; nothing is copied per agent
+        self.customer_data = contact_fields(record, "customer")
+        self.job_data = contact_fields(record, "job")
+        self.invoice_data = contact_fields(record, "invoice")
     
-    def generate_response(self, user_input):
-        """Generate AI response based on user input with context handling."""
+    def generate_response(self, user_input, prompt=None):
+        """Generate AI response based on user input with context handling.
+        
+        A prompt already built by preview_prompt for this input can be passed
+        in to skip rebuilding it.
+        """
         if self.log_callback:
             self.log_callback("Thinking...")
         
+        state = self.dialogue_state()
+        
         # Add user input to conversation history
         if user_input:
-            self.conversation_history.append(f"User: {user_input}")
             self.logger.log_turn("user", user_input)
         
+        cached_response = self.cached_response(user_input, state)
+        if cached_response:
+            self.logger.log_turn("ai", cached_response)
+            return cached_response
+        
         # Get the prompt template based on the scenario
-        prompt = self.get_scenario_prompt(user_input)
+        if prompt is None:
+            with self.tracer.span("prompt_build"):
+                prompt = self.get_scenario_prompt(user_input)
         
         try:
             # Generate a response using the Gemini model
-            response = self.model.generate_content(prompt)
+            with self.tracer.span("llm"):
+                response = self.request(prompt)
             ai_response = response.text if response.text else "Sorry, I couldn't generate a response."
             
             # Clean the response text
-            ai_response = ai_response.replace("AI:", "").replace("Agent:", "").strip()
+            ai_response = self.clean_response(ai_response)
             
-            self.conversation_history.append(f"AI: {ai_response}")
-            self.logger.log_turn("ai", ai_response)
+            self.logger.log_turn("ai", ai_response, tokens=usage_tokens(response))
+            self.store_response(user_input, state, ai_response)
             
             return ai_response
             
@@ -124,122 +145,190 @@ class ColdCallAgent:
             if self.log_callback:
                 self.log_callback(f"{error_msg}")
             
-            fallback_responses = {
-                "demo": "Aapka time dene ke liye dhanyavaad. Kya main aapko ERP demo ke baare mein kuch bata sakta hoon?",
-                "interview": "Aapka interview process mein aane ke liye dhanyavaad. Kya aap apne experience ke baare mein bata sakte hain?",
-                "payment": "Namaste, main accounts se baat kar raha hoon. Kya aap payment status update kar sakte hain?"
-            }
+            return self.fallback_response()
+    
+    def generate_response_stream(self, user_input):
+        """Yield the AI response in text chunks as the model streams it."""
+        if self.log_callback:
+            self.log_callback("Thinking...")
+        
+        state = self.dialogue_state()
+        
+        if user_input:
+            self.logger.log_turn("user", user_input)
+        
+        chunks = []
+        tokens = None
+        cached_response = self.cached_response(user_input, state)
+        
+        try:
+            if cached_response:
+                chunks.append(cached_response)
+                yield cached_response
+                return
             
-            return fallback_responses.get(self.scenario, "Sorry, main aapki help kaise kar sakta hoon?")
+            with self.tracer.span("prompt_build"):
+                prompt = self.get_scenario_prompt(user_input)
+            try:
+                with self.tracer.span("llm", stream=True) as llm_span:
+                    llm_start = time.monotonic()
+                    for chunk in self.scheduler.stream(self.model, prompt, fallback=self.fallback_model):
+                        # Usage is reported on the stream's chunks; the last one has the totals
+                        tokens = usage_tokens(chunk) or tokens
+                        text = chunk.text.replace("AI:", "").replace("Agent:", "")
+                        if not chunks:
+                            text = text.lstrip()
+                            llm_span.set("first_token", time.monotonic() - llm_start)
+                        if text:
+                            chunks.append(text)
+                            yield text
+                self.store_response(user_input, state, "".join(chunks).strip())
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"Error generating response: {str(e)}")
+                if not chunks:
+                    yield self.fallback_response()
+        finally:
+            # Also runs when the consumer stops early, e.g. when the caller barges in
+            ai_response = "".join(chunks).strip()
+            if ai_response:
+                self.logger.log_turn("ai", ai_response, tokens=tokens)
+    
+    def request(self, prompt):
+        """Send a prompt through the scheduler, falling back to the cheaper model while the primary one fails."""
+        return self.scheduler.generate(self.model, prompt, fallback=self.fallback_model)
+    
+    def fallback_model(self):
+        """The cheaper or local model used while the primary one keeps failing, bound to the same preamble."""
+        if self._fallback_model is None:
+            static_prefix = self.prompt_builder.static_block if self.prefix_cached else ""
+            self._fallback_model = get_context_cache(LLM_FALLBACK_BACKEND).get_model(LLM_FALLBACK_MODEL_NAME,
+                                                                                    static_prefix)
+        return self._fallback_model
+    
+    def finish_turn(self):
+        """Attach the spans traced since the last turn to the latest logged turn and queue outcome extraction."""
+        self.logger.attach_spans(self.tracer.take(), self.tracer.clock_offset)
+        self.outcomes.update(self.conversation_history)
+    
+    def finish_outcomes(self):
+        """Start extracting outcomes from the remaining turns; returns a Future of the results."""
+        self.finish_turn()
+        return self.outcomes.finish()
+    
+    def dialogue_state(self):
+        """Coarse position in the call (exchanges so far, capped), used to key cached replies."""
+        return min(len(self.conversation_history) // 2, 3)
+    
+    def template_fields(self):
+        """Per-customer values that cached replies are templated on."""
+        data = {**self.job_data, **self.invoice_data, **self.customer_data}
+        return {key: data[key] for key in TEMPLATE_FIELDS if key in data}
+    
+    def contact_values(self):
+        """Every per-customer value, none of which may be left in a cached reply."""
+        return [value for data in (self.customer_data, self.job_data, self.invoice_data)
+                for value in data.values()]
+    
+    def cached_response(self, user_input, state):
+        """Return a cached reply to a near-duplicate utterance, if caching is enabled."""
+        if not self.response_cache or not user_input:
+            return None
+        cached = self.response_cache.lookup(self.scenario, state, user_input, self.template_fields())
+        if cached and self.log_callback:
+            self.log_callback("Reply served from response cache")
+        return cached
+    
+    def store_response(self, user_input, state, ai_response):
+        """Remember a model reply for similar utterances in later calls."""
+        if self.response_cache and user_input and ai_response:
+            self.response_cache.store(self.scenario, state, user_input, ai_response, self.template_fields(),
+                                      self.contact_values())
+    
+    def preview_prompt(self, user_input):
+        """Build the prompt generate_response would send, without recording the turn.
+        
+        The prompt is built on a copy of the builder's summary state and no
+        turns are spilled, so a preview of something the caller never says
+        leaves the call unchanged.
+        """
+        history = self.conversation_history + [f"User: {user_input}"]
+        return self._build_prompt(self.prompt_builder.copy(), user_input, history)
+    
+    def record_exchange(self, user_input, ai_response, tokens=None):
+        """Record a user turn and a reply that was generated outside generate_response."""
+        self.logger.log_turn("user", user_input)
+        self.logger.log_turn("ai", ai_response, tokens=tokens)
+    
+    @staticmethod
+    def clean_response(text):
+        """Strip speaker labels the model sometimes echoes back."""
+        return text.replace("AI:", "").replace("Agent:", "").strip()
+    
+    def fallback_response(self):
+        """Return the canned reply used when the model is unavailable."""
+        return FALLBACK_RESPONSES.get(self.scenario, DEFAULT_FALLBACK_RESPONSE)
     
     def get_scenario_prompt(self, user_input):
-        """Get prompt template based on the current scenario."""
-        history_text = "\n".join(self.conversation_history[-6:])  # Last 3 turns
-        
-        scenario_prompts = {
-            "demo": f"""
-[System Instructions]
-You are an ERP sales representative for I-Max India. Your goal is to schedule a demo for the customer.
-Your name is Parul Sharma. Speak in Hinglish with a friendly yet professional tone.
-
-[Context]
-Customer: {self.customer_data["name"]} from {self.customer_data["company"]}
-Interest: {self.customer_data["interest"]}
-Location: {self.customer_data["location"]}
-
-[Additional Instructions]
-1. Understand the customer's requirements.
-2. Explain relevant features briefly.
-3. Suggest 2-3 demo time slots.
-4. Be polite yet persuasive.
-5. Keep responses concise (3-5 sentences).
-6. Use natural Hinglish.
-
-[Conversation History]
-{history_text}
-
-[Current Input]
-Customer: {user_input}
-
-[Your Response in Hinglish]
-""",
-            "interview": f"""
-[System Instructions]
-You are Priya Patel, an HR manager conducting a technical screening interview. Speak in natural Hinglish with a professional tone.
-
-[Context]
-Position: {self.job_data["position"]}
-Required skills: {self.job_data["skills"]}
-Experience: {self.job_data["experience"]}
-Location: {self.job_data["location"]}
-Work type: {self.job_data["work_type"]}
-
-[Additional Instructions]
-1. Ask technical questions related to required skills.
-2. Follow up on responses for depth.
-3. Assess communication and problem-solving skills.
-4. Use natural Hinglish.
-
-[Conversation History]
-{history_text}
-
-[Current Input]
-Candidate: {user_input}
-
-[Your Response in Hinglish]
-""",
-            "payment": f"""
-[System Instructions]
-You are Amita Kumari from the accounts department. Your goal is to remind the customer about pending payment.
-Speak in Hinglish with a polite but firm tone.
-
-[Context]
-Customer: {self.customer_data["name"]} from {self.customer_data["company"]}
-Pending Amount: ₹{self.invoice_data["amount"]}
-Days Late: {self.invoice_data["days_late"]}
-Invoice: {self.invoice_data["invoice_number"]}
-Due Date: {self.invoice_data["due_date"]}
-Payment Options: {self.invoice_data["payment_options"]}
-
-[Additional Instructions]
-1. Politely remind about the pending payment.
-2. Mention invoice details and due date.
-3. Ask for a commitment on payment.
-4. Use natural Hinglish.
-
-[Conversation History]
-{history_text}
-
-[Current Input]
-Customer: {user_input}
-
-[Your Response in Hinglish]
-"""
-        }
-        return scenario_prompts.get(self.scenario, scenario_prompts["demo"])
+        """Get the prompt to send for this turn.
+        
+        Turns that fell out of the prompt window into its summary are
+        spilled from memory when the log is streamed, after they are queued
+        for outcome extraction so a long user turn is never spilled unseen.
+        """
+        prompt = self._build_prompt(self.prompt_builder, user_input, self.conversation_history)
+        self.outcomes.update(self.conversation_history)
+        self.logger.spill(self.prompt_builder.summarized_count)
+        return prompt
     
-    def end_conversation(self):
-        """End conversation and save the log."""
+    def _build_prompt(self, builder, user_input, history):
+        """When the static preamble is bound to the model, only the dynamic suffix (history and input) is sent."""
+        if self.prefix_cached:
+            return builder.dynamic_block(user_input, history)
+        return builder.build(user_input, history)
+    
+    def end_conversation(self, outcome=None):
+        """End conversation and save the log, with how the call ended if known.
+        
+        Does not wait: the log is saved from the extraction pool once the
+        call's outcomes are in, which at most asks the model about the last
+        undecided turns. Returns a Future of the log file.
+        """
         metadata = {
             "scenario": self.scenario,
-            "customer_data": self.customer_data,
+            "customer_data": dict(self.customer_data),
             "turns_count": len(self.conversation_history) // 2
         }
+        if outcome:
+            metadata["outcome"] = outcome
     
         if self.scenario == "demo":
-            metadata["job_data"] = self.job_data
+            metadata["job_data"] = dict(self.job_data)
         elif self.scenario == "payment":
-            metadata["invoice_data"] = self.invoice_data
-        elif self.scenario == "interview":
-            metadata["candidate_scoring"] = {
-                "communication": random.randint(1, 10),
-                "technical": random.randint(1, 10),
-                "problem_solving": random.randint(1, 10)
-            }
+            metadata["invoice_data"] = dict(self.invoice_data)
     
-        log_file = self.logger.save_log(metadata)
-    
-        if self.log_callback:
-            self.log_callback(f"Conversation log saved to {log_file}")
+        if self.response_cache:
+            metadata["response_cache"] = self.response_cache.stats()
+        
+        saved = Future()
+        
+        def save(outcomes_future):
+            try:
+                outcomes = outcomes_future.result()
+                metadata["outcomes"] = outcomes
+                if self.scenario == "interview":
+                    metadata["candidate_scoring"] = outcomes["fields"]["candidate_scoring"]
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"Outcome extraction failed, saving the log without it: {str(e)}")
+            try:
+                log_file = self.logger.save_log(metadata)
+            except Exception as e:
+                saved.set_exception(e)
+                return
+            if self.log_callback:
+                self.log_callback(f"Conversation log saved to {log_file}")
+            saved.set_result(log_file)
         
-        return log_file
+        self.finish_outcomes().add_done_callback(save)
+        return saved
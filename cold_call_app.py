@@ -1,10 +1,32 @@
 import os
-import time
 import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 from speech_processor import SpeechProcessor
-from cold_call_agent import ColdCallAgent
+from cold_call_agent import (ColdCallAgent, END_CALL_PHRASES, OPENING_MESSAGES, DEFAULT_OPENING_MESSAGE,
+                             CLOSING_MESSAGES, DEFAULT_CLOSING_MESSAGE, scripted_phrases)
+from streaming_pipeline import StreamingSpeaker
+from microphone_session import MicrophoneSession
+from streaming_stt import VoskStreamingRecognizer, SpeculativeResponder
+from response_cache import ResponseCache
+from pregeneration import PreGenerator
+from tracing import set_default_tracer
+from ui_queue import UIQueue
+
+# Speak replies sentence by sentence while Gemini is still generating them
+STREAMING_RESPONSES = os.getenv("STREAMING_RESPONSES", "true").lower() == "true"
+
+# Split complete replies into sentences, synthesize them in parallel and play them in order
+PARALLEL_TTS = os.getenv("PARALLEL_TTS", "true").lower() == "true"
+
+# Reuse replies to near-duplicate caller utterances across calls
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "false").lower() == "true"
+
+# Prepare replies to the likely next caller intents while the agent speaks
+PREGENERATE = os.getenv("PREGENERATE", "false").lower() == "true"
+
+# Local Vosk model for streaming recognition with partial results (optional)
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH")
 
 class ColdCallApp:
     """GUI Application for the AI Cold Calling Agent (Hinglish)."""
@@ -17,10 +39,33 @@ class ColdCallApp:
         
         self.scenario_var = tk.StringVar(value="demo")
         self.running = False
+        # Held while checking and clearing running, so only one thread ends a call
+        self.end_lock = threading.Lock()
+        self.call_thread = None
         self.agent = None
+        self.mic_session = None
+        self.streaming_recognizer = None
+        self.speculator = None
+        self.pregenerator = None
+        self.response_cache = ResponseCache() if RESPONSE_CACHE else None
         self.speech_processor = SpeechProcessor()
+        self.streaming_speaker = StreamingSpeaker(self.speech_processor, self.log_message)
         
         self.create_ui()
+        # Widgets are only touched on the main loop; other threads queue their updates
+        self.ui = UIQueue(self.root, self.log_text)
+        self.ui.start()
+        
+        # Open the audio device and pre-synthesize the fixed phrases in the background
+        threading.Thread(target=self.warm_up, daemon=True).start()
+        
+    def warm_up(self):
+        """Open the audio device and pre-synthesize the fixed openings, closings and fallbacks."""
+        try:
+            self.speech_processor.player
+        except Exception as e:
+            self.log_message(f"Audio device unavailable: {str(e)}")
+        self.speech_processor.warm_cache(scripted_phrases(), self.log_message)
         
     def create_ui(self):
         """Create the user interface."""
@@ -49,7 +94,7 @@ class ColdCallApp:
         self.start_button.pack(side=tk.LEFT, padx=5)
         
         self.end_button = ttk.Button(button_frame, text="End Call", 
-                                     command=self.end_call, state=tk.DISABLED)
+                                     command=self.end_call_in_background, state=tk.DISABLED)
         self.end_button.pack(side=tk.LEFT, padx=5)
         
         self.speak_button = ttk.Button(button_frame, text="Speak Now", 
@@ -81,21 +126,30 @@ class ColdCallApp:
         self.summary_text.config(state=tk.DISABLED)
         
     def log_message(self, message):
-        """Add a message to the conversation log."""
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        """Add a message to the conversation log; safe from any thread."""
+        self.ui.log(message)
         
     def update_status(self, message, color="black"):
-        """Update the status label."""
-        self.status_label.config(text=message, foreground=color)
+        """Update the status label; safe from any thread."""
+        self.ui.call(self.status_label.config, text=message, foreground=color)
+        
+    def set_buttons(self, call_active):
+        """Enable the buttons for an active or an ended call; safe from any thread."""
+        self.ui.call(self.start_button.config, state=tk.DISABLED if call_active else tk.NORMAL)
+        self.ui.call(self.end_button.config, state=tk.NORMAL if call_active else tk.DISABLED)
+        self.ui.call(self.speak_button.config, state=tk.NORMAL if call_active else tk.DISABLED)
+        
+    def set_text(self, widget, text):
+        """Replace the contents of a read-only text panel; safe from any thread."""
+        def replace():
+            widget.config(state=tk.NORMAL)
+            widget.delete(1.0, tk.END)
+            widget.insert(tk.END, text)
+            widget.config(state=tk.DISABLED)
+        self.ui.call(replace)
         
     def update_info(self, scenario):
         """Display scenario-specific information."""
-        self.info_text.config(state=tk.NORMAL)
-        self.info_text.delete(1.0, tk.END)
-        
         if scenario == "demo":
             info = (f"Demo Scenario: {self.agent.customer_data['name']} from "
                     f"{self.agent.customer_data['company']} interested in "
@@ -111,54 +165,128 @@ class ColdCallApp:
         else:
             info = "No information available for this scenario"
             
-        self.info_text.insert(tk.END, info)
-        self.info_text.config(state=tk.DISABLED)
+        self.set_text(self.info_text, info)
         
     def start_call(self):
         """Start a new cold call session."""
         scenario = self.scenario_var.get()
         self.running = True
         
-        self.start_button.config(state=tk.DISABLED)
-        self.end_button.config(state=tk.NORMAL)
-        self.speak_button.config(state=tk.NORMAL)
+        self.set_buttons(call_active=True)
         self.update_status("Call Started! Say something...", "green")
+        self.ui.clear_log()
         
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.config(state=tk.DISABLED)
-        
-        self.agent = ColdCallAgent(scenario, self.log_message)
+        self.agent = ColdCallAgent(scenario, self.log_message, response_cache=self.response_cache)
+        set_default_tracer(self.agent.tracer)
         self.update_info(scenario)
         
-        opening_messages = {
-            "demo": "Namaskar! Main Parul Sharma bol rahi hoon TechSolutions se. Kya main aapse baat kar sakta hoon ERP system ke demo ke baare mein?",
-            "interview": "Namaste! Main Priya Patel, HR manager. Aapka interview schedule kiya hai Software Engineer position ke liye. Kya abhi baat karna convenient hai?",
-            "payment": "Namaste! Main Amita Kumari accounts department se baat kar rahi hoon. Aapke payment ke regarding follow up karna tha."
-        }
+        if PREGENERATE:
+            self.pregenerator = PreGenerator(self.agent, log_callback=self.log_message)
+            self.pregenerator.start()
         
-        opening = opening_messages.get(scenario, "Namaste! Main Apki kaise help kar sakti hoon?")
-        self.log_message(f"AI: {opening}")
-        self.speech_processor.speak(opening, self.log_message)
+        self.call_thread = threading.Thread(target=self.conversation_loop, args=(scenario,), daemon=True)
+        self.call_thread.start()
         
-        threading.Thread(target=self.conversation_loop, daemon=True).start()
-        
-    def conversation_loop(self):
-        """Continuously listen and process conversation in a separate thread."""
-        while self.running:
-            user_input = self.speech_processor.recognize_speech(callback=self.log_message)
+    def conversation_loop(self, scenario):
+        """Speak the opening, then continuously listen and respond, in a separate thread."""
+        try:
+            opening = OPENING_MESSAGES.get(scenario, DEFAULT_OPENING_MESSAGE)
+            self.log_message(f"AI: {opening}")
+            self.speech_processor.speak(opening, self.log_message)
+            # The opening line is not part of any turn
+            self.agent.tracer.take()
             
-            if not self.running:
-                break
+            # One calibrated microphone stream for the whole call
+            with MicrophoneSession() as session:
+                self.mic_session = session
+                self.log_message(f"Microphone calibrated in {session.calibration_time * 1000:.0f} ms")
                 
-            if user_input in ["bye", "goodbye", "end call", "stop", "end", "quit", "exit"]:
-                self.end_call()
-                break
+                if VOSK_MODEL_PATH:
+                    self.start_streaming_recognition(session)
                 
-            if user_input:
+                while self.running:
+                    if self.speculator:
+                        user_input = self.speech_processor.recognize_streaming(
+                            session, self.streaming_recognizer,
+                            on_partial=self.speculator.on_partial, callback=self.log_message)
+                    else:
+                        user_input = self.speech_processor.recognize_speech(callback=self.log_message,
+                                                                            session=session)
+                    
+                    if not self.running:
+                        break
+                        
+                    if user_input in END_CALL_PHRASES:
+                        self.end_call("ended_by_user")
+                        break
+                        
+                    if user_input:
+                        self.respond(user_input, barge_in_session=session)
+        except Exception as e:
+            self.log_message(f"Error: {str(e)}")
+        finally:
+            self.mic_session = None
+            if self.speculator:
+                self.speculator.close()
+                self.speculator = None
+    
+    def start_streaming_recognition(self, session):
+        """Use the local Vosk recognizer and speculate on its partial transcripts."""
+        try:
+            if self.streaming_recognizer is None:
+                self.streaming_recognizer = VoskStreamingRecognizer(VOSK_MODEL_PATH,
+                                                                    session.source.SAMPLE_RATE)
+            self.speculator = SpeculativeResponder(self.agent, log_callback=self.log_message)
+        except Exception as e:
+            self.log_message(f"Streaming recognition unavailable: {str(e)}")
+    
+    def respond(self, user_input, barge_in_session=None):
+        """Generate and speak the agent's reply to a user turn.
+        
+        With a barge_in_session, playback stops as soon as the caller starts
+        talking over the reply.
+        """
+        if barge_in_session:
+            with barge_in_session.barge_in(self.on_barge_in):
+                self.speak_reply(user_input)
+        else:
+            self.speak_reply(user_input)
+        self.agent.finish_turn()
+    
+    def on_barge_in(self):
+        """Stop the agent's reply because the caller started talking."""
+        self.log_message("Caller interrupted, stopping playback")
+        self.streaming_speaker.interrupt()
+        self.speech_processor.stop_audio()
+    
+    def speak_reply(self, user_input):
+        """Generate the reply and play it, streaming if enabled.
+        
+        With pre-generation, the next turn's candidates are requested as
+        soon as this reply is complete, while it is still playing.
+        """
+        ai_response = self.pregenerator.take(user_input) if self.pregenerator else None
+        if not ai_response:
+            if self.speculator:
+                ai_response = self.speculator.on_final(user_input)
+            elif STREAMING_RESPONSES:
+                self.streaming_speaker.speak_stream(self.pregenerate_after(
+                    self.agent.generate_response_stream(user_input)))
+                return
+            else:
                 ai_response = self.agent.generate_response(user_input)
-                self.speech_processor.speak(ai_response, self.log_message)
-                time.sleep(1)
+        if self.pregenerator:
+            self.pregenerator.start()
+        if PARALLEL_TTS:
+            self.streaming_speaker.speak_text(ai_response)
+        else:
+            self.speech_processor.speak(ai_response, self.log_message)
+    
+    def pregenerate_after(self, chunks):
+        """Pass a reply stream through, starting pre-generation once the reply is recorded."""
+        yield from chunks
+        if self.pregenerator:
+            self.pregenerator.start()
     
     def manual_speak(self):
         """Manually trigger speech recognition for user input."""
@@ -166,50 +294,72 @@ class ColdCallApp:
             self.speak_button.config(state=tk.DISABLED)
             
             def speak_thread():
-                user_input = self.speech_processor.recognize_speech(callback=self.log_message)
+                user_input = self.speech_processor.recognize_speech(callback=self.log_message,
+                                                                    session=self.mic_session)
                 
                 if user_input:
-                    if user_input in ["bye", "goodbye", "end call", "stop", "end", "quit", "exit"]:
-                        self.root.after(0, self.end_call)
+                    if user_input in END_CALL_PHRASES:
+                        self.end_call("ended_by_user")
                     else:
-                        ai_response = self.agent.generate_response(user_input)
-                        self.speech_processor.speak(ai_response, self.log_message)
+                        self.respond(user_input)
                 
-                self.root.after(0, lambda: self.speak_button.config(state=tk.NORMAL))
+                if self.running:
+                    self.ui.call(self.speak_button.config, state=tk.NORMAL)
             
             threading.Thread(target=speak_thread, daemon=True).start()
     
-    def end_call(self):
-        """Terminate the call and update the UI."""
-        if self.running:
+    def end_call_in_background(self):
+        """End the call from the End Call button without blocking the main loop on the closing line."""
+        threading.Thread(target=self.end_call, daemon=True).start()
+    
+    def end_call(self, outcome="ended_by_operator"):
+        """Terminate the call and update the UI; safe from any thread."""
+        with self.end_lock:
+            if not self.running:
+                return
             self.running = False
+        
+        self.set_buttons(call_active=False)
+        self.update_status("Call Ended. Thank you!", "red")
+        
+        # Let the conversation loop finish its current turn before the call's outcomes and log are closed
+        if self.call_thread and self.call_thread is not threading.current_thread():
+            self.call_thread.join()
+        
+        if self.agent:
+            # Outcomes of the last turns are extracted while the closing line plays
+            self.agent.finish_outcomes()
             
-            self.start_button.config(state=tk.NORMAL)
-            self.end_button.config(state=tk.DISABLED)
-            self.speak_button.config(state=tk.DISABLED)
-            self.update_status("Call Ended. Thank you!", "red")
+            closing = CLOSING_MESSAGES.get(self.agent.scenario, DEFAULT_CLOSING_MESSAGE)
+            self.log_message(f"AI: {closing}")
+            self.speech_processor.speak(closing, self.log_message)
+            agent = self.agent
+            # The log is saved once the outcomes are in; the summary panel waits for it, not this thread
+            agent.end_conversation(outcome).add_done_callback(lambda saved: self.show_summary(agent))
             
-            if self.agent:
-                self.agent.end_conversation()
-                
-                closing_messages = {
-                    "demo": "Thank you for your time! Main jaldi hi aapse demo scheduling ke liye contact karunga. Have a nice day!",
-                    "interview": "Interview ke liye dhanyavaad. Humari team aapko result ke baare mein jald hi contact karegi.",
-                    "payment": "Baat karne ke liye dhanyavaad. Payment update ke liye wait kar rahe hain. Shubh din!"
-                }
-                
-                closing = closing_messages.get(self.agent.scenario, "Dhanyavaad! Have a nice day!")
-                self.log_message(f"AI: {closing}")
-                self.speech_processor.speak(closing, self.log_message)
-                
-                # Update Actionable Summary panel
-                summary = self.agent.logger.get_summary()
-                summary_text = (
-                    f"Total Turns: {summary['total_turns']}\n"
-                    f"Duration: {int(summary['duration_seconds'])} seconds\n"
-                    f"Key Takeaways: {summary['key_takeaways']}"
-                )
-                self.summary_text.config(state=tk.NORMAL)
-                self.summary_text.delete(1.0, tk.END)
-                self.summary_text.insert(tk.END, summary_text)
-                self.summary_text.config(state=tk.DISABLED)
+            cache_stats = self.speech_processor.tts_cache.stats()
+            self.log_message(f"TTS cache: {cache_stats['hits']} hits, "
+                             f"{cache_stats['misses']} misses")
+            if self.response_cache:
+                response_stats = self.response_cache.stats()
+                self.log_message(f"Response cache hit rate: {response_stats['hit_rate']:.0%}")
+            if self.pregenerator:
+                pregeneration_stats = self.pregenerator.stats()
+                self.log_message(f"Pre-generated replies: {pregeneration_stats['hit_rate']:.0%} hit rate, "
+                                 f"{pregeneration_stats['time_saved']:.1f} s of model time saved")
+                self.pregenerator.close()
+                self.pregenerator = None
+    
+    def show_summary(self, agent):
+        """Update the Actionable Summary panel from a call's saved log; safe from any thread."""
+        summary = agent.logger.get_summary()
+        summary_text = (
+            f"Total Turns: {summary['total_turns']}\n"
+            f"Duration: {int(summary['duration_seconds'])} seconds\n"
+            f"Key Takeaways: {summary['key_takeaways']}"
+        )
+        scoring = summary["outcomes"].get("candidate_scoring")
+        if scoring:
+            summary_text += "\nScores: " + ", ".join(f"{name.replace('_', ' ')} {score}/10"
+                                                      for name, score in scoring.items())
+        self.set_text(self.summary_text, summary_text)
@@ -0,0 +1,39 @@
+import os
+from dotenv import load_dotenv
+
+
+# Load API keys and configurations from .env, once for the whole process
+load_dotenv()
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "XXXXXXXXXXXXXXXXXXXXX")
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-1.5-pro")
+
+SPEECH_RECOGNITION_LANGUAGE = os.getenv("SPEECH_RECOGNITION_LANGUAGE", "en-IN")
+TEXT_TO_SPEECH_LANGUAGE = os.getenv("TEXT_TO_SPEECH_LANGUAGE", "en-IN")
+TEXT_TO_SPEECH_TLD = os.getenv("TEXT_TO_SPEECH_TLD", "co.in")
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+TTS_CACHE_MAX_DISK_BYTES = int(os.getenv("TTS_CACHE_MAX_DISK_BYTES", str(256 * 1024 * 1024)))
+
+# Engines for each pipeline stage; see backends.py for the registered names
+STT_BACKEND = os.getenv("STT_BACKEND", "google")
+# Tried when the main recognizer fails (e.g. no network); empty to disable
+STT_FALLBACK_BACKEND = os.getenv("STT_FALLBACK_BACKEND", "sphinx")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+# Cheaper or local model used while the primary one keeps failing
+LLM_FALLBACK_BACKEND = os.getenv("LLM_FALLBACK_BACKEND", "gemini")
+LLM_FALLBACK_MODEL_NAME = os.getenv("LLM_FALLBACK_MODEL_NAME", "gemini-1.5-flash")
+# Model asked about call outcomes the extraction rules cannot decide; empty backend for rules only
+OUTCOME_LLM_BACKEND = os.getenv("OUTCOME_LLM_BACKEND", "gemini")
+OUTCOME_LLM_MODEL_NAME = os.getenv("OUTCOME_LLM_MODEL_NAME", "gemini-1.5-flash")
+TTS_BACKEND = os.getenv("TTS_BACKEND", "gtts")
+
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-in-0.4")
+LOCAL_LLM_MODEL_PATH = os.getenv("LOCAL_LLM_MODEL_PATH", "models/model.gguf")
+LOCAL_LLM_THREADS = int(os.getenv("LOCAL_LLM_THREADS", str(os.cpu_count() or 4)))
+LOCAL_LLM_MAX_TOKENS = int(os.getenv("LOCAL_LLM_MAX_TOKENS", "160"))
+
+# Latency of the "fake" engines, in seconds
+FAKE_STT_DELAY = float(os.getenv("FAKE_STT_DELAY", "0.3"))
+FAKE_LLM_DELAY = float(os.getenv("FAKE_LLM_DELAY", "0.4"))
+FAKE_TTS_DELAY = float(os.getenv("FAKE_TTS_DELAY", "0.3"))
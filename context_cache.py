@@ -0,0 +1,120 @@
+import os
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+from config import GEMINI_API_KEY, LLM_BACKEND
+from prompt_builder import estimate_tokens
+
+
+# Gemini only accepts explicit context caches above a minimum size
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "32768"))
+CONTEXT_CACHE_TTL_MINUTES = int(os.getenv("CONTEXT_CACHE_TTL_MINUTES", "60"))
+# Prefix-bound models kept per cache, least recently used first out
+CONTEXT_CACHE_MAX_MODELS = int(os.getenv("CONTEXT_CACHE_MAX_MODELS", "256"))
+
+
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def get_genai():
+    """Import and configure google.generativeai once, on first use."""
+    global _genai
+    with _genai_lock:
+        if _genai is None:
+            import google.generativeai as genai
+            genai.configure(api_key=GEMINI_API_KEY)
+            _genai = genai
+        return _genai
+
+
+def gemini_prefix_model(model_name, static_prefix):
+    """Create a Gemini model bound to a static prompt prefix.
+
+    Large prefixes are stored server-side with explicit context caching, so
+    later requests only pay for the dynamic suffix. Smaller prefixes are
+    sent as the system instruction, which gives every request the same
+    leading content for the backend's implicit prefix caching.
+    """
+    genai = get_genai()
+
+    if estimate_tokens(static_prefix) >= CONTEXT_CACHE_MIN_TOKENS:
+        try:
+            from google.generativeai import caching
+            cached_content = caching.CachedContent.create(
+                model=model_name,
+                system_instruction=static_prefix,
+                ttl=datetime.timedelta(minutes=CONTEXT_CACHE_TTL_MINUTES))
+            return genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+        except Exception:
+            pass
+    return genai.GenerativeModel(model_name, system_instruction=static_prefix or None)
+
+
+class ContextCache:
+    """Shares one prefix-bound model per (model name, static prefix).
+
+    Every agent for the same scenario and scenario data has an identical
+    static preamble, so the model handle, and any server-side cache behind
+    it, is reused across turns and across calls. Beyond max_models the
+    least recently used handle is dropped; a server-side cache behind it
+    expires with its TTL.
+    """
+
+    def __init__(self, model_factory=gemini_prefix_model, max_models=CONTEXT_CACHE_MAX_MODELS):
+        self.model_factory = model_factory
+        self.max_models = max_models
+        self.models = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_model(self, model_name, static_prefix):
+        """Return the model bound to static_prefix, creating it on first use."""
+        key = (model_name, hashlib.sha256(static_prefix.encode("utf-8")).hexdigest())
+        with self.lock:
+            model = self.models.get(key)
+            if model is not None:
+                self.models.move_to_end(key)
+                self.hits += 1
+                return model
+            self.misses += 1
+            model = self.model_factory(model_name, static_prefix)
+            self.models[key] = model
+            while len(self.models) > self.max_models:
+                self.models.popitem(last=False)
+                self.evictions += 1
+            return model
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "models": len(self.models)}
+
+
+def usage_tokens(response):
+    """Extract input, cached and output token counts from a Gemini response."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    return {
+        "input": getattr(usage, "prompt_token_count", 0) or 0,
+        "cached": getattr(usage, "cached_content_token_count", 0) or 0,
+        "output": getattr(usage, "candidates_token_count", 0) or 0
+    }
+
+
+_default_caches = {}
+_default_cache_lock = threading.Lock()
+
+
+def get_context_cache(backend=None):
+    """Return the process-wide context cache shared by all agents for an LLM engine (default LLM_BACKEND)."""
+    backend = backend or LLM_BACKEND
+    with _default_cache_lock:
+        if backend not in _default_caches:
+            from backends import create_backend
+            _default_caches[backend] = ContextCache(create_backend("llm", backend).model)
+        return _default_caches[backend]
@@ -1,36 +1,174 @@
 import os
 import time
 import json
+import uuid
+from log_writer import get_log_writer
+
+# "json" writes one file per call at the end; "jsonl" streams every turn to shared segment files
+CONVERSATION_LOG_FORMAT = os.getenv("CONVERSATION_LOG_FORMAT", "json").lower()
 
 # Ensure logs directory exists
 os.makedirs("logs", exist_ok=True)
 
+
+class TurnRecord:
+    """One conversation turn, shared by the agent's prompt history and the logger.
+
+    str() gives the "User: ..." or "AI: ..." line used in prompts, so the
+    text itself is stored only once.
+    """
+
+    __slots__ = ("speaker", "text", "timestamp", "tokens", "spans", "clock_offset")
+
+    LABELS = {"user": "User", "ai": "AI"}
+
+    def __init__(self, speaker, text, timestamp, tokens=None):
+        self.speaker = speaker
+        self.text = text
+        self.timestamp = timestamp
+        self.tokens = tokens
+        self.spans = None
+        self.clock_offset = None
+
+    def __str__(self):
+        return f"{self.LABELS.get(self.speaker, self.speaker)}: {self.text}"
+
+    def to_dict(self):
+        turn = {"timestamp": self.timestamp, "speaker": self.speaker, "text": self.text}
+        if self.tokens:
+            turn["tokens"] = self.tokens
+        if self.spans:
+            turn["spans"] = self.spans
+            turn["clock_offset"] = self.clock_offset
+        return turn
+
+
+class TurnHistory:
+    """The turns of a call, indexed from the call's first turn, with the oldest ones droppable.
+
+    len() counts every turn so far and indexes are absolute, but only the
+    turns from `offset` on are kept in memory; drop_before() forgets older
+    ones. Slices start at the oldest kept turn at the earliest.
+    """
+
+    __slots__ = ("records", "offset")
+
+    def __init__(self, records=None, offset=0):
+        self.records = records if records is not None else []
+        self.offset = offset
+
+    def __len__(self):
+        return self.offset + len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return self.records[max(start - self.offset, 0):max(stop - self.offset, 0):step]
+        if index < 0:
+            return self.records[index]
+        if index < self.offset:
+            raise IndexError(f"turn {index} is no longer kept in memory")
+        return self.records[index - self.offset]
+
+    def __add__(self, turns):
+        return TurnHistory(self.records + list(turns), self.offset)
+
+    def append(self, record):
+        self.records.append(record)
+
+    def drop_before(self, index):
+        """Forget the turns before absolute position index."""
+        count = min(index, len(self)) - self.offset
+        if count > 0:
+            del self.records[:count]
+            self.offset += count
+
+
 class ConversationLogger:
-    """Logs conversation data for analysis and improvement."""
+    """Logs conversation data for analysis and improvement.
+    
+    In jsonl mode a start record, each turn and an end record are appended
+    to the shared background LogWriter as they happen, tagged with call_id,
+    so a crash mid-call loses at most the records still queued. Passing a
+    writer (anything with write(record) and a directory) implies jsonl.
+    
+    turns is a TurnHistory of TurnRecords that the agent also uses as its
+    prompt history. A streaming logger can drop turns the prompt no longer
+    needs (spill), since they are already in the log.
+    """
     
-    def __init__(self, scenario):
+    def __init__(self, scenario, log_format=None, writer=None):
         self.scenario = scenario
         self.start_time = time.time()
-        self.log_file = f"logs/conversation_{self.scenario}_{int(self.start_time)}.json"
-        self.turns = []
+        self.call_id = f"{scenario}_{int(self.start_time)}_{uuid.uuid4().hex[:8]}"
+        self.log_file = f"logs/conversation_{self.call_id}.json"
+        self.turns = TurnHistory()
+        self.token_totals = {"input": 0, "cached": 0, "output": 0}
+        self.metadata = {}
+        self.writer = None
+        if writer is not None or (log_format or CONVERSATION_LOG_FORMAT) == "jsonl":
+            self.writer = writer or get_log_writer()
+            self.writer.write({"type": "start", "call_id": self.call_id,
+                               "scenario": scenario, "timestamp": self.start_time})
     
-    def log_turn(self, speaker, text):
-        """Log a single conversation turn."""
-        self.turns.append({
-            "timestamp": time.time(),
-            "speaker": speaker,
-            "text": text
-        })
+    def log_turn(self, speaker, text, tokens=None):
+        """Log a single conversation turn, with model token usage for AI turns; returns its TurnRecord."""
+        turn = TurnRecord(speaker, text, time.time(), tokens or None)
+        self.turns.append(turn)
+        for key, count in (tokens or {}).items():
+            self.token_totals[key] = self.token_totals.get(key, 0) + count
+        if self.writer:
+            self.writer.write({"type": "turn", "call_id": self.call_id, **turn.to_dict()})
+        return turn
+    
+    def attach_spans(self, spans, clock_offset=0.0):
+        """Attach a turn's latency spans (monotonic times) to the latest logged turn."""
+        if not spans or not self.turns:
+            return
+        turn = self.turns[-1]
+        turn.spans = (turn.spans or []) + spans
+        turn.clock_offset = clock_offset
+        if self.writer:
+            self.writer.write({"type": "spans", "call_id": self.call_id, "turn": len(self.turns) - 1,
+                               "spans": spans, "clock_offset": clock_offset})
+    
+    def token_usage(self):
+        """Total input, cached and output tokens across all logged turns."""
+        return dict(self.token_totals)
+    
+    def spill(self, before):
+        """Drop turns before position `before` from memory if they are already in the streaming log.
+        
+        Without a writer every turn is kept, since save_log writes them all.
+        """
+        if self.writer:
+            self.turns.drop_before(before)
     
     def save_log(self, metadata=None):
-        """Save the conversation log to a file."""
+        """Save the conversation log to a file and return its path.
+        
+        In jsonl mode this queues the call's end record and returns the
+        current segment directory instead; turns are already written.
+        """
+        self.metadata = metadata or {}
+        if self.writer:
+            end_time = time.time()
+            self.writer.write({"type": "end", "call_id": self.call_id, "scenario": self.scenario,
+                               "timestamp": end_time, "duration": end_time - self.start_time,
+                               "metadata": metadata or {}, "token_usage": self.token_usage()})
+            return self.writer.directory
+        
         log_data = {
             "scenario": self.scenario,
             "start_time": self.start_time,
             "end_time": time.time(),
             "duration": time.time() - self.start_time,
             "metadata": metadata or {},
-            "turns": self.turns
+            "token_usage": self.token_usage(),
+            "turns": [turn.to_dict() for turn in self.turns]
         }
         
         with open(self.log_file, 'w', encoding='utf-8') as f:
@@ -39,10 +177,17 @@ class ConversationLogger:
         return self.log_file
 
     def get_summary(self):
-        """Generate a summary of the conversation metrics and key takeaways."""
+        """Generate a summary of the conversation metrics and key takeaways.
+        
+        Outcomes and takeaways come from the metadata saved with the log, so
+        they are filled in once the call has ended.
+        """
+        outcomes = self.metadata.get("outcomes", {})
         summary = {
             "total_turns": len(self.turns),
             "duration_seconds": time.time() - self.start_time,
-            "key_takeaways": "Focus on active listening, structured evaluation, and clear communication."
+            "token_usage": self.token_usage(),
+            "outcomes": outcomes.get("fields", {}),
+            "key_takeaways": "; ".join(outcomes.get("takeaways", [])) or "No outcomes extracted yet."
         }
         return summary
@@ -0,0 +1,380 @@
+import io
+import math
+import time
+import wave
+import array
+import random
+import asyncio
+import threading
+from prompt_builder import estimate_tokens
+
+
+DEFAULT_FAKE_REPLY = (
+    "Namaste! Main aapki help karne ke liye yahan hoon. "
+    "Humara ERP system aapke inventory aur accounts dono ko ek jagah manage karta hai. "
+    "Kya aap kal subah 11 baje ya parson dopahar 3 baje demo ke liye free hain?"
+)
+
+
+class Latency:
+    """Seeded latency distribution usable wherever a fake takes a fixed delay.
+
+    Specs: "0.3" or "fixed:0.3", "uniform:0.2,0.5", or "lognormal:0.3,0.4"
+    (median seconds and sigma), all in seconds.
+    """
+
+    def __init__(self, spec, seed=0):
+        self.spec = spec
+        kind, _, params = spec.rpartition(":")
+        self.kind = kind or "fixed"
+        self.params = [float(value) for value in params.split(",")]
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self):
+        with self.lock:
+            if self.kind == "fixed":
+                return self.params[0]
+            if self.kind == "uniform":
+                return self.random.uniform(*self.params)
+            if self.kind == "lognormal":
+                median, sigma = self.params
+                return median * math.exp(self.random.gauss(0, sigma))
+        raise ValueError(f"Unknown latency distribution: {self.spec}")
+
+
+def sample_delay(delay):
+    """Seconds to wait for a delay given as a number or a Latency."""
+    return delay.sample() if isinstance(delay, Latency) else delay
+
+
+class FakeUsage:
+    """Stand-in for a Gemini response's usage_metadata."""
+
+    def __init__(self, prompt_token_count, candidates_token_count, cached_content_token_count=0):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.cached_content_token_count = cached_content_token_count
+
+
+class FakeResponse:
+    """Minimal stand-in for a Gemini response or stream chunk."""
+
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeStreamingModel:
+    """Offline stand-in for GenerativeModel with configurable latency.
+
+    Supports both the blocking call and stream=True, so the same fake can
+    drive the classic and the streaming response paths. Responses carry
+    usage metadata; a system_instruction is reported as cached after the
+    first request, like a backend with prefix caching, unless it is shorter
+    than min_cached_tokens (a backend's minimum cache size). Uncached input
+    tokens can be given a per-token prefill cost. Delays may be Latency
+    distributions.
+    """
+
+    def __init__(self, reply=DEFAULT_FAKE_REPLY, first_token_delay=0.4,
+                 chunk_delay=0.05, chunk_size=16, system_instruction=None,
+                 per_input_token_delay=0.0, min_cached_tokens=0):
+        self.reply = reply
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.system_instruction = system_instruction
+        self.per_input_token_delay = per_input_token_delay
+        self.min_cached_tokens = min_cached_tokens
+        self.calls = 0
+
+    def _usage(self, prompt):
+        prefix_tokens = estimate_tokens(self.system_instruction) if self.system_instruction else 0
+        cached = prefix_tokens if self.calls > 1 and prefix_tokens >= self.min_cached_tokens else 0
+        return FakeUsage(prefix_tokens + estimate_tokens(prompt), estimate_tokens(self.reply), cached)
+
+    def _prefill_delay(self, usage):
+        return self.per_input_token_delay * (usage.prompt_token_count - usage.cached_content_token_count)
+
+    def _chunks(self):
+        return [self.reply[i:i + self.chunk_size]
+                for i in range(0, len(self.reply), self.chunk_size)]
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        usage = self._usage(prompt)
+        if stream:
+            return self._stream(usage)
+        time.sleep(self._prefill_delay(usage) + sample_delay(self.first_token_delay)
+                   + sample_delay(self.chunk_delay) * (len(self._chunks()) - 1))
+        return FakeResponse(self.reply, usage)
+
+    def _stream(self, usage):
+        time.sleep(self._prefill_delay(usage) + sample_delay(self.first_token_delay))
+        chunks = self._chunks()
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(sample_delay(self.chunk_delay))
+            yield FakeResponse(chunk, usage if i == len(chunks) - 1 else None)
+
+
+class ResourceExhausted(Exception):
+    """Stand-in for the API's 429 quota error."""
+
+
+class ServiceUnavailable(Exception):
+    """Stand-in for a transient 503 from the API."""
+
+
+class FaultyModel:
+    """Wraps a model and injects faults: transient errors, rate limits, slow responses and outages.
+
+    Each request draws once: below error_rate it raises ServiceUnavailable,
+    then rate_limit_rate raises ResourceExhausted, then slow_rate adds
+    slow_delay seconds. While `outage` is set every request fails.
+    """
+
+    def __init__(self, model, error_rate=0.0, rate_limit_rate=0.0, slow_rate=0.0, slow_delay=3.0, seed=None):
+        self.model = model
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.outage = False
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        with self.lock:
+            self.calls += 1
+            roll = self.random.random()
+        if self.outage or roll < self.error_rate:
+            raise ServiceUnavailable("injected 503")
+        roll -= self.error_rate
+        if roll < self.rate_limit_rate:
+            raise ResourceExhausted("injected 429")
+        roll -= self.rate_limit_rate
+        if roll < self.slow_rate:
+            time.sleep(self.slow_delay)
+        return self.model.generate_content(prompt, stream=stream)
+
+
+class FakeTTS:
+    """Offline stand-in for SpeechProcessor synthesis and playback.
+
+    Synthesis sleeps for a fixed round trip plus a per-character cost, and
+    playback sleeps for roughly the time the clip would take to speak.
+    """
+
+    def __init__(self, synth_delay=0.3, synth_per_char=0.002, play_per_char=0.06):
+        self.synth_delay = synth_delay
+        self.synth_per_char = synth_per_char
+        self.play_per_char = play_per_char
+        self.synthesized = []
+        self.played = []
+        self.stopped = threading.Event()
+
+    def synthesize(self, text):
+        time.sleep(self.synth_delay + self.synth_per_char * len(text))
+        self.synthesized.append(text)
+        return text
+
+    def play_audio(self, audio):
+        self.stopped.clear()
+        self.stopped.wait(self.play_per_char * len(audio))
+        self.played.append(audio)
+
+    def stop_audio(self):
+        self.stopped.set()
+
+    def speak(self, text, callback=None):
+        if not text:
+            return
+        if callback:
+            callback(f"AI: {text}")
+        self.play_audio(self.synthesize(text))
+
+
+class FakeRecognizer:
+    """Offline speech recognition engine that returns a fixed transcript after a delay.
+
+    With transcript=None it returns the text in utterance_pcm audio instead.
+    """
+
+    def __init__(self, delay=0.3, transcript="haan boliye", language=None):
+        self.delay = delay
+        self.transcript = transcript
+        self.language = language
+
+    def transcribe(self, pcm, sample_rate):
+        time.sleep(sample_delay(self.delay))
+        if self.transcript is None:
+            return bytes(pcm).partition(b"\0")[0].decode("utf-8")
+        return self.transcript
+
+
+class FakeSpeechEngine:
+    """Offline speech synthesis engine that returns a silent WAV after a delay.
+
+    The clip lasts as long as the text would take to say, so playback
+    timing stays realistic.
+    """
+
+    voice = "fake"
+
+    def __init__(self, delay=0.3, seconds_per_char=0.06, sample_rate=8000, language=None, tld=None):
+        self.delay = delay
+        self.seconds_per_char = seconds_per_char
+        self.sample_rate = sample_rate
+
+    def synthesize(self, text):
+        time.sleep(sample_delay(self.delay))
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(b"\0\0" * int(self.sample_rate * self.seconds_per_char * len(text)))
+        return buffer.getvalue()
+
+
+class StubAudioInput:
+    """Async caller that speaks a fixed list of utterances, then hangs up.
+
+    Each utterance is returned as its text, standing in for captured audio,
+    after a pause that models the caller talking.
+    """
+
+    def __init__(self, utterances, speaking_time=0.5):
+        self.utterances = list(utterances)
+        self.speaking_time = speaking_time
+
+    async def read_utterance(self):
+        if not self.utterances:
+            return None
+        await asyncio.sleep(self.speaking_time)
+        return self.utterances.pop(0)
+
+
+class StubAudioOutput:
+    """Async speaker that takes as long to play a clip as it would to say it."""
+
+    def __init__(self, play_per_char=0.01):
+        self.play_per_char = play_per_char
+        self.played = []
+
+    async def play(self, audio):
+        await asyncio.sleep(self.play_per_char * len(audio))
+        self.played.append(audio)
+
+
+class StubSTT:
+    """Async recognizer that "transcribes" text audio after a fixed delay.
+
+    Real audio (bytes) is "recognized" as the fixed transcript.
+    """
+
+    def __init__(self, delay=0.3, transcript="haan boliye"):
+        self.delay = delay
+        self.transcript = transcript
+
+    async def transcribe(self, audio):
+        await asyncio.sleep(self.delay)
+        return audio if isinstance(audio, str) else self.transcript
+
+
+class StubTTS:
+    """Async synthesizer that returns the text itself after a fixed delay.
+
+    With a failure_rate, that fraction of requests raises, to exercise retries.
+    """
+
+    def __init__(self, delay=0.3, failure_rate=0.0, seed=None):
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+
+    async def synthesize(self, text):
+        await asyncio.sleep(self.delay)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            raise ConnectionError("stub TTS request failed")
+        return text
+
+
+def utterance_pcm(text, sample_rate=16000, seconds_per_char=0.06):
+    """16-bit PCM standing in for someone saying text: the UTF-8 text, a NUL, then a tone as long as saying it takes.
+
+    Generating the tone sample by sample in Python is the CPU cost of
+    synthesis; CPUBoundSTT reads the text back from the header.
+    """
+    step = 2 * math.pi * 220 / sample_rate
+    tone = array.array("h", (int(8000 * math.sin(step * i))
+                             for i in range(int(sample_rate * seconds_per_char * len(text)))))
+    return text.encode("utf-8") + b"\0" + tone.tobytes()
+
+
+class CPUBoundSTT:
+    """Async recognizer that decodes utterance_pcm audio on the calling thread, holding the GIL.
+
+    Each utterance costs `passes` energy passes over its 20 ms frames, like
+    the front end of a local decoder. Text utterances are passed through.
+    """
+
+    def __init__(self, passes=2, sample_rate=16000):
+        self.passes = passes
+        self.frame_bytes = sample_rate // 50 * 2
+
+    async def transcribe(self, audio):
+        if isinstance(audio, str):
+            return audio
+        text, _, pcm = bytes(audio).partition(b"\0")
+        for _ in range(self.passes):
+            for offset in range(0, len(pcm) - self.frame_bytes + 1, self.frame_bytes):
+                samples = array.array("h", pcm[offset:offset + self.frame_bytes])
+                math.sqrt(sum(s * s for s in samples) / len(samples))
+        return text.decode("utf-8")
+
+
+class CPUBoundTTS:
+    """Async synthesizer that generates utterance_pcm audio on the calling thread, holding the GIL."""
+
+    def __init__(self, sample_rate=16000, seconds_per_char=0.06):
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+
+    async def synthesize(self, text):
+        return utterance_pcm(text, self.sample_rate, self.seconds_per_char)
+
+
+class FakeStreamingRecognizer:
+    """Streaming recognizer that reveals a scripted transcript word by word.
+
+    Every frames_per_word frames the partial hypothesis grows by one word;
+    finish() returns final_transcript, which may differ from the partials to
+    exercise speculation misses.
+    """
+
+    def __init__(self, transcript, final_transcript=None, frames_per_word=4, finish_delay=0.0):
+        self.words = transcript.split()
+        self.final_transcript = transcript if final_transcript is None else final_transcript
+        self.frames_per_word = frames_per_word
+        self.finish_delay = finish_delay
+        self.frames = 0
+
+    def start(self):
+        self.frames = 0
+
+    def accept_frame(self, frame):
+        self.frames += 1
+        if self.frames % self.frames_per_word:
+            return None
+        count = self.frames // self.frames_per_word
+        if count > len(self.words):
+            return None
+        return " ".join(self.words[:count])
+
+    def finish(self):
+        time.sleep(self.finish_delay)
+        return self.final_transcript
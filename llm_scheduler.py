@@ -0,0 +1,316 @@
+import os
+import time
+import random
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from metrics import percentile
+
+
+# Seconds a turn may wait for the model, retries and hedges included
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "8"))
+# Token bucket matched to the API quota (0 for no limit); the burst allows short spikes above the average rate
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.25"))
+# Send a duplicate request once the first is slower than this percentile of recent latencies; 0 disables
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0"))
+# Consecutive failed requests (after retries) that open the circuit, and seconds before the primary model is tried again
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+# Errors worth retrying, by class name so no client library has to be imported
+RATE_LIMIT_ERRORS = ("ResourceExhausted", "TooManyRequests", "RateLimitError")
+TRANSIENT_ERRORS = ("ServiceUnavailable", "InternalServerError", "DeadlineExceeded", "GatewayTimeout",
+                    "BadGateway", "Aborted")
+
+
+class DeadlineExceeded(Exception):
+    """The model did not answer within the request's deadline."""
+
+
+class CircuitOpen(Exception):
+    """The primary model is failing and no fallback model was given."""
+
+
+def is_rate_limit(error):
+    return type(error).__name__ in RATE_LIMIT_ERRORS
+
+
+def is_retryable(error):
+    return (is_rate_limit(error) or type(error).__name__ in TRANSIENT_ERRORS
+            or isinstance(error, (ConnectionError, TimeoutError, DeadlineExceeded)))
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, deadline):
+        """Take a token, waiting until one is available; False if that would pass the deadline."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                ready_at = max(self.paused_until, now + (1 - self.tokens) / self.rate)
+            if ready_at > deadline:
+                return False
+            time.sleep(ready_at - now)
+
+    def pause(self, seconds):
+        """Hold back every request for a while, e.g. after the API reports a rate limit."""
+        with self.lock:
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and lets one trial through after `cooldown`."""
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, cooldown=LLM_BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.times_opened = 0
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if now - self.opened_at >= self.cooldown else "open"
+
+    def allow(self):
+        """Whether a request may go to the primary model now."""
+        with self.lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or (self.opened_at is None and self.failures >= self.failure_threshold):
+                if self.opened_at is None:
+                    self.times_opened += 1
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+
+class LLMScheduler:
+    """Shared gateway for model requests from every agent in the process.
+
+    Each request gets a deadline. With requests_per_minute set, a token
+    bucket keeps the process under the API quota, and a rate-limit error
+    pauses the bucket for everyone.
+    Failed attempts are retried with jittered exponential backoff. With
+    hedge_percentile, a duplicate is sent once an attempt runs longer than
+    that percentile of recent latencies, and the first answer wins. After
+    repeated failures the circuit breaker sends requests to the fallback
+    model (a cheaper or local one) until a trial request succeeds again.
+
+    Blocking model calls cannot be interrupted, so an attempt that misses
+    the deadline is abandoned and finishes in the background.
+    """
+
+    def __init__(self, deadline=LLM_DEADLINE, requests_per_minute=LLM_REQUESTS_PER_MINUTE, burst=LLM_BURST,
+                 max_retries=LLM_MAX_RETRIES, retry_base_delay=LLM_RETRY_BASE_DELAY,
+                 hedge_percentile=LLM_HEDGE_PERCENTILE, breaker=None, max_workers=256, seed=None,
+                 log_callback=None):
+        self.deadline = deadline
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst) if requests_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-request")
+        self.random = random.Random(seed)
+        self.log_callback = log_callback
+        self.latencies = collections.deque(maxlen=200)
+        self.lock = threading.Lock()
+        self.counts = collections.Counter()
+
+    def _count(self, key, n=1):
+        with self.lock:
+            self.counts[key] += n
+
+    def _acquire(self, deadline):
+        return self.bucket is None or self.bucket.acquire(deadline)
+
+    def hedge_delay(self):
+        """Latency after which an attempt is hedged, or None while hedging is off or unwarmed."""
+        if not self.hedge_percentile:
+            return None
+        with self.lock:
+            if len(self.latencies) < 20:
+                return None
+            return percentile(list(self.latencies), self.hedge_percentile)
+
+    def _timed(self, model, prompt):
+        start = time.monotonic()
+        response = model.generate_content(prompt)
+        with self.lock:
+            self.latencies.append(time.monotonic() - start)
+        return response
+
+    def _attempt(self, call, deadline, hedge=False):
+        """One attempt of call(), hedged if it runs long; raises the first error if every copy fails."""
+        futures = [self.executor.submit(call)]
+        hedge_delay = self.hedge_delay() if hedge else None
+        error = None
+        while futures:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"no model response within {self.deadline:.1f} s")
+            timeout = remaining
+            can_hedge = hedge_delay is not None and len(futures) == 1 and error is None
+            if can_hedge:
+                timeout = min(remaining, hedge_delay)
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.remove(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = error or e
+            if not done and can_hedge and self._acquire(time.monotonic()):
+                self._count("hedges")
+                futures.append(self.executor.submit(call))
+                hedge_delay = None
+        raise error
+
+    def _backoff(self, attempt, error, deadline):
+        """Sleep before the next attempt; False if the deadline leaves no time for one."""
+        delay = self.random.uniform(0, self.retry_base_delay * 2 ** attempt)
+        if is_rate_limit(error) and self.bucket:
+            # The quota is shared, so every agent backs off together
+            self.bucket.pause(self.retry_base_delay * 2 ** attempt)
+        if time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _with_retries(self, call, deadline, hedge):
+        """Attempts of call() with jittered retries; raises the last error."""
+        for attempt in range(self.max_retries + 1):
+            if not self._acquire(deadline):
+                self._count("rate_limited")
+                raise DeadlineExceeded("request quota exhausted until after the deadline")
+            try:
+                return self._attempt(call, deadline, hedge)
+            except Exception as e:
+                self._count("errors")
+                if attempt < self.max_retries and is_retryable(e) and self._backoff(attempt, e, deadline):
+                    self._count("retries")
+                    continue
+                raise
+
+    def _schedule(self, primary, fallback, deadline, hedge):
+        deadline = time.monotonic() + (deadline or self.deadline)
+        self._count("requests")
+        if self.breaker.allow():
+            try:
+                result = self._with_retries(primary, deadline, hedge)
+                self.breaker.record_success()
+                return result
+            except Exception as e:
+                self.breaker.record_failure()
+                if fallback is None:
+                    raise
+                if self.log_callback:
+                    self.log_callback(f"Model request failed ({type(e).__name__}), using fallback model")
+        elif fallback is None:
+            raise CircuitOpen("model circuit is open")
+
+        self._count("fallbacks")
+        # The fallback gets the rest of the deadline, or a fresh half deadline if the primary used it all
+        return self._attempt(fallback, max(deadline, time.monotonic() + self.deadline / 2))
+
+    def generate(self, model, prompt, fallback=None, deadline=None):
+        """Return model.generate_content(prompt) under the scheduler's policies.
+
+        fallback, if given, is a function returning the model to use while
+        the circuit is open or after the primary model has failed.
+        """
+        return self._schedule(lambda: self._timed(model, prompt),
+                              fallback and (lambda: fallback().generate_content(prompt)),
+                              deadline, hedge=True)
+
+    def stream(self, model, prompt, fallback=None, deadline=None):
+        """Stream model.generate_content(prompt, stream=True) under the scheduler's policies.
+
+        The deadline, retries and the circuit breaker apply until the first
+        chunk arrives; after that the stream is passed through as is.
+        Streams are not hedged.
+        """
+        return self._schedule(lambda: start_stream(model, prompt),
+                              fallback and (lambda: start_stream(fallback(), prompt)),
+                              deadline, hedge=False)
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counts)
+        stats["circuit"] = self.breaker.state
+        stats["circuit_opened"] = self.breaker.times_opened
+        stats["hedge_delay"] = self.hedge_delay()
+        return stats
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def start_stream(model, prompt):
+    """Start a streamed request and wait for its first chunk; returns an iterator over all chunks."""
+    stream = iter(model.generate_content(prompt, stream=True))
+    first = next(stream, None)
+    return _chain(first, stream)
+
+
+def _chain(first, rest):
+    if first is not None:
+        yield first
+    yield from rest
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler():
+    """Return the process-wide scheduler shared by all agents."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = LLMScheduler()
+        return _default_scheduler
@@ -0,0 +1,334 @@
+"""Indexed SQLite store of conversation logs, with a query CLI.
+
+    python log_store.py ingest logs/
+    python log_store.py metrics --scenario payment
+    python log_store.py search "UPI" --limit 10
+"""
+import os
+import gzip
+import json
+import glob
+import math
+import sqlite3
+import argparse
+
+LOG_STORE_PATH = os.getenv("LOG_STORE_PATH", "logs/conversations.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    call_id TEXT PRIMARY KEY,
+    scenario TEXT,
+    start_time REAL,
+    end_time REAL,
+    duration REAL,
+    turns INTEGER,
+    outcome TEXT,
+    input_tokens INTEGER,
+    cached_tokens INTEGER,
+    output_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS calls_scenario_start ON calls (scenario, start_time);
+CREATE INDEX IF NOT EXISTS calls_scenario_outcome ON calls (scenario, outcome);
+CREATE INDEX IF NOT EXISTS calls_scenario_duration ON calls (scenario, duration);
+
+CREATE TABLE IF NOT EXISTS turns (
+    call_id TEXT,
+    scenario TEXT,
+    timestamp REAL,
+    speaker TEXT,
+    text TEXT,
+    latency REAL,
+    UNIQUE (call_id, timestamp, speaker)
+);
+CREATE INDEX IF NOT EXISTS turns_scenario_latency ON turns (scenario, latency) WHERE latency IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS ingested (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    offset INTEGER
+);
+"""
+
+# Keyword search index; plain LIKE scans are used where SQLite lacks FTS5
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(text, content='turns', content_rowid='rowid')"
+
+
+def call_id_from_path(path):
+    """Call id for a per-call JSON log: the file name without conversation_ and .json."""
+    name = os.path.basename(path)
+    return name[len("conversation_"):-len(".json")]
+
+
+def turn_latencies(turns, last_user=None):
+    """Seconds from each user turn to the AI turn that answers it (None for other turns).
+
+    last_user is the timestamp of an unanswered user turn that came before
+    these turns, e.g. one stored by an earlier incremental ingest.
+    """
+    latencies = []
+    for turn in turns:
+        if turn.get("speaker") == "user":
+            last_user = turn.get("timestamp")
+            latencies.append(None)
+        elif last_user is not None and turn.get("timestamp") is not None:
+            latencies.append(turn["timestamp"] - last_user)
+            last_user = None
+        else:
+            latencies.append(None)
+    return latencies
+
+
+class LogStore:
+    """Loads conversation logs into SQLite and answers per-scenario questions.
+
+    Both per-call JSON files and JSONL segments (plain or gzipped) are
+    ingested. Files already ingested are skipped unless their size or
+    mtime changed; JSONL segments are read from the byte offset where the
+    last run stopped, and a segment gzipped since then resumes from the
+    same offset of its uncompressed content.
+    """
+
+    def __init__(self, path=LOG_STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        try:
+            self.db.execute(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def _ingested(self):
+        return {row[0]: row[1:] for row in self.db.execute("SELECT path, size, mtime, offset FROM ingested")}
+
+    def ingest(self, paths):
+        """Ingest log files and directories; return counts of files and calls loaded."""
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(glob.glob(os.path.join(path, "conversation_*.json")))
+                files.extend(glob.glob(os.path.join(path, "conversations-*.jsonl")))
+                files.extend(glob.glob(os.path.join(path, "conversations-*.jsonl.gz")))
+            else:
+                files.append(path)
+
+        seen = self._ingested()
+        counts = {"files": 0, "skipped": 0, "calls": 0, "turns": 0}
+        with self.db:
+            for path in sorted(files):
+                stat = os.stat(path)
+                # A gzipped segment shares its ingest progress with the plain file it replaced
+                key = path[:-3] if path.endswith(".jsonl.gz") else path
+                previous = seen.get(key)
+                if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime:
+                    counts["skipped"] += 1
+                    continue
+                if path.endswith(".json"):
+                    calls, turns = self._ingest_call_file(path)
+                    offset = stat.st_size
+                else:
+                    calls, turns, offset = self._ingest_segment(path, previous[2] if previous else 0)
+                self.db.execute("INSERT OR REPLACE INTO ingested VALUES (?, ?, ?, ?)",
+                                (key, stat.st_size, stat.st_mtime, offset))
+                counts["files"] += 1
+                counts["calls"] += calls
+                counts["turns"] += turns
+        return counts
+
+    def _ingest_call_file(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            log = json.load(f)
+        call_id = log.get("call_id") or call_id_from_path(path)
+        scenario = log.get("scenario")
+        turns = log.get("turns", [])
+        self._insert_call(call_id, scenario, log.get("start_time"), log.get("end_time"),
+                          log.get("duration"), log.get("metadata", {}), log.get("token_usage", {}),
+                          len(turns))
+        self._insert_turns(call_id, scenario, turns)
+        return 1, len(turns)
+
+    def _ingest_segment(self, path, offset):
+        """Read a JSONL segment from offset; return (calls, turns, new offset)."""
+        scenarios = {}
+        turns = {}
+        calls = 0
+        turn_count = 0
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn last line of a live segment: pick it up next run
+                    break
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                kind = record.get("type")
+                call_id = record.get("call_id")
+                if kind == "start":
+                    scenarios[call_id] = record.get("scenario")
+                elif kind == "turn":
+                    turns.setdefault(call_id, []).append(record)
+                elif kind == "end":
+                    scenarios[call_id] = record.get("scenario")
+                    self._insert_call(call_id, record.get("scenario"),
+                                      record["timestamp"] - record.get("duration", 0),
+                                      record["timestamp"], record.get("duration"),
+                                      record.get("metadata", {}), record.get("token_usage", {}), None)
+                    # Turns of this call ingested by an earlier run, before its end record
+                    self.db.execute("UPDATE turns SET scenario = ? WHERE call_id = ? AND scenario IS NULL",
+                                    (record.get("scenario"), call_id))
+                    calls += 1
+        for call_id, call_turns in turns.items():
+            self._insert_turns(call_id, scenarios.get(call_id), call_turns, resume=True)
+            turn_count += len(call_turns)
+        # Turn counts for calls spread over several runs or segments
+        self.db.execute("UPDATE calls SET turns = (SELECT COUNT(*) FROM turns WHERE turns.call_id = calls.call_id) "
+                        "WHERE turns IS NULL")
+        return calls, turn_count, offset
+
+    def _insert_call(self, call_id, scenario, start_time, end_time, duration, metadata, tokens, turns):
+        self.db.execute("INSERT OR REPLACE INTO calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (call_id, scenario, start_time, end_time, duration, turns,
+                         metadata.get("outcome"), tokens.get("input"), tokens.get("cached"),
+                         tokens.get("output")))
+
+    def _insert_turns(self, call_id, scenario, turns, resume=False):
+        """Store a call's turns; with resume, they continue turns stored by an earlier ingest."""
+        if scenario is None:
+            row = self.db.execute("SELECT scenario FROM calls WHERE call_id = ?", (call_id,)).fetchone()
+            scenario = row[0] if row else None
+        last_user = None
+        if resume:
+            # A user turn whose answer starts this batch was stored by the previous run
+            row = self.db.execute("SELECT speaker, timestamp FROM turns WHERE call_id = ? "
+                                  "ORDER BY timestamp DESC LIMIT 1", (call_id,)).fetchone()
+            if row and row[0] == "user":
+                last_user = row[1]
+        last_rowid = self.db.execute("SELECT COALESCE(MAX(rowid), 0) FROM turns").fetchone()[0]
+        rows = [(call_id, scenario, turn.get("timestamp"), turn.get("speaker"), turn.get("text"), latency)
+                for turn, latency in zip(turns, turn_latencies(turns, last_user))]
+        cursor = self.db.executemany("INSERT OR IGNORE INTO turns VALUES (?, ?, ?, ?, ?, ?)", rows)
+        if self.fts and cursor.rowcount:
+            self.db.execute("INSERT INTO turns_fts (rowid, text) SELECT rowid, text FROM turns WHERE rowid > ?",
+                            (last_rowid,))
+
+    def scenarios(self):
+        return [row[0] for row in self.db.execute("SELECT DISTINCT scenario FROM calls ORDER BY scenario")]
+
+    def _percentiles(self, table, column, where, args, points=(50, 95, 99)):
+        """Percentiles of a column, read off its (scenario, column) index without loading the rows."""
+        where = f"{where} AND {column} IS NOT NULL"
+        count = self.db.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", args).fetchone()[0]
+        result = {"count": count}
+        for p in points:
+            if not count:
+                result[f"p{p}"] = None
+                continue
+            # Nearest rank, as in metrics.percentile
+            index = max(1, math.ceil(p / 100 * count)) - 1
+            result[f"p{p}"] = self.db.execute(
+                f"SELECT {column} FROM {table} WHERE {where} ORDER BY {column} LIMIT 1 OFFSET ?",
+                args + [index]).fetchone()[0]
+        return result
+
+    def scenario_metrics(self, scenario=None, since=None):
+        """Per-scenario call counts, turns, durations, latency percentiles and outcome rates."""
+        results = {}
+        for name in ([scenario] if scenario else self.scenarios()):
+            where, args = "scenario = ?", [name]
+            turns_where, turns_args = "scenario = ?", [name]
+            if since is not None:
+                where += " AND start_time >= ?"
+                args.append(since)
+                # Turns of the same calls as the counts and durations
+                turns_where += " AND call_id IN (SELECT call_id FROM calls WHERE scenario = ? AND start_time >= ?)"
+                turns_args += [name, since]
+            calls, avg_turns, avg_duration, max_duration = self.db.execute(
+                f"SELECT COUNT(*), AVG(turns), AVG(duration), MAX(duration) FROM calls WHERE {where}",
+                args).fetchone()
+            outcomes = {outcome or "unknown": count for outcome, count in self.db.execute(
+                f"SELECT outcome, COUNT(*) FROM calls WHERE {where} GROUP BY outcome", args)}
+            results[name] = {
+                "calls": calls,
+                "avg_turns": avg_turns,
+                "avg_duration": avg_duration,
+                "p95_duration": self._percentiles("calls", "duration", where, args, (95,))["p95"],
+                "max_duration": max_duration,
+                "latency": self._percentiles("turns", "latency", turns_where, turns_args),
+                "outcome_rates": {outcome: count / calls for outcome, count in outcomes.items()} if calls else {}
+            }
+        return results
+
+    def search(self, keyword, scenario=None, limit=20):
+        """Return (call_id, speaker, text) of turns containing keyword."""
+        if self.fts:
+            query = ("SELECT turns.call_id, turns.speaker, turns.text FROM turns_fts "
+                     "JOIN turns ON turns.rowid = turns_fts.rowid WHERE turns_fts MATCH ?")
+            args = ['"' + keyword.replace('"', '""') + '"']
+        else:
+            query = "SELECT call_id, speaker, text FROM turns WHERE text LIKE ?"
+            args = [f"%{keyword}%"]
+        if scenario:
+            query += " AND turns.scenario = ?" if self.fts else " AND scenario = ?"
+            args.append(scenario)
+        query += " LIMIT ?"
+        args.append(limit)
+        return self.db.execute(query, args).fetchall()
+
+
+def format_metrics(metrics):
+    lines = []
+    for scenario, m in metrics.items():
+        latency = m["latency"]
+        lines.append(f"{scenario}: {m['calls']} calls, {m['avg_turns'] or 0:.1f} turns avg, "
+                     f"duration avg {m['avg_duration'] or 0:.1f} s p95 {m['p95_duration'] or 0:.1f} s")
+        if latency["count"]:
+            lines.append(f"  reply latency p50={latency['p50'] * 1000:.0f} ms "
+                         f"p95={latency['p95'] * 1000:.0f} ms p99={latency['p99'] * 1000:.0f} ms")
+        rates = ", ".join(f"{outcome} {rate:.0%}" for outcome, rate in sorted(m["outcome_rates"].items()))
+        lines.append(f"  outcomes: {rates}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversation log store")
+    parser.add_argument("--db", default=LOG_STORE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="load new or changed log files")
+    ingest.add_argument("paths", nargs="*", default=["logs"])
+    metrics = commands.add_parser("metrics", help="per-scenario metrics")
+    metrics.add_argument("--scenario")
+    metrics.add_argument("--since", type=float, help="only calls started after this Unix time")
+    search = commands.add_parser("search", help="keyword search over turns")
+    search.add_argument("keyword")
+    search.add_argument("--scenario")
+    search.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    store = LogStore(args.db)
+    try:
+        if args.command == "ingest":
+            counts = store.ingest(args.paths)
+            print(f"Ingested {counts['files']} files ({counts['calls']} calls, {counts['turns']} turns), "
+                  f"skipped {counts['skipped']} unchanged")
+        elif args.command == "metrics":
+            print(format_metrics(store.scenario_metrics(args.scenario, args.since)))
+        else:
+            for call_id, speaker, text in store.search(args.keyword, args.scenario, args.limit):
+                print(f"[{call_id}] {speaker}: {text}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
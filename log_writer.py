@@ -0,0 +1,180 @@
+import os
+import gzip
+import atexit
+import json
+import time
+import queue
+import shutil
+import threading
+
+
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_SEGMENT_MAX_BYTES = int(os.getenv("LOG_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+# 0 flushes after every batch of queued records; >0 groups records for up to this many seconds
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0"))
+LOG_COMPRESS = os.getenv("LOG_COMPRESS", "true").lower() == "true"
+
+_CLOSE = object()
+
+
+class LogWriter:
+    """Appends JSON records to rotating segment files from one background thread.
+
+    write() only enqueues, so callers never wait on disk. The writer thread
+    drains everything queued, writes it as JSON lines and flushes, which
+    commits all records that arrived together in one write. flush_interval
+    holds records back for up to that many seconds to group more of them
+    per flush. A segment is rotated once it reaches max_segment_bytes and
+    gzipped in the background.
+    """
+
+    def __init__(self, directory=LOG_DIR, prefix="conversations", max_segment_bytes=LOG_SEGMENT_MAX_BYTES,
+                 flush_interval=LOG_FLUSH_INTERVAL, compress=LOG_COMPRESS, fsync=False):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.flush_interval = flush_interval
+        self.compress = compress
+        self.fsync = fsync
+        self.queue = queue.Queue()
+        self.file = None
+        self.path = None
+        self.segment_bytes = 0
+        self.segment_count = 0
+        self.records_written = 0
+        self.flushes = 0
+        self.compressors = []
+        os.makedirs(directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, record):
+        """Queue a record (a JSON-serializable dict) for writing."""
+        self.queue.put(record)
+
+    def flush(self):
+        """Block until every record queued so far is on disk."""
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Write out everything queued, close the segment and wait for compression."""
+        if self.thread.is_alive():
+            self.queue.put(_CLOSE)
+            self.thread.join()
+        for compressor in self.compressors:
+            compressor.join()
+
+    def _open_segment(self):
+        self.segment_count += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(self.directory,
+                                 f"{self.prefix}-{stamp}-{os.getpid()}-{self.segment_count}.jsonl")
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.segment_bytes = 0
+
+    def _close_segment(self):
+        if self.file is None:
+            return
+        self.file.close()
+        path, self.file, self.path = self.path, None, None
+        if self.compress:
+            compressor = threading.Thread(target=compress_segment, args=(path,),
+                                          name="log-compress", daemon=True)
+            compressor.start()
+            self.compressors = [c for c in self.compressors if c.is_alive()] + [compressor]
+
+    def _commit(self):
+        if self.file is None:
+            return
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.flushes += 1
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            if self.flush_interval > 0 and item is not _CLOSE and not isinstance(item, threading.Event):
+                # Group commit: wait up to flush_interval for more records
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self.queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+                    if item is _CLOSE or isinstance(item, threading.Event):
+                        break
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiters = []
+            closing = False
+            for item in batch:
+                if item is _CLOSE:
+                    closing = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    self._write_record(item)
+            self._commit()
+            for waiter in waiters:
+                waiter.set()
+            if closing:
+                self._close_segment()
+                return
+
+    def _write_record(self, record):
+        if self.file is not None and self.segment_bytes >= self.max_segment_bytes:
+            self._close_segment()
+        if self.file is None:
+            self._open_segment()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self.file.write(line)
+        self.segment_bytes += len(line.encode('utf-8'))
+        self.records_written += 1
+
+    def stats(self):
+        return {"records": self.records_written, "flushes": self.flushes,
+                "segments": self.segment_count, "queued": self.queue.qsize()}
+
+
+def compress_segment(path):
+    """Gzip a closed segment file and remove the original."""
+    with open(path, 'rb') as src, gzip.open(path + ".gz", 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(path)
+
+
+def iter_log_records(path):
+    """Yield the records of a segment file, plain or gzipped, skipping a torn last line."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+_default_writer = None
+_default_writer_lock = threading.Lock()
+
+
+def get_log_writer():
+    """Return the process-wide log writer shared by all conversations."""
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = LogWriter()
+            atexit.register(_default_writer.close)
+        return _default_writer
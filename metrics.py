@@ -0,0 +1,36 @@
+import math
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of values using the nearest-rank method."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(values):
+    """Summarize latencies (seconds) as count, mean and p50/p95/p99."""
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99)
+    }
+
+
+UNIT_SCALES = {"s": 1, "ms": 1000, "us": 1000000}
+
+
+def format_latency_summary(summary, unit="ms"):
+    """Format a latency_summary dict in the given unit (s, ms or us)."""
+    if not summary["count"]:
+        return "no samples"
+    scale = UNIT_SCALES[unit]
+    return (f"n={summary['count']} mean={summary['mean'] * scale:.1f} {unit} "
+            f"p50={summary['p50'] * scale:.1f} {unit} p95={summary['p95'] * scale:.1f} {unit} "
+            f"p99={summary['p99'] * scale:.1f} {unit}")
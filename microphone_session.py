@@ -0,0 +1,242 @@
+import math
+import time
+import wave
+import array
+import threading
+import contextlib
+import collections
+import speech_recognition as sr
+from vad import EnergyVAD, Endpointer, SPEECH_START, SPEECH_END
+from tracing import span
+
+try:
+    import audioop
+except ImportError:  # Python 3.13+ without audioop-lts
+    audioop = None
+
+
+def frame_rms(frame, sample_width=2):
+    """Return the RMS energy of a chunk of 16-bit little-endian PCM."""
+    if audioop is not None:
+        return audioop.rms(frame, sample_width)
+    samples = array.array("h", frame[:len(frame) - len(frame) % 2])
+    if not samples:
+        return 0
+    return int(math.sqrt(sum(s * s for s in samples) / len(samples)))
+
+
+class WavFileSource:
+    """Recorded-WAV stand-in for sr.Microphone.
+
+    Exposes the same attributes the recognizer and MicrophoneSession read
+    (SAMPLE_RATE, SAMPLE_WIDTH, CHUNK and stream.read), so a call can be
+    driven from a 16-bit mono WAV file without a microphone. With realtime
+    set, reads are paced like a live device.
+    """
+
+    def __init__(self, path, chunk=1024, realtime=False):
+        self.path = path
+        self.CHUNK = chunk
+        self.realtime = realtime
+        self.stream = None
+
+    def __enter__(self):
+        self._wav = wave.open(self.path, "rb")
+        if self._wav.getnchannels() != 1 or self._wav.getsampwidth() != 2:
+            self._wav.close()
+            raise ValueError("WavFileSource needs 16-bit mono audio")
+        self.SAMPLE_RATE = self._wav.getframerate()
+        self.SAMPLE_WIDTH = self._wav.getsampwidth()
+        self.stream = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._wav.close()
+        self.stream = None
+
+    def read(self, frames):
+        """Read up to frames samples; returns b"" at the end of the file."""
+        data = self._wav.readframes(frames)
+        if self.realtime and data:
+            time.sleep(len(data) / self.SAMPLE_WIDTH / self.SAMPLE_RATE)
+        return data
+
+
+class MicrophoneSession:
+    """Long-lived capture session that calibrates once per call.
+
+    The audio stream stays open across turns. The noise floor is measured
+    once when the session opens and then tracked incrementally from the
+    silent frames seen while waiting for the caller to speak, so no turn
+    pays for a fresh ambient-noise calibration. Turns are endpointed by a
+    frame-level VAD as soon as trailing silence is detected.
+    """
+
+    def __init__(self, source=None, calibration_seconds=1.0, threshold_ratio=3.0,
+                 min_energy_threshold=300, pause_seconds=0.5, pre_roll_seconds=0.3,
+                 adapt_rate=0.05, barge_in_scale=2.0, barge_in_seconds=0.25):
+        self.source = source or sr.Microphone()
+        self.calibration_seconds = calibration_seconds
+        self.pause_seconds = pause_seconds
+        self.pre_roll_seconds = pre_roll_seconds
+        self.barge_in_scale = barge_in_scale
+        self.barge_in_seconds = barge_in_seconds
+        self.vad = EnergyVAD(threshold_ratio, min_energy_threshold, adapt_rate)
+        self.calibration_time = None
+        self.last_timing = None
+        self.position = 0.0
+        self._carry_over = []
+
+    def __enter__(self):
+        self.source.__enter__()
+        self.calibrate()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.source.__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def noise_floor(self):
+        return self.vad.noise_floor
+
+    @property
+    def energy_threshold(self):
+        """Energy above which a frame counts as speech."""
+        return self.vad.threshold
+
+    def _frame_seconds(self):
+        return self.source.CHUNK / self.source.SAMPLE_RATE
+
+    def _read_frame(self):
+        frame = self.source.stream.read(self.source.CHUNK)
+        self.position += len(frame) / self.source.SAMPLE_WIDTH / self.source.SAMPLE_RATE
+        return frame
+
+    def calibrate(self):
+        """Measure the ambient noise floor once, at the start of the call."""
+        start = time.perf_counter()
+        levels = []
+        with span("calibration"):
+            for _ in range(max(1, int(self.calibration_seconds / self._frame_seconds()))):
+                frame = self._read_frame()
+                if not frame:
+                    break
+                levels.append(frame_rms(frame, self.source.SAMPLE_WIDTH))
+            self.vad.calibrate(levels)
+        self.calibration_time = time.perf_counter() - start
+
+    def _discard_pending(self):
+        """Drop audio buffered while the agent was talking (e.g. its own voice)."""
+        pyaudio_stream = getattr(self.source.stream, "pyaudio_stream", None)
+        if pyaudio_stream is not None:
+            available = pyaudio_stream.get_read_available()
+            if available:
+                self.source.stream.read(available)
+
+    def listen(self, timeout=5, phrase_time_limit=None, on_frame=None):
+        """Capture one utterance and return it as sr.AudioData.
+
+        If the caller barged in during playback, the utterance continues from
+        the audio already captured. on_frame, if given, receives each frame
+        of the utterance as soon as it is captured, for streaming recognition.
+        Raises sr.WaitTimeoutError if nobody speaks within timeout seconds.
+        """
+        with span("listen") as listen_span:
+            audio = self._listen(timeout, phrase_time_limit, on_frame)
+            listen_span.set("wait", self.last_timing["wait"])
+            listen_span.set("speech", self.last_timing["speech"])
+            return audio
+
+    def _listen(self, timeout, phrase_time_limit, on_frame):
+        frame_seconds = self._frame_seconds()
+        endpointer = Endpointer(self.vad, frame_seconds, end_silence_seconds=self.pause_seconds)
+        pre_roll = collections.deque(maxlen=max(1, int(self.pre_roll_seconds / frame_seconds)))
+        frames = []
+        waited = 0.0
+        start = time.perf_counter()
+
+        if self._carry_over:
+            frames, self._carry_over = self._carry_over, []
+            endpointer.reset(in_speech=True)
+            if on_frame:
+                for frame in frames:
+                    on_frame(frame)
+        else:
+            self._discard_pending()
+
+        while True:
+            frame = self._read_frame()
+            if not frame:
+                break
+            event = endpointer.process(frame_rms(frame, self.source.SAMPLE_WIDTH))
+
+            if not frames:
+                pre_roll.append(frame)
+                if event == SPEECH_START:
+                    frames.extend(pre_roll)
+                    if on_frame:
+                        for frame in pre_roll:
+                            on_frame(frame)
+                    continue
+                waited += frame_seconds
+                if timeout and waited > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                continue
+
+            frames.append(frame)
+            if on_frame:
+                on_frame(frame)
+            if event == SPEECH_END:
+                break
+            if phrase_time_limit and len(frames) * frame_seconds >= phrase_time_limit:
+                break
+
+        if not frames:
+            raise sr.WaitTimeoutError("audio source ended before a phrase started")
+
+        self.last_timing = {
+            "calibration": self.calibration_time,
+            "wait": waited,
+            "speech": len(frames) * frame_seconds,
+            "capture": time.perf_counter() - start,
+            "endpoint_at": self.position
+        }
+        return sr.AudioData(b"".join(frames), self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH)
+
+    def watch_for_barge_in(self, on_barge_in, stop_event):
+        """Listen while the agent speaks and call on_barge_in when the caller talks.
+
+        Uses a higher threshold than normal listening, and does not adapt the
+        noise floor, so the agent's own voice leaking from the speaker is not
+        mistaken for the caller. Audio captured
+        from the moment of barge-in is kept as the start of the next turn.
+        Returns True if the caller barged in.
+        """
+        frame_seconds = self._frame_seconds()
+        endpointer = Endpointer(self.vad, frame_seconds, start_seconds=self.barge_in_seconds,
+                                threshold_scale=self.barge_in_scale, adapt=False)
+        pre_roll = collections.deque(maxlen=max(1, int(self.pre_roll_seconds / frame_seconds)))
+
+        while not stop_event.is_set():
+            frame = self._read_frame()
+            if not frame:
+                return False
+            pre_roll.append(frame)
+            if endpointer.process(frame_rms(frame, self.source.SAMPLE_WIDTH)) == SPEECH_START:
+                self._carry_over = list(pre_roll)
+                on_barge_in()
+                return True
+        return False
+
+    @contextlib.contextmanager
+    def barge_in(self, on_barge_in):
+        """Watch for barge-in on a background thread for the duration of the block."""
+        stop_event = threading.Event()
+        watcher = threading.Thread(target=self.watch_for_barge_in,
+                                   args=(on_barge_in, stop_event), daemon=True)
+        watcher.start()
+        try:
+            yield
+        finally:
+            stop_event.set()
+            watcher.join()
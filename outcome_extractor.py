@@ -0,0 +1,470 @@
+import os
+import re
+import json
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from config import OUTCOME_LLM_BACKEND, OUTCOME_LLM_MODEL_NAME
+from context_cache import get_context_cache
+from llm_scheduler import LLMScheduler
+from response_cache import normalize_utterance
+
+
+# Undecided caller turns collected per call before they are sent to the model in one request
+OUTCOME_LLM_BATCH_TURNS = int(os.getenv("OUTCOME_LLM_BATCH_TURNS", "4"))
+# Background threads shared by every call's extraction
+OUTCOME_WORKERS = int(os.getenv("OUTCOME_WORKERS", "8"))
+
+HINDI_NUMBERS = {"ek": 1, "do": 2, "teen": 3, "chaar": 4, "char": 4, "paanch": 5, "panch": 5, "chhe": 6,
+                 "che": 6, "saat": 7, "aath": 8, "nau": 9, "das": 10}
+
+# Day, date and time expressions, matched on normalized text
+_WHEN = re.compile(
+    r"\b(aaj|kal|parso|parson|today|tomorrow|(?:agle|is|next|this) (?:hafte|week|mahine|month)"
+    r"|(?:month|mahine)(?: ke)? end|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|somvar|mangalvar|budhvar|guruvar|shukravar|shanivar|ravivar|subah|shaam|dopahar|raat"
+    r"|morning|evening|afternoon|\d{1,2}(?:st|nd|rd|th)? (?:tarikh|jan\w*|feb\w*|mar\w*|apr\w*|may|jun\w*"
+    r"|jul\w*|aug\w*|sep\w*|oct\w*|nov\w*|dec\w*)|\d{1,2}(?: \d{2})? ?(?:baje|bje|am|pm))\b")
+_YEARS = re.compile(r"\b(\d+|" + "|".join(HINDI_NUMBERS) + r") (?:saal|sal|years?|yrs?)\b")
+
+
+def when_phrase(text):
+    """Day, date and time expressions in normalized text, joined in order, or None."""
+    found = [match.group(0) for match in _WHEN.finditer(text)]
+    return " ".join(found) if found else None
+
+
+def phrase_pattern(phrases):
+    """Regex finding any of phrases as whole words in normalized text.
+
+    A phrase ending in "*" is a stem: its last word may continue, so
+    "debug*" matches "debugging" but "ok" does not match "okay".
+    """
+    if not phrases:
+        return re.compile(r"(?!)")
+    alternatives = (re.escape(phrase[:-1]) + r"\w*" if phrase.endswith("*") else re.escape(phrase)
+                    for phrase in phrases)
+    return re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + r")(?!\w)")
+
+
+_OPTIONS = phrase_pattern(("ya", "or"))
+
+
+class OutcomeRules:
+    """Keyword and pattern rules for one scenario's outcome fields.
+
+    apply() updates the fields from one turn and returns False when the
+    turn looks relevant but the rules cannot tell what it means; those
+    turns go to the model. instructions describe the JSON the model
+    answers with, which apply_answer() merges into fields the rules left
+    open.
+    """
+
+    instructions = ""
+
+    def initial(self):
+        return {}
+
+    def apply(self, fields, sources, speaker, text, previous_ai):
+        return True
+
+    def settled(self, fields):
+        """True once no undecided turn could change the fields."""
+        return False
+
+    def apply_answer(self, fields, sources, answer):
+        pass
+
+    def takeaways(self, fields):
+        return []
+
+
+def _set(fields, sources, name, value, source):
+    fields[name] = value
+    sources[name] = source
+
+
+class CommitmentRules(OutcomeRules):
+    """Did the caller agree to something, and when.
+
+    A caller turn with an agreement cue and a day or time (its own, or the
+    one the agent just proposed) settles it; a refusal cue settles it the
+    other way. A turn with a date but no clear cue, with both cues, or
+    agreeing to one of several offered options is left to the model, and
+    so is a bare backchannel ("haan", "ok") to a proposed date, which may
+    only mean the caller is listening. An agent turn confirming the
+    booking refines the date.
+    """
+
+    agreed = ""
+    when = ""
+    # Whether an agreement cue alone, with no date anywhere, settles the agreement
+    commits_without_date = False
+    agree_cues = phrase_pattern(())
+    refuse_cues = phrase_pattern(())
+    backchannel_cues = phrase_pattern(("haan", "han", "ha", "ji", "ok", "okay", "achha", "accha", "hmm"))
+    confirm_cues = phrase_pattern(("book kar*", "note kar*", "schedule kar*", "fix kar*", "confirm kar*",
+                                   "bhej rahi", "bhej raha"))
+
+    def initial(self):
+        return {self.agreed: None, self.when: None}
+
+    def apply(self, fields, sources, speaker, text, previous_ai):
+        text = normalize_utterance(text)
+        when = when_phrase(text)
+        if speaker == "ai":
+            if fields[self.agreed] and when and self.confirm_cues.search(text):
+                _set(fields, sources, self.when, when, "rules")
+            return True
+        offered = normalize_utterance(previous_ai)
+        agree = self.agree_cues.search(text)
+        refuse = self.refuse_cues.search(text)
+        if agree and refuse:
+            return False
+        if refuse:
+            _set(fields, sources, self.agreed, False, "rules")
+            return True
+        if agree:
+            if when is None and _WHEN.search(offered) and _OPTIONS.search(offered):
+                # "kal ya parson?" answered with "theek hai": agreed, but to which option is for the model
+                _set(fields, sources, self.agreed, True, "rules")
+                return False
+            when = when or when_phrase(offered)
+            if when:
+                _set(fields, sources, self.agreed, True, "rules")
+                _set(fields, sources, self.when, when, "rules")
+            elif self.commits_without_date:
+                _set(fields, sources, self.agreed, True, "rules")
+            return True
+        if when is None and self.backchannel_cues.search(text) and _WHEN.search(offered):
+            # "haan" to a proposed slot: agreement, or just listening
+            return False
+        return when is None
+
+    def settled(self, fields):
+        return fields[self.agreed] is not None and (fields[self.agreed] is False or fields[self.when] is not None)
+
+    def apply_answer(self, fields, sources, answer):
+        if fields[self.agreed] is None and isinstance(answer.get(self.agreed), bool):
+            _set(fields, sources, self.agreed, answer[self.agreed], "llm")
+        if fields[self.agreed] and fields[self.when] is None and answer.get(self.when):
+            _set(fields, sources, self.when, str(answer[self.when]), "llm")
+
+
+class DemoRules(CommitmentRules):
+    agreed = "demo_agreed"
+    when = "demo_slot"
+    agree_cues = phrase_pattern(("theek hai", "thik hai", "chalega", "chalegi", "done", "confirm*", "book kar*",
+                                 "schedule kar*", "rakh lo", "rakh lijiye", "rakh dijiye", "fix kar*", "sure",
+                                 "bilkul", "perfect", "yes", "free hoon"))
+    refuse_cues = phrase_pattern(("zarurat nahi", "interest nahi", "interested nahi", "not interested",
+                                  "nahi chahiye", "call mat", "nahi chalega", "nahi ho payega", "cancel",
+                                  "free nahi", "time nahi"))
+    instructions = ("Read these turns from a Hinglish sales call and decide whether the caller agreed to a "
+                    "product demo. Reply with only a JSON object: "
+                    '{"demo_agreed": true, false or null, "demo_slot": "day and time agreed, or null"}.')
+
+    def takeaways(self, fields):
+        if fields["demo_agreed"]:
+            return [f"Demo agreed for {fields['demo_slot']}" if fields["demo_slot"] else
+                    "Demo agreed; slot still to be fixed"]
+        if fields["demo_agreed"] is False:
+            return ["Caller declined the demo"]
+        return ["No demo slot agreed; follow up"]
+
+
+class PaymentRules(CommitmentRules):
+    agreed = "payment_committed"
+    when = "payment_date"
+    commits_without_date = True
+    agree_cues = phrase_pattern(("kar dunga", "kar dungi", "kar denge", "kar deta", "kar deti", "kar doonga",
+                                 "pay kar", "bhej dunga", "bhej dungi", "bhej denge", "transfer kar", "clear kar",
+                                 "de dunga", "de dungi", "de denge", "ho jayega", "ho jaega"))
+    refuse_cues = phrase_pattern(("galat", "wrong", "dispute", "already paid", "pehle hi", "kar diya hai",
+                                  "paise nahi", "funds nahi", "nahi kar*", "nahi de", "nahi dunga", "nahi dungi",
+                                  "nahi denge", "nahi hoga", "nahi ho payega"))
+    instructions = ("Read these turns from a Hinglish payment follow-up call and decide whether the caller "
+                    "committed to paying the overdue invoice. Reply with only a JSON object: "
+                    '{"payment_committed": true, false or null, "payment_date": "date promised, or null"}.')
+
+    def takeaways(self, fields):
+        if fields["payment_committed"]:
+            return [f"Payment committed by {fields['payment_date']}" if fields["payment_date"] else
+                    "Payment committed without a date; confirm the date"]
+        if fields["payment_committed"] is False:
+            return ["Payment not committed (disputed or no funds); escalate"]
+        return ["No payment commitment; follow up"]
+
+
+class InterviewRules(OutcomeRules):
+    """Skill, experience and problem-solving signals in the candidate's answers.
+
+    Skills are the job's required skills (and a few aliases) named in an
+    answer. Scores from 1 to 10 are heuristics over these signals: the
+    share of required skills mentioned, answers describing a problem that
+    was solved, and the average answer length. A long answer with no signal
+    goes to the model.
+    """
+
+    aliases = {"cloud": ("aws", "gcp", "azure", "cloud"), "javascript": ("javascript", "js", "node"),
+               "machine learning": ("machine learning", "ml")}
+    problem_cues = phrase_pattern(("fix kiya", "fix kar*", "solve*", "debug*", "profil*", "optimi*", "root cause",
+                                   "bug*", "issue*", "improve kiya", "kam kiya", "leak*", "scale kiya"))
+    instructions = ("Read these answers from a Hinglish job interview and list the candidate's skill signals. "
+                    "Reply with only a JSON object: "
+                    '{"skills": ["skills the candidate says they used"], "experience_years": number or null, '
+                    '"problem_solving": true if an answer describes solving a concrete problem}.')
+
+    def __init__(self, job_data):
+        skills = [skill.strip().lower() for skill in str((job_data or {}).get("skills", "")).split(",")]
+        self.required = {skill: phrase_pattern(self.aliases.get(skill, (skill,))) for skill in skills if skill}
+
+    def initial(self):
+        return {"skills": [], "experience_years": None, "problem_solving_answers": 0,
+                "answers": 0, "answer_words": 0}
+
+    def apply(self, fields, sources, speaker, text, previous_ai):
+        if speaker != "user":
+            return True
+        text = normalize_utterance(text)
+        words = len(text.split())
+        fields["answers"] += 1
+        fields["answer_words"] += words
+        found = False
+        for skill, pattern in self.required.items():
+            if pattern.search(text):
+                found = True
+                if skill not in fields["skills"]:
+                    fields["skills"].append(skill)
+                    sources["skills"] = "rules"
+        years = _YEARS.search(text)
+        if years:
+            found = True
+            value = years.group(1)
+            _set(fields, sources, "experience_years", HINDI_NUMBERS.get(value) or int(value), "rules")
+        if self.problem_cues.search(text):
+            found = True
+            fields["problem_solving_answers"] += 1
+            sources["problem_solving_answers"] = "rules"
+        return found or words < 8
+
+    def settled(self, fields):
+        return (len(fields["skills"]) >= len(self.required) and fields["experience_years"] is not None
+                and fields["problem_solving_answers"] > 0)
+
+    def apply_answer(self, fields, sources, answer):
+        for skill in answer.get("skills") or []:
+            skill = str(skill).strip().lower()
+            if skill and skill not in fields["skills"]:
+                fields["skills"].append(skill)
+                sources["skills"] = "llm"
+        if fields["experience_years"] is None and isinstance(answer.get("experience_years"), (int, float)):
+            _set(fields, sources, "experience_years", answer["experience_years"], "llm")
+        if answer.get("problem_solving") is True:
+            fields["problem_solving_answers"] += 1
+            sources["problem_solving_answers"] = "llm"
+
+    def scores(self, fields):
+        if not fields["answers"]:
+            return None
+        matched = sum(1 for skill in self.required if skill in fields["skills"])
+        coverage = matched / len(self.required) if self.required else 0.0
+        average_words = fields["answer_words"] / fields["answers"]
+        return {"communication": 1 + min(9, round(average_words * 9 / 15)),
+                "technical": 1 + round(9 * coverage),
+                "problem_solving": 1 + min(9, 4 * fields["problem_solving_answers"])}
+
+    def takeaways(self, fields):
+        lines = [f"Skills mentioned: {', '.join(fields['skills'])}" if fields["skills"] else
+                 "No required skills mentioned"]
+        missing = [skill for skill in self.required if skill not in fields["skills"]]
+        if missing:
+            lines.append(f"Not covered: {', '.join(missing)}")
+        if fields["experience_years"] is not None:
+            lines.append(f"{fields['experience_years']} years of experience")
+        if not fields["problem_solving_answers"]:
+            lines.append("No concrete problem-solving example given")
+        return lines
+
+
+def scenario_rules(scenario, job_data=None):
+    if scenario == "demo":
+        return DemoRules()
+    if scenario == "payment":
+        return PaymentRules()
+    if scenario == "interview":
+        return InterviewRules(job_data)
+    return OutcomeRules()
+
+
+_executor = None
+_scheduler = None
+_executor_lock = threading.Lock()
+
+
+def get_outcome_executor():
+    """Return the process-wide thread pool that runs outcome extraction for all calls."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=OUTCOME_WORKERS, thread_name_prefix="outcomes")
+        return _executor
+
+
+def get_outcome_scheduler():
+    """Return the process-wide scheduler for extraction requests.
+
+    It is separate from the one replies go through, so failing extraction
+    requests open their own circuit breaker, not the conversation's.
+    """
+    global _scheduler
+    with _executor_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(max_workers=OUTCOME_WORKERS * 2)
+        return _scheduler
+
+
+class OutcomeTracker:
+    """Updates a call's structured outcome fields after every turn, off the reply path.
+
+    update() only queues the turns added since the last call; a shared
+    background pool applies the scenario's rules to them. Caller turns the
+    rules cannot decide are collected, and once batch_turns of them are
+    waiting (or the call ends) they go to the model in one request, only
+    for fields the rules have not settled. The model is asked without
+    holding the tracker's lock and its answer merged afterwards, so the
+    rules keep up with new turns meanwhile. finish() returns a Future of
+    the final results once no request is in flight.
+
+    model is used as is; by default a model bound to the extraction
+    instructions is taken from the context cache of OUTCOME_LLM_BACKEND.
+    With an empty OUTCOME_LLM_BACKEND and no model, only the rules run.
+    Requests go through get_outcome_scheduler() unless a scheduler is given.
+    """
+
+    def __init__(self, scenario, job_data=None, model=None, scheduler=None, batch_turns=OUTCOME_LLM_BATCH_TURNS,
+                 executor=None, log_callback=None):
+        self.rules = scenario_rules(scenario, job_data)
+        self.model = model
+        self.prefix_bound = False
+        self.scheduler = scheduler or get_outcome_scheduler()
+        self.batch_turns = batch_turns
+        self.executor = executor or get_outcome_executor()
+        self.log_callback = log_callback
+        self.lock = threading.Lock()
+        # Guards the fields and the undecided turns; finish() waits on it for model requests in flight
+        self.work_lock = threading.Condition()
+        self.queue = collections.deque()
+        self.turns_seen = 0
+        self.previous_ai = ""
+        self.fields = self.rules.initial()
+        self.sources = {}
+        self.undecided = []
+        self.llm_requests = 0
+        self.llm_turns = 0
+        self.llm_errors = 0
+        self.requests_in_flight = 0
+        self.finished = None
+
+    def update(self, history):
+        """Queue the turns added to history (TurnRecords) since the last update."""
+        turns = history[self.turns_seen:]
+        self.turns_seen = len(history)
+        if not turns:
+            return
+        with self.lock:
+            self.queue.extend((turn.speaker, turn.text) for turn in turns)
+        self.executor.submit(self._process, False)
+
+    def finish(self):
+        """Process the remaining turns, asking the model about any undecided ones; returns a Future of results()."""
+        with self.lock:
+            if self.finished is None:
+                self.finished = self.executor.submit(self._process, True)
+            return self.finished
+
+    def _process(self, final):
+        request = None
+        with self.work_lock:
+            with self.lock:
+                turns = list(self.queue)
+                self.queue.clear()
+            for speaker, text in turns:
+                decided = self.rules.apply(self.fields, self.sources, speaker, text, self.previous_ai)
+                if speaker == "ai":
+                    self.previous_ai = text
+                elif not decided:
+                    self.undecided.append((self.previous_ai, text))
+            if self.undecided and self.rules.settled(self.fields):
+                self.undecided.clear()
+            if self.undecided and (final or len(self.undecided) >= self.batch_turns):
+                request = self._model_request()
+        # The model is asked without the lock, so later turns keep going through the rules meanwhile
+        answer = error = None
+        if request:
+            try:
+                answer = self._ask_model(*request)
+            except Exception as e:
+                error = e
+        with self.work_lock:
+            if request:
+                self.requests_in_flight -= 1
+                if error is not None:
+                    self.llm_errors += 1
+                elif isinstance(answer, dict):
+                    self.rules.apply_answer(self.fields, self.sources, answer)
+                self.work_lock.notify_all()
+            if final:
+                while self.requests_in_flight:
+                    self.work_lock.wait()
+                results = self.results()
+        if error is not None and self.log_callback:
+            self.log_callback(f"Outcome extraction failed: {str(error)}")
+        if final:
+            return results
+
+    def _extraction_model(self):
+        if self.model is None and OUTCOME_LLM_BACKEND:
+            self.model = get_context_cache(OUTCOME_LLM_BACKEND).get_model(OUTCOME_LLM_MODEL_NAME,
+                                                                          self.rules.instructions)
+            self.prefix_bound = True
+        return self.model
+
+    def _model_request(self):
+        """Take the undecided turns as one (model, prompt) request, or None without a model; holds work_lock."""
+        turns, self.undecided = self.undecided, []
+        try:
+            model = self._extraction_model()
+        except Exception as e:
+            self.llm_errors += 1
+            if self.log_callback:
+                self.log_callback(f"Outcome extraction failed: {str(e)}")
+            return None
+        if model is None:
+            return None
+        lines = []
+        for previous_ai, text in turns:
+            if previous_ai:
+                lines.append(f"AI: {previous_ai}")
+            lines.append(f"User: {text}")
+        prompt = "[Turns]\n" + "\n".join(lines) + "\n"
+        if not self.prefix_bound:
+            prompt = f"{self.rules.instructions}\n\n{prompt}"
+        self.llm_requests += 1
+        self.llm_turns += len(turns)
+        self.requests_in_flight += 1
+        return model, prompt
+
+    def _ask_model(self, model, prompt):
+        response = self.scheduler.generate(model, prompt)
+        text = response.text or ""
+        return json.loads(text[text.index("{"):text.rindex("}") + 1])
+
+    def results(self):
+        """The outcome fields so far, where each came from, model usage and the summary's takeaways."""
+        fields = {name: value for name, value in self.fields.items() if name not in ("answers", "answer_words")}
+        if isinstance(self.rules, InterviewRules):
+            fields["candidate_scoring"] = self.rules.scores(self.fields)
+        return {"fields": fields, "sources": dict(self.sources), "llm_requests": self.llm_requests,
+                "llm_turns": self.llm_turns, "llm_errors": self.llm_errors,
+                "takeaways": self.rules.takeaways(self.fields)}
@@ -0,0 +1,175 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from context_cache import usage_tokens
+from response_cache import normalize_utterance, char_ngrams, jaccard
+
+
+# Likely caller intents per scenario, most common first: (intent, example utterance, key phrases).
+# Candidate replies are generated for the example utterance, so it should
+# state the intent without details that differ from caller to caller.
+INTENTS = {
+    "payment": [
+        ("commit_date", "haan, main jaldi payment kar dunga",
+         ("kar dunga", "kar denge", "kar dungi", "pay kar", "payment kar", "bhej dunga", "bhej denge",
+          "transfer kar", "agle hafte", "next week", "kal tak", "is hafte", "tak kar")),
+        ("ask_details", "kaunsa invoice hai, details bata dijiye",
+         ("kaunsa", "konsa", "which invoice", "details", "detail", "kitna amount", "kitne ka", "copy bhej",
+          "email kar", "bata dijiye")),
+        ("dispute", "yeh amount galat hai, humne pehle hi payment kar diya hai",
+         ("galat", "wrong", "dispute", "pehle hi", "already paid", "kar diya hai", "nahi banta", "mistake")),
+        ("need_time", "abhi paise nahi hain, thoda time chahiye",
+         ("time chahiye", "waqt chahiye", "paise nahi", "funds nahi", "mushkil", "extension", "thoda time")),
+    ],
+    "demo": [
+        ("interested", "haan, demo dekh sakte hain",
+         ("demo dekh", "haan demo", "interested", "dikhaiye", "dekh sakte", "schedule kar", "book kar")),
+        ("ask_price", "iska price kitna hai",
+         ("price", "kitne ka", "cost", "kitna lagega", "pricing", "charges", "kitna hai")),
+        ("busy_later", "abhi busy hoon, baad mein call kijiye",
+         ("busy", "baad mein", "later", "meeting mein", "abhi nahi", "call back")),
+        ("not_interested", "humein iski zarurat nahi hai",
+         ("zarurat nahi", "interest nahi", "not interested", "pehle se", "already use", "nahi chahiye")),
+    ],
+    "interview": [
+        ("available", "haan, main interview ke liye available hoon",
+         ("available", "free hoon", "haan interview", "kar sakta", "kar sakti", "theek hai")),
+        ("ask_role", "is role mein kya kaam hoga",
+         ("role", "kya kaam", "responsibilities", "job description", "profile", "team")),
+        ("ask_salary", "salary kitni hai",
+         ("salary", "package", "ctc", "kitna milega", "pay scale")),
+        ("not_looking", "main abhi job change nahi karna chahta",
+         ("nahi karna", "not looking", "change nahi", "happy hoon", "interest nahi")),
+    ],
+}
+
+
+class IntentClassifier:
+    """Maps a caller utterance to one of a scenario's intents, or None.
+
+    Each key phrase found in the normalized utterance scores one point, and
+    character-trigram similarity to the intent's example adds up to one
+    more. An utterance with no key phrase needs min_similarity to the
+    example, and a tie between the two best intents is left unclassified.
+    """
+
+    def __init__(self, intents, min_similarity=0.5):
+        self.min_similarity = min_similarity
+        self.intents = [(name, char_ngrams(normalize_utterance(example)), phrases)
+                        for name, example, phrases in intents]
+
+    def classify(self, utterance):
+        text = normalize_utterance(utterance)
+        grams = char_ngrams(text)
+        padded = f" {text} "
+        scores = []
+        for name, example_grams, phrases in self.intents:
+            hits = sum(1 for phrase in phrases if f" {phrase} " in padded)
+            similarity = jaccard(grams, example_grams)
+            if hits or similarity >= self.min_similarity:
+                scores.append((hits + similarity, name))
+        if not scores:
+            return None
+        scores.sort(reverse=True)
+        if len(scores) > 1 and scores[0][0] - scores[1][0] < 0.05:
+            return None
+        return scores[0][1]
+
+
+class PreGenerator:
+    """Generates replies to the caller's most likely next intents while the agent is speaking.
+
+    Call start() once the agent's reply is recorded, as its playback begins:
+    a reply to each intent's example utterance is requested in the
+    background. When the caller's transcript arrives, take() classifies it
+    and returns the prepared reply for that intent, recording the exchange;
+    the other candidates are cancelled and take() returns None so the reply
+    is generated normally. Requests that already reached the model cannot
+    be aborted, so a miss only costs tokens.
+    """
+
+    def __init__(self, agent, intents=None, max_candidates=4, log_callback=None):
+        self.agent = agent
+        intents = INTENTS.get(agent.scenario, []) if intents is None else intents
+        self.intents = intents[:max_candidates]
+        self.classifier = IntentClassifier(intents)
+        self.log_callback = log_callback
+        self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.intents)),
+                                           thread_name_prefix="pregenerate")
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.history_length = None
+        self.hits = 0
+        self.misses = 0
+        self.unclassified = 0
+        self.generated = 0
+        self.time_saved = 0.0
+
+    def start(self):
+        """Request a candidate reply for every likely intent of the caller's next turn."""
+        with self.lock:
+            self._cancel(self.pending)
+            self.history_length = len(self.agent.conversation_history)
+            self.pending = {}
+            for intent, example, _ in self.intents:
+                prompt = self.agent.preview_prompt(example)
+                self.pending[intent] = self.executor.submit(self._generate, prompt)
+
+    def _generate(self, prompt):
+        start = time.perf_counter()
+        response = self.agent.request(prompt)
+        with self.lock:
+            self.generated += 1
+        return (self.agent.clean_response(response.text), time.perf_counter() - start,
+                usage_tokens(response))
+
+    @staticmethod
+    def _cancel(futures):
+        for future in futures.values():
+            future.cancel()
+
+    def take(self, transcript):
+        """Return the prepared reply for the transcript's intent, recorded as this turn, or None."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            # Candidates are only valid for the conversation they were built from
+            current = self.history_length == len(self.agent.conversation_history)
+        intent = self.classifier.classify(transcript) if pending and current else None
+        future = pending.pop(intent, None)
+        self._cancel(pending)
+        if future is None:
+            if pending and intent is None:
+                self.unclassified += 1
+            self.misses += 1
+            return None
+
+        try:
+            waited_from = time.perf_counter()
+            ai_response, generation_time, tokens = future.result()
+        except Exception as e:
+            if self.log_callback:
+                self.log_callback(f"Pre-generated reply failed: {str(e)}")
+            self.misses += 1
+            return None
+        if not ai_response:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.time_saved += max(0.0, generation_time - (time.perf_counter() - waited_from))
+        self.agent.record_exchange(transcript, ai_response, tokens)
+        if self.log_callback:
+            self.log_callback(f"Reply served from pre-generated '{intent}' candidate")
+        return ai_response
+
+    def stats(self):
+        """Hit/miss counts, model requests made, and total model time saved."""
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "unclassified": self.unclassified,
+                "hit_rate": self.hits / total if total else 0.0, "generated": self.generated,
+                "time_saved": self.time_saved}
+
+    def close(self):
+        with self.lock:
+            self._cancel(self.pending)
+            self.pending = {}
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,182 @@
+import os
+import copy
+import math
+
+
+# Rough size of a Gemini token for Latin-script Hinglish text
+CHARS_PER_TOKEN = 4
+
+PROMPT_HISTORY_TOKENS = int(os.getenv("PROMPT_HISTORY_TOKENS", "250"))
+PROMPT_SUMMARY_TOKENS = int(os.getenv("PROMPT_SUMMARY_TOKENS", "100"))
+
+# Static part of each scenario prompt: system and instruction blocks, the same for every contact
+SCENARIO_TEMPLATES = {
+    "demo": """
+[System Instructions]
+You are an ERP sales representative for I-Max India. Your goal is to schedule a demo for the customer.
+Your name is Parul Sharma. Speak in Hinglish with a friendly yet professional tone.
+
+[Additional Instructions]
+1. Understand the customer's requirements.
+2. Explain relevant features briefly.
+3. Suggest 2-3 demo time slots.
+4. Be polite yet persuasive.
+5. Keep responses concise (3-5 sentences).
+6. Use natural Hinglish.
+""",
+    "interview": """
+[System Instructions]
+You are Priya Patel, an HR manager conducting a technical screening interview. Speak in natural Hinglish with a professional tone.
+
+[Additional Instructions]
+1. Ask technical questions related to required skills.
+2. Follow up on responses for depth.
+3. Assess communication and problem-solving skills.
+4. Use natural Hinglish.
+""",
+    "payment": """
+[System Instructions]
+You are Amita Kumari from the accounts department. Your goal is to remind the customer about pending payment.
+Speak in Hinglish with a polite but firm tone.
+
+[Additional Instructions]
+1. Politely remind about the pending payment.
+2. Mention invoice details and due date.
+3. Ask for a commitment on payment.
+4. Use natural Hinglish.
+"""
+}
+
+# Per-contact part, sent with each turn so every call of a scenario shares the static part
+CONTEXT_TEMPLATES = {
+    "demo": """[Context]
+Customer: {customer[name]} from {customer[company]}
+Interest: {customer[interest]}
+Location: {customer[location]}
+
+""",
+    "interview": """[Context]
+Position: {job[position]}
+Required skills: {job[skills]}
+Experience: {job[experience]}
+Location: {job[location]}
+Work type: {job[work_type]}
+
+""",
+    "payment": """[Context]
+Customer: {customer[name]} from {customer[company]}
+Pending Amount: ₹{invoice[amount]}
+Days Late: {invoice[days_late]}
+Invoice: {invoice[invoice_number]}
+Due Date: {invoice[due_date]}
+Payment Options: {invoice[payment_options]}
+
+"""
+}
+
+# How the other party is labelled in the current-input block
+INPUT_LABELS = {"demo": "Customer", "interview": "Candidate", "payment": "Customer"}
+
+
+def estimate_tokens(text):
+    """Cheaply estimate the token count of a piece of text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def condense_turn(turn, max_words=12):
+    """Shorten a history line to its first sentence, capped at max_words."""
+    speaker, _, text = str(turn).partition(": ")
+    first_sentence = text.split(". ")[0].split("? ")[0]
+    words = first_sentence.split()
+    if len(words) > max_words:
+        first_sentence = " ".join(words[:max_words]) + "..."
+    return f"{speaker}: {first_sentence}"
+
+
+class PromptBuilder:
+    """Builds a scenario prompt from a precompiled static block and a token-budgeted history.
+
+    The static block holds the scenario's instructions and is identical for
+    every contact; the contact's context block is rendered once, when the
+    agent's scenario data is known. Each turn sends the context block, the
+    history window and the current input after the static block. The window keeps as many recent turns as
+    fit in history_tokens; older turns are condensed into a rolling summary
+    capped at summary_tokens.
+
+    history is a list of "User: ..." / "AI: ..." lines or anything whose
+    str() gives one, such as a TurnHistory. Only turns from
+    summarized_count on are read again, so older ones may be dropped.
+    """
+
+    def __init__(self, scenario, customer_data, job_data, invoice_data,
+                 history_tokens=PROMPT_HISTORY_TOKENS, summary_tokens=PROMPT_SUMMARY_TOKENS):
+        if scenario not in SCENARIO_TEMPLATES:
+            scenario = "demo"
+        self.static_block = SCENARIO_TEMPLATES[scenario]
+        self.context_block = CONTEXT_TEMPLATES[scenario].format(customer=customer_data, job=job_data,
+                                                                invoice=invoice_data)
+        self.input_label = INPUT_LABELS.get(scenario, "Customer")
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.summary_lines = []
+        self.summary_token_count = 0
+        self.summarized_count = 0
+        # Token estimates of the turns from summarized_count on
+        self.turn_tokens = []
+
+    def copy(self):
+        """A builder sharing the static block, with its own copy of the summary state."""
+        builder = copy.copy(self)
+        builder.summary_lines = list(self.summary_lines)
+        builder.turn_tokens = list(self.turn_tokens)
+        return builder
+
+    def _tokens_for(self, history):
+        """Return per-turn token estimates, computing only turns not seen before."""
+        # The newest turn may be a speculative preview, so it is always re-estimated
+        del self.turn_tokens[max(0, len(history) - 1 - self.summarized_count):]
+        for index in range(self.summarized_count + len(self.turn_tokens), len(history)):
+            self.turn_tokens.append(estimate_tokens(str(history[index])))
+        return self.turn_tokens
+
+    def window_start(self, history):
+        """Index of the oldest history turn that fits in the token budget."""
+        tokens = self._tokens_for(history)
+        base = self.summarized_count
+        used = 0
+        start = len(history)
+        while start > base and used + tokens[start - 1 - base] <= self.history_tokens:
+            start -= 1
+            used += tokens[start - base]
+        # Never pull turns back out of the summary once they are in it
+        return max(start, self.summarized_count)
+
+    def _summarize_until(self, history, start):
+        """Fold turns that fell out of the window into the rolling summary."""
+        for turn in history[self.summarized_count:start]:
+            line = condense_turn(turn)
+            self.summary_lines.append(line)
+            self.summary_token_count += estimate_tokens(line)
+        if start > self.summarized_count:
+            del self.turn_tokens[:start - self.summarized_count]
+            self.summarized_count = start
+
+        while self.summary_lines and self.summary_token_count > self.summary_tokens:
+            self.summary_token_count -= estimate_tokens(self.summary_lines.pop(0))
+
+    def dynamic_block(self, user_input, history):
+        """Render the per-turn part of the prompt: contact context, summary, history window and input."""
+        start = self.window_start(history)
+        self._summarize_until(history, start)
+
+        parts = [self.context_block]
+        if self.summary_lines:
+            parts.append("[Earlier in the Call]\n" + "\n".join(self.summary_lines) + "\n\n")
+        parts.append("[Conversation History]\n" + "\n".join(map(str, history[start:])) + "\n\n")
+        parts.append(f"[Current Input]\n{self.input_label}: {user_input}\n\n")
+        parts.append("[Your Response in Hinglish]\n")
+        return "".join(parts)
+
+    def build(self, user_input, history):
+        """Return the full prompt for this turn."""
+        return f"{self.static_block}\n{self.dynamic_block(user_input, history)}"
@@ -0,0 +1,162 @@
+import re
+import math
+import time
+import threading
+from collections import OrderedDict
+
+
+# Customer-specific fields substituted in and out of cached replies. Short
+# numeric fields such as days_late are left out: "10" could just as well be a time.
+# A reply that still holds a digit or any other contact value is not cached.
+TEMPLATE_FIELDS = ("name", "company", "amount", "invoice_number", "due_date", "position", "interest")
+
+
+def normalize_utterance(text):
+    """Lower-case, strip punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def char_ngrams(text, n=3):
+    """Character n-grams of a normalized utterance, padded at word edges."""
+    padded = f" {text} "
+    return frozenset(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def to_template(reply, fields):
+    """Replace per-customer values in a reply with {field} placeholders."""
+    # Longest values first so "5,00,000" is not split by a shorter field value
+    for key, value in sorted(fields.items(), key=lambda item: -len(str(item[1]))):
+        if value and len(str(value)) > 2:
+            # Word boundaries, without matching inside digit groups like 13,50,000
+            pattern = r"(?<!\w)(?<!\d,)" + re.escape(str(value)) + r"(?!\w)(?!,\d)"
+            reply = re.sub(pattern, lambda match: "{" + key + "}", reply)
+    return reply
+
+
+def customer_specific(template, values):
+    """Whether a reply template still holds a figure or one of the contact's values.
+
+    Any digit counts, since amounts, dates and days late written in another
+    form than the contact's fields ("13.5 lakh", "25 din") are not templated.
+    List values such as payment options are checked item by item.
+    """
+    if re.search(r"\d", template):
+        return True
+    text = template.lower()
+    for value in values:
+        for part in re.split(r"[,/]", str(value)):
+            part = part.strip().lower()
+            if len(part) > 2 and re.search(r"(?<!\w)" + re.escape(part) + r"(?!\w)", text):
+                return True
+    return False
+
+
+def fill_template(template, fields):
+    """Substitute the current customer's values into a cached reply template."""
+    for key, value in fields.items():
+        template = template.replace("{" + key + "}", str(value))
+    return template
+
+
+class ResponseCache:
+    """Caches agent replies for near-duplicate user utterances.
+
+    Entries are keyed by scenario and dialogue state, and matched on the
+    normalized utterance: exact matches first, then character-trigram
+    Jaccard similarity (robust to Hinglish spelling variants) or cosine
+    similarity if an embed function is supplied. Per-customer values are
+    stored as placeholders and filled in on a hit; replies with anything
+    customer-specific left after that are not stored. Entries expire after
+    ttl_seconds and the least recently used are evicted beyond max_entries.
+    """
+
+    def __init__(self, similarity_threshold=0.65, ttl_seconds=3600, max_entries=2000, embed=None):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.embed = embed
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def _features(self, normalized):
+        return self.embed(normalized) if self.embed else char_ngrams(normalized)
+
+    def _similarity(self, a, b):
+        return cosine(a, b) if self.embed else jaccard(a, b)
+
+    def lookup(self, scenario, state, utterance, fields):
+        """Return a cached reply for a similar utterance, or None."""
+        normalized = normalize_utterance(utterance)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get((scenario, state, normalized))
+            if entry is None or now - entry["created"] > self.ttl_seconds:
+                entry = self._best_match(scenario, state, normalized, now)
+
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(entry["key"])
+            self.hits += 1
+            return fill_template(entry["template"], fields)
+
+    def _best_match(self, scenario, state, normalized, now):
+        features = self._features(normalized)
+        best, best_score = None, self.similarity_threshold
+        expired = []
+        for key, entry in self.entries.items():
+            if now - entry["created"] > self.ttl_seconds:
+                expired.append(key)
+                continue
+            if key[0] != scenario or key[1] != state:
+                continue
+            score = self._similarity(features, entry["features"])
+            if score >= best_score:
+                best, best_score = entry, score
+        for key in expired:
+            del self.entries[key]
+        return best
+
+    def store(self, scenario, state, utterance, reply, fields, contact_values=()):
+        """Cache a reply, turning per-customer values into placeholders.
+
+        contact_values are all of the contact's values; a reply still holding
+        one of them, or any digit, after templating is not cached.
+        """
+        normalized = normalize_utterance(utterance)
+        if not normalized or not reply:
+            return
+        template = to_template(reply, fields)
+        key = (scenario, state, normalized)
+        with self.lock:
+            if customer_specific(template, contact_values):
+                self.rejected += 1
+                return
+            self.entries[key] = {"key": key, "features": self._features(normalized),
+                                 "template": template, "created": time.time()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        """Return hit/miss counters and the current hit rate."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self.entries), "rejected": self.rejected}
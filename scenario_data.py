@@ -0,0 +1,117 @@
+import os
+import json
+import threading
+from types import MappingProxyType
+from collections import ChainMap
+
+
+SCENARIO_DATA_DIR = os.getenv("SCENARIO_DATA_DIR", "data")
+
+# Sections of data/{scenario}_data.json; each is one object or a list of them
+SCENARIO_SECTIONS = ("customer", "job", "invoice")
+
+# Default contact fields per section, shared read-only by every agent
+SCENARIO_DEFAULTS = {
+    "customer": MappingProxyType({
+        "name": "Customer",
+        "company": "ABC Corp",
+        "interest": "ERP system",
+        "email": "customer@example.com",
+        "phone": "+91 98765 43210",
+        "location": "Mumbai"
+    }),
+    "job": MappingProxyType({
+        "position": "Software Engineer",
+        "skills": "Python, React, Cloud",
+        "experience": "3-5 years",
+        "salary": "30-35 LPA",
+        "location": "Bangalore",
+        "work_type": "Hybrid"
+    }),
+    "invoice": MappingProxyType({
+        "amount": "13,50,000",
+        "days_late": "25",
+        "invoice_number": "INV-2023-045",
+        "due_date": "15th March 2025",
+        "payment_options": "UPI, NEFT, Cheque"
+    }),
+}
+
+_file_cache = {}
+_file_cache_lock = threading.Lock()
+
+
+def scenario_file(scenario, data_dir=None):
+    return os.path.join(data_dir or SCENARIO_DATA_DIR, f"{scenario}_data.json")
+
+
+def load_scenario_file(scenario, data_dir=None):
+    """Return the parsed scenario data file, or None if there is none.
+
+    The file is parsed once per process and only re-read when its
+    modification time changes. The result is shared, so treat it as
+    read-only.
+    """
+    path = scenario_file(scenario, data_dir)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _file_cache_lock:
+        cached = _file_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    with _file_cache_lock:
+        _file_cache[path] = (mtime, data)
+    return data
+
+
+def record_count(data):
+    """Number of contacts in scenario data: the length of its longest list section."""
+    lengths = [len(data[section]) for section in SCENARIO_SECTIONS
+               if isinstance(data.get(section), list)]
+    return max(lengths, default=1)
+
+
+def scenario_record(data, index=0):
+    """Return the index-th contact of scenario data as {section: fields}.
+
+    List sections are read in parallel by index (a shorter list repeats its
+    last entry); a single object applies to every contact. The section dicts
+    are the loaded ones, not copies.
+    """
+    record = {}
+    for section in SCENARIO_SECTIONS:
+        value = data.get(section)
+        if isinstance(value, list):
+            if value:
+                record[section] = value[min(index, len(value) - 1)]
+        elif value:
+            record[section] = value
+    return record
+
+
+def contact_fields(record, section):
+    """Read-only view of a contact's fields for a section, over the shared defaults.
+
+    Nothing is copied: the record's own fields (a loaded, shared dict) are
+    looked up first, then the defaults.
+    """
+    overrides = (record or {}).get(section)
+    if not overrides:
+        return SCENARIO_DEFAULTS[section]
+    return MappingProxyType(ChainMap(overrides, SCENARIO_DEFAULTS[section]))
+
+
+def iter_contacts(scenario, data_dir=None, start=0):
+    """Yield (index, record) for every contact in the scenario data file."""
+    data = load_scenario_file(scenario, data_dir)
+    if data is None:
+        return
+    for index in range(start, record_count(data)):
+        yield index, scenario_record(data, index)
@@ -0,0 +1,254 @@
+"""Headless call server: one ColdCallAgent session per WebSocket connection.
+
+    python server.py --port 8765          # STT_BACKEND, LLM_BACKEND and TTS_BACKEND engines
+    python server.py --port 8765 --fake   # stub backends, for load testing
+
+Protocol, one call per connection:
+
+    client -> server  {"type": "start", "scenario": "payment"}     first message
+                      binary: 16-bit mono PCM at SAMPLE_RATE, in chunks of any size
+                      {"type": "text", "text": "..."}               an already transcribed utterance
+                      {"type": "end"}                               hang up
+    server -> client  {"type": "started", "call_id": "..."}
+                      {"type": "transcript", "speaker": "user" | "ai", "text": "..."}
+                      binary: synthesized audio (mp3, or WAV from offline engines) of each agent line
+                      {"type": "ended", "outcome": "...", "outcomes": {...}}   extracted outcome fields
+
+No GUI, microphone or sound card is used: the caller's audio is endpointed
+with the same energy VAD as the desktop app, and speech goes through async
+STT/TTS backends on thread pools while the CallEngine bounds LLM concurrency.
+"""
+import json
+import asyncio
+import argparse
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import websockets
+from call_engine import CallEngine, CallSession
+from cold_call_agent import ColdCallAgent, OPENING_MESSAGES, DEFAULT_OPENING_MESSAGE
+from backends import create_backend
+from config import (SPEECH_RECOGNITION_LANGUAGE, TEXT_TO_SPEECH_LANGUAGE, TEXT_TO_SPEECH_TLD,
+                    TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, TTS_CACHE_MAX_DISK_BYTES, STT_BACKEND, TTS_BACKEND)
+from microphone_session import frame_rms
+from tts_cache import TTSCache, clean_tts_text
+from vad import EnergyVAD, Endpointer, SPEECH_START, SPEECH_END
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+FRAME_SECONDS = 0.02
+# Initial caller audio used to measure the line's noise floor
+CALIBRATION_SECONDS = 0.3
+PRE_ROLL_SECONDS = 0.3
+
+
+class ThreadedSTT:
+    """Async wrapper running a speech recognition engine on a thread pool.
+
+    Utterances that arrive as text (already transcribed by the client) are
+    passed through unchanged.
+    """
+
+    def __init__(self, executor, engine):
+        self.executor = executor
+        self.engine = engine
+
+    async def transcribe(self, audio):
+        if isinstance(audio, str):
+            return audio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.engine.transcribe, audio, SAMPLE_RATE)
+
+
+class ThreadedTTS:
+    """Async wrapper running a speech synthesis engine on a thread pool, through the shared TTS cache."""
+
+    def __init__(self, executor, engine, cache, language=TEXT_TO_SPEECH_LANGUAGE):
+        self.executor = executor
+        self.engine = engine
+        self.cache = cache
+        self.language = language
+
+    def _synthesize(self, text):
+        cleaned_text = clean_tts_text(text)
+        cached = self.cache.get(cleaned_text, self.language, self.engine.voice)
+        if cached is not None:
+            with cached:
+                return bytes(cached.read())
+        audio = self.engine.synthesize(cleaned_text)
+        self.cache.put(cleaned_text, self.language, self.engine.voice, audio)
+        return audio
+
+    async def synthesize(self, text):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._synthesize, text)
+
+
+class WebSocketCaller:
+    """Audio input and output of one call over a WebSocket connection.
+
+    Binary messages are split into frames and endpointed; read_utterance()
+    returns an utterance's PCM once the caller pauses, the text of a "text"
+    message, or None when the caller hangs up.
+    """
+
+    def __init__(self, websocket, pause_seconds=0.5):
+        self.websocket = websocket
+        self.frame_bytes = int(SAMPLE_RATE * FRAME_SECONDS) * SAMPLE_WIDTH
+        self.vad = EnergyVAD()
+        self.endpointer = Endpointer(self.vad, FRAME_SECONDS, end_silence_seconds=pause_seconds)
+        self.calibration_frames = int(CALIBRATION_SECONDS / FRAME_SECONDS)
+        self.calibration = []
+        self.pending = b""
+        self.pre_roll = collections.deque(maxlen=int(PRE_ROLL_SECONDS / FRAME_SECONDS))
+        self.frames = []
+        self.closed = False
+
+    def _feed(self, data):
+        """Endpoint incoming PCM; return a finished utterance or None."""
+        self.pending += data
+        utterance = None
+        while len(self.pending) >= self.frame_bytes and utterance is None:
+            frame, self.pending = self.pending[:self.frame_bytes], self.pending[self.frame_bytes:]
+            energy = frame_rms(frame, SAMPLE_WIDTH)
+            if len(self.calibration) < self.calibration_frames:
+                self.calibration.append(energy)
+                self.vad.calibrate(self.calibration)
+                continue
+            event = self.endpointer.process(energy)
+            if event == SPEECH_START:
+                # Keep the onset that was heard before the VAD committed to speech
+                self.frames.extend(self.pre_roll)
+                self.pre_roll.clear()
+                self.frames.append(frame)
+            elif self.frames:
+                self.frames.append(frame)
+                if event == SPEECH_END:
+                    utterance, self.frames = b"".join(self.frames), []
+            else:
+                self.pre_roll.append(frame)
+        return utterance
+
+    async def read_utterance(self):
+        # Audio left over after the previous utterance ended
+        utterance = self._feed(b"") if self.pending else None
+        while utterance is None:
+            if self.closed:
+                return None
+            try:
+                message = await self.websocket.recv()
+            except websockets.ConnectionClosed:
+                self.closed = True
+                return None
+            if isinstance(message, bytes):
+                utterance = self._feed(message)
+                continue
+            event = json.loads(message)
+            if event.get("type") == "text":
+                return event.get("text", "")
+            if event.get("type") == "end":
+                self.closed = True
+                return None
+        return utterance
+
+    async def play(self, audio):
+        if isinstance(audio, str):
+            audio = audio.encode("utf-8")
+        await self.send_event(audio)
+
+    async def send_event(self, event):
+        """Send a JSON event (or raw bytes); a vanished client is not an error."""
+        try:
+            await self.websocket.send(event if isinstance(event, bytes) else json.dumps(event))
+        except websockets.ConnectionClosed:
+            self.closed = True
+
+
+class CallServer:
+    """Accepts WebSocket connections and runs each as a call on one CallEngine."""
+
+    def __init__(self, engine, make_agent, max_turns=20, log_callback=None):
+        self.engine = engine
+        self.make_agent = make_agent
+        self.max_turns = max_turns
+        self.log_callback = log_callback
+        self.active_calls = 0
+
+    async def handle(self, websocket):
+        try:
+            start = json.loads(await websocket.recv())
+        except (websockets.ConnectionClosed, ValueError):
+            return
+        scenario = start.get("scenario", "demo")
+        caller = WebSocketCaller(websocket)
+        agent = self.make_agent(scenario)
+        session = CallSession(agent.logger.call_id, agent, caller, caller,
+                              opening=OPENING_MESSAGES.get(scenario, DEFAULT_OPENING_MESSAGE),
+                              max_turns=self.max_turns, on_event=caller.send_event)
+        self.active_calls += 1
+        try:
+            await caller.send_event({"type": "started", "call_id": session.call_id})
+            await self.engine.run_call(session)
+            if session.log_saved:
+                # The outcomes are in the log metadata once it is saved
+                try:
+                    await asyncio.wrap_future(session.log_saved)
+                except Exception as e:
+                    if self.log_callback:
+                        self.log_callback(f"Call {session.call_id} log not saved: {str(e)}")
+            await caller.send_event({"type": "ended", "outcome": session.outcome,
+                                     "outcomes": agent.logger.get_summary()["outcomes"]})
+        finally:
+            self.active_calls -= 1
+
+    async def serve(self, host, port):
+        async with websockets.serve(self.handle, host, port, max_size=2 ** 22):
+            if self.log_callback:
+                self.log_callback(f"Call server listening on ws://{host}:{port}")
+            await asyncio.Future()
+
+
+def build_server(fake=False, llm_concurrency=32, io_workers=32, max_turns=20):
+    """Create a CallServer with the configured backends, or async stub ones for load testing."""
+    if fake:
+        from fake_backends import FakeStreamingModel, StubSTT, StubTTS
+        stt, tts = StubSTT(0.1), StubTTS(0.1)
+        model = FakeStreamingModel(first_token_delay=0.4, chunk_delay=0)
+        outcome_model = FakeStreamingModel(reply="{}", first_token_delay=0.2, chunk_delay=0)
+
+        def make_agent(scenario):
+            return ColdCallAgent(scenario, model=model, outcome_model=outcome_model)
+    else:
+        executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="speech")
+        stt = ThreadedSTT(executor, create_backend("stt", STT_BACKEND, language=SPEECH_RECOGNITION_LANGUAGE))
+        tts = ThreadedTTS(executor, create_backend("tts", TTS_BACKEND, language=TEXT_TO_SPEECH_LANGUAGE,
+                                                   tld=TEXT_TO_SPEECH_TLD),
+                          TTSCache(TTS_CACHE_MAX_BYTES, TTS_CACHE_DIR, TTS_CACHE_MAX_DISK_BYTES))
+
+        def make_agent(scenario):
+            return ColdCallAgent(scenario)
+
+    engine = CallEngine(stt, tts, max_concurrent_llm=llm_concurrency, log_callback=print)
+    return CallServer(engine, make_agent, max_turns=max_turns, log_callback=print)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless WebSocket call server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fake", action="store_true", help="use stub STT/LLM/TTS backends")
+    parser.add_argument("--llm-concurrency", type=int, default=32)
+    parser.add_argument("--io-workers", type=int, default=32, help="threads for STT and TTS requests")
+    parser.add_argument("--max-turns", type=int, default=20)
+    args = parser.parse_args()
+
+    server = build_server(args.fake, args.llm_concurrency, args.io_workers, args.max_turns)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,79 +1,124 @@
-import os
-import re
+import io
 import time
-import threading
 import speech_recognition as sr
-from gtts import gTTS
-import pygame
-from dotenv import load_dotenv
-import google.generativeai as genai
+from config import (SPEECH_RECOGNITION_LANGUAGE, TEXT_TO_SPEECH_LANGUAGE, TEXT_TO_SPEECH_TLD,
+                    TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, TTS_CACHE_MAX_DISK_BYTES, STT_BACKEND, STT_FALLBACK_BACKEND,
+                    TTS_BACKEND)
+from backends import create_backend
+from tts_cache import TTSCache, clean_tts_text
+from tracing import span
 
 
-# Load API keys and configurations from .env
-load_dotenv()
-
-# Configuration variables - move API keys to .env
-GEMINI_API_KEY = "XXXXXXXXXXXXXXXXXXXX"
-# Configure Gemini API
-genai.configure(api_key=GEMINI_API_KEY)
-
-SPEECH_RECOGNITION_LANGUAGE = os.getenv("SPEECH_RECOGNITION_LANGUAGE", "en-IN")
-TEXT_TO_SPEECH_LANGUAGE = os.getenv("TEXT_TO_SPEECH_LANGUAGE", "en-IN")
-TEXT_TO_SPEECH_TLD = os.getenv("TEXT_TO_SPEECH_TLD", "co.in")
-
-
-# Initialize pygame mixer for audio playback
-pygame.mixer.init()
-
 class SpeechProcessor:
-    """Handles speech recognition and synthesis with Hinglish optimization."""
+    """Handles speech recognition and synthesis with Hinglish optimization.
+    
+    Recognition and synthesis engines come from the backend registry
+    (STT_BACKEND, TTS_BACKEND) unless passed in. Engine libraries and the
+    pygame audio device are only loaded when first needed, so importing
+    this module or creating a processor stays cheap.
+    """
     
     def __init__(self, language=SPEECH_RECOGNITION_LANGUAGE, 
                  tts_language=TEXT_TO_SPEECH_LANGUAGE, 
-                 tts_tld=TEXT_TO_SPEECH_TLD):
+                 tts_tld=TEXT_TO_SPEECH_TLD,
+                 tts_cache=None, stt=None, tts=None):
         self.recognizer = sr.Recognizer()
         self.speech_language = language
         self.tts_language = tts_language
         self.tts_tld = tts_tld
         self.is_listening = False
-        self.audio_file = "response.mp3"
+        self.tts_cache = tts_cache or TTSCache(TTS_CACHE_MAX_BYTES, TTS_CACHE_DIR, TTS_CACHE_MAX_DISK_BYTES)
+        self.stt = stt or create_backend("stt", STT_BACKEND, language=language)
+        self.fallback_stt = None
+        if stt is None and STT_FALLBACK_BACKEND and STT_FALLBACK_BACKEND != STT_BACKEND:
+            self.fallback_stt = create_backend("stt", STT_FALLBACK_BACKEND, language=language)
+        self.tts = tts or create_backend("tts", TTS_BACKEND, language=tts_language, tld=tts_tld)
     
-    def recognize_speech(self, timeout=5, phrase_time_limit=None, callback=None):
-        """Capture voice input and convert to text with enhanced error handling."""
+    @property
+    def player(self):
+        """The process-wide audio player, opening the audio device on first use."""
+        from audio_player import get_player
+        return get_player()
+    
+    def recognize_speech(self, timeout=5, phrase_time_limit=None, callback=None, session=None):
+        """Capture voice input and convert to text with enhanced error handling.
+        
+        With a MicrophoneSession the already-open, calibrated stream is reused;
+        otherwise a fresh microphone is opened and calibrated for this turn.
+        """
         self.is_listening = True
         text = ""
         
         try:
-            with sr.Microphone() as source:
+            if session:
                 if callback:
                     callback("Listening...")
-                
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                self.recognizer.dynamic_energy_threshold = True
-                self.recognizer.energy_threshold = 10000
-                
-                # Listen for audio input
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+                audio = session.listen(timeout=timeout, phrase_time_limit=phrase_time_limit)
+            else:
+                with sr.Microphone() as source:
+                    if callback:
+                        callback("Listening...")
+                    
+                    # Adjust for ambient noise
+                    with span("calibration"):
+                        self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                    self.recognizer.dynamic_energy_threshold = True
+                    self.recognizer.energy_threshold = 10000
+                    
+                    # Listen for audio input
+                    with span("listen"):
+                        audio = self.recognizer.listen(source, timeout=timeout,
+                                                       phrase_time_limit=phrase_time_limit)
                 
             if callback:
                 callback("Processing speech...")
-                
-            try:
-                text = self.recognizer.recognize_google(audio, language=self.speech_language)
-                if callback:
+            
+            stt_start = time.perf_counter()
+            text = self.transcribe(audio, callback)
+            
+            if session and callback and session.last_timing:
+                timing = session.last_timing
+                callback(f"Timing: waited {timing['wait'] * 1000:.0f} ms, "
+                         f"speech {timing['speech'] * 1000:.0f} ms, "
+                         f"recognition {(time.perf_counter() - stt_start) * 1000:.0f} ms")
+        except Exception as e:
+            if callback:
+                callback(f"Error: {str(e)}")
+        
+        self.is_listening = False
+        return text.lower() if text else ""
+    
+    def recognize_streaming(self, session, recognizer, on_partial=None, timeout=5,
+                            phrase_time_limit=None, callback=None):
+        """Capture one utterance, feeding a streaming recognizer frame by frame.
+        
+        Partial hypotheses go to on_partial while the caller is still
+        speaking; the final transcript is returned once the turn ends.
+        """
+        self.is_listening = True
+        text = ""
+        
+        def feed(frame):
+            partial = recognizer.accept_frame(frame)
+            if partial and on_partial:
+                on_partial(partial)
+        
+        try:
+            if callback:
+                callback("Listening...")
+            recognizer.start()
+            session.listen(timeout=timeout, phrase_time_limit=phrase_time_limit, on_frame=feed)
+            
+            finish_start = time.perf_counter()
+            with span("stt", streaming=True):
+                text = recognizer.finish()
+            if callback:
+                if text:
                     callback(f"🗣 User: {text}")
-            except sr.UnknownValueError:
-                if callback:
-                    callback("Could not understand audio")
-            except sr.RequestError:
-                try:
-                    text = self.recognizer.recognize_sphinx(audio)
-                    if callback:
-                        callback(f"User: {text} (fallback)")
-                except Exception as e:
-                    if callback:
-                        callback("Speech recognition services unavailable")
+                timing = session.last_timing
+                callback(f"Timing: waited {timing['wait'] * 1000:.0f} ms, "
+                         f"speech {timing['speech'] * 1000:.0f} ms, "
+                         f"final transcript {(time.perf_counter() - finish_start) * 1000:.0f} ms")
         except Exception as e:
             if callback:
                 callback(f"Error: {str(e)}")
@@ -81,32 +126,94 @@ class SpeechProcessor:
         self.is_listening = False
         return text.lower() if text else ""
     
+    def transcribe(self, audio, callback=None):
+        """Recognize captured audio with the STT engine, falling back to the offline one."""
+        with span("stt"):
+            return self._transcribe(audio, callback)
+    
+    def _transcribe(self, audio, callback=None):
+        text = ""
+        pcm = audio.get_raw_data(convert_width=2)
+        try:
+            text = self.stt.transcribe(pcm, audio.sample_rate)
+            if callback:
+                callback(f"🗣 User: {text}" if text else "Could not understand audio")
+        except Exception:
+            if self.fallback_stt is None:
+                if callback:
+                    callback("Speech recognition service unavailable")
+                return text
+            try:
+                text = self.fallback_stt.transcribe(pcm, audio.sample_rate)
+                if callback:
+                    callback(f"User: {text} (fallback)")
+            except Exception:
+                if callback:
+                    callback("Speech recognition services unavailable")
+        return text
+    
     def speak(self, text, callback=None):
         """Convert text to speech and play it with improved error handling."""
         if not text:
             return
             
         try:
-            cleaned_text = re.sub(r"[^\w\s.,!?-]", "", text)
             if callback:
-                callback(f"AI: {cleaned_text}")
+                callback(f"AI: {self.clean_text(text)}")
             
-            # Generate speech using gTTS
-            tts = gTTS(text=cleaned_text, lang=self.tts_language, slow=False, tld=self.tts_tld)
-            tts.save(self.audio_file)
-            
-            pygame.mixer.music.load(self.audio_file)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to finish
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-            
-            pygame.mixer.music.unload()
-            
-            if os.path.exists(self.audio_file):
-                os.remove(self.audio_file)
+            audio_file = self.synthesize(text)
+            self.play_audio(audio_file)
                 
         except Exception as e:
             if callback:
                 callback(f"Error in speech synthesis: {str(e)}")
+    
+    def clean_text(self, text):
+        """Strip characters gTTS would read out literally."""
+        return clean_tts_text(text)
+    
+    def synthesize(self, text):
+        """Synthesize text into an in-memory audio buffer, using the TTS cache.
+        
+        Clips are cached per engine voice, so switching TTS_BACKEND never
+        plays audio made by another engine.
+        """
+        cleaned_text = self.clean_text(text)
+        with span("tts") as tts_span:
+            cached = self.tts_cache.get(cleaned_text, self.tts_language, self.tts.voice)
+            tts_span.set("cached", cached is not None)
+            if cached is not None:
+                return cached
+            
+            audio = self.tts.synthesize(cleaned_text)
+            self.tts_cache.put(cleaned_text, self.tts_language, self.tts.voice, audio)
+            return io.BytesIO(audio)
+    
+    def warm_cache(self, phrases, callback=None):
+        """Synthesize fixed phrases ahead of time so calls play them from the cache."""
+        warmed = 0
+        for phrase in phrases:
+            cleaned_text = self.clean_text(phrase)
+            if self.tts_cache.contains(cleaned_text, self.tts_language, self.tts.voice):
+                continue
+            try:
+                audio = self.tts.synthesize(cleaned_text)
+                self.tts_cache.put(cleaned_text, self.tts_language, self.tts.voice, audio)
+                warmed += 1
+            except Exception as e:
+                if callback:
+                    callback(f"Could not pre-synthesize phrase: {str(e)}")
+        if callback:
+            callback(f"TTS cache warmed with {warmed} new phrases")
+    
+    def stop_audio(self):
+        """Cut off the clip that is currently playing, e.g. on barge-in."""
+        self.player.stop()
+    
+    def play_audio(self, audio):
+        """Play a synthesized clip to completion straight from memory."""
+        try:
+            with span("playback"):
+                self.player.play(audio)
+        finally:
+            audio.close()
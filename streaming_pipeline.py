@@ -0,0 +1,161 @@
+import os
+import re
+import time
+import queue
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Sentence boundaries: Latin punctuation plus the Devanagari danda
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?।])\s+")
+
+# Sentences of one reply synthesized at the same time
+TTS_SYNTHESIS_WORKERS = int(os.getenv("TTS_SYNTHESIS_WORKERS", "4"))
+
+
+def split_sentences(buffer, min_chars=20):
+    """Split complete sentences off the front of a text buffer.
+
+    Returns (sentences, remainder). Very short fragments are merged with the
+    following sentence so gTTS is not called for a single word.
+    """
+    parts = SENTENCE_BOUNDARY.split(buffer)
+    remainder = parts.pop()
+    sentences = []
+    pending = ""
+
+    for part in parts:
+        pending = f"{pending} {part}".strip() if pending else part.strip()
+        if len(pending) >= min_chars:
+            sentences.append(pending)
+            pending = ""
+
+    if pending:
+        remainder = f"{pending} {remainder}".strip()
+    return sentences, remainder
+
+
+class StreamingSpeaker:
+    """Speaks a streamed response sentence by sentence while it is generated.
+
+    The caller's thread drains the text stream and submits each sentence to
+    a pool of synthesis threads, and a playback thread plays the clips in
+    order as soon as each is ready. The first sentence is heard while later
+    ones are still being generated and synthesized, and the next clip is
+    usually ready when the previous one ends, so playback has no gaps.
+    """
+
+    def __init__(self, tts, log_callback=None, min_chars=20, synthesis_workers=TTS_SYNTHESIS_WORKERS):
+        self.tts = tts
+        self.log_callback = log_callback
+        self.min_chars = min_chars
+        self.interrupted = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=synthesis_workers, thread_name_prefix="tts")
+
+    def interrupt(self):
+        """Stop the current reply: skip queued sentences and cut off playback."""
+        self.interrupted.set()
+        stop_audio = getattr(self.tts, "stop_audio", None)
+        if stop_audio:
+            stop_audio()
+
+    def speak_stream(self, chunks):
+        """Speak a stream of text chunks and return the turn timing in seconds."""
+        start = time.perf_counter()
+        self.interrupted.clear()
+        timing = {"first_token": None, "first_audio": None, "total": None, "sentences": 0,
+                  "interrupted": False}
+        audio_queue = queue.Queue()
+
+        # Workers run in copies of this context so they trace to the caller's tracer
+        play_thread = threading.Thread(target=contextvars.copy_context().run,
+                                       args=(self._playback_worker, audio_queue, timing, start),
+                                       daemon=True)
+        play_thread.start()
+
+        buffer = ""
+        spoken = []
+        try:
+            for chunk in chunks:
+                if self.interrupted.is_set():
+                    break
+                if timing["first_token"] is None:
+                    timing["first_token"] = time.perf_counter() - start
+                buffer += chunk
+                sentences, buffer = split_sentences(buffer, self.min_chars)
+                for sentence in sentences:
+                    self._queue_sentence(sentence, audio_queue, spoken)
+
+            if buffer.strip() and not self.interrupted.is_set():
+                self._queue_sentence(buffer.strip(), audio_queue, spoken)
+        finally:
+            audio_queue.put(None)
+            play_thread.join()
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+
+        timing["sentences"] = len(spoken)
+        timing["interrupted"] = self.interrupted.is_set()
+        timing["total"] = time.perf_counter() - start
+
+        if self.log_callback:
+            self.log_callback(self.format_timing(timing))
+        return timing
+
+    def speak_text(self, text):
+        """Speak a complete reply, synthesizing its sentences in parallel."""
+        return self.speak_stream([text])
+
+    def _queue_sentence(self, sentence, audio_queue, spoken):
+        """Start synthesizing a complete sentence and queue its clip for playback in order."""
+        spoken.append(sentence)
+        audio_queue.put(self.executor.submit(contextvars.copy_context().run, self._synthesize, sentence))
+        if self.log_callback:
+            self.log_callback(f"AI: {sentence}")
+
+    def _synthesize(self, sentence):
+        if self.interrupted.is_set():
+            return None
+        return self.tts.synthesize(sentence)
+
+    def _playback_worker(self, audio_queue, timing, start):
+        """Play synthesized clips in order until the end-of-stream marker."""
+        while True:
+            clip = audio_queue.get()
+            if clip is None:
+                return
+            if self.interrupted.is_set():
+                clip.cancel()
+                continue
+            try:
+                audio = clip.result()
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"Error in speech synthesis: {str(e)}")
+                continue
+            if audio is None:
+                continue
+            if self.interrupted.is_set():
+                close = getattr(audio, "close", None)
+                if close:
+                    close()
+                continue
+            if timing["first_audio"] is None:
+                timing["first_audio"] = time.perf_counter() - start
+            try:
+                self.tts.play_audio(audio)
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"Error in audio playback: {str(e)}")
+
+    @staticmethod
+    def format_timing(timing):
+        """Format a turn's timing for the conversation log."""
+        def ms(value):
+            return "n/a" if value is None else f"{value * 1000:.0f} ms"
+        return (f"Timing: first token {ms(timing['first_token'])}, "
+                f"first audio {ms(timing['first_audio'])}, "
+                f"total {ms(timing['total'])} ({timing['sentences']} sentences"
+                f"{', interrupted' if timing.get('interrupted') else ''})")
@@ -0,0 +1,147 @@
+import re
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from context_cache import usage_tokens
+
+
+def normalize_transcript(text):
+    """Lower-case a transcript and collapse punctuation and whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+class VoskStreamingRecognizer:
+    """Offline streaming recognizer backed by a local Vosk model.
+
+    Streaming recognizers are duck-typed: call start() at the beginning of
+    an utterance, accept_frame() with each chunk of 16-bit PCM as it is
+    captured (returns the current partial hypothesis, or None if it has not
+    changed) and finish() at the end of the utterance to get the final
+    transcript.
+
+    Requires the optional `vosk` package and a downloaded model directory,
+    e.g. one of the small Indian English models.
+    """
+
+    def __init__(self, model_path, sample_rate=16000):
+        try:
+            import vosk
+        except ImportError:
+            raise RuntimeError("VoskStreamingRecognizer needs the 'vosk' package (pip install vosk)")
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+        self.sample_rate = sample_rate
+        self.recognizer = None
+        self.segments = []
+        self.last_partial = ""
+
+    def start(self):
+        self.recognizer = self.vosk.KaldiRecognizer(self.model, self.sample_rate)
+        self.segments = []
+        self.last_partial = ""
+
+    def accept_frame(self, frame):
+        if self.recognizer.AcceptWaveform(frame):
+            # Vosk closed a segment on an internal pause; keep it and carry on
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self.segments.append(text)
+            partial = ""
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+
+        hypothesis = " ".join(self.segments + ([partial] if partial else []))
+        if hypothesis and hypothesis != self.last_partial:
+            self.last_partial = hypothesis
+            return hypothesis
+        return None
+
+    def finish(self):
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        return " ".join(self.segments + ([text] if text else []))
+
+
+class SpeculativeResponder:
+    """Starts work on the agent's reply from partial transcripts.
+
+    Each new partial rebuilds the prompt speculatively and, if speculate_llm
+    is set, sends it to the model in the background. When the final
+    transcript arrives, a speculation for the same (normalized) text is used
+    directly; otherwise it is discarded and the reply is generated normally.
+    A model request that has already started cannot be aborted, so a
+    discarded speculation only costs tokens, never latency.
+    """
+
+    def __init__(self, agent, speculate_llm=True, min_words=2, max_workers=2, log_callback=None):
+        self.agent = agent
+        self.speculate_llm = speculate_llm
+        self.min_words = min_words
+        self.log_callback = log_callback
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculate")
+        self.lock = threading.Lock()
+        self.current = None
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+
+    def on_partial(self, partial):
+        """Speculate on a partial hypothesis."""
+        text = normalize_transcript(partial)
+        if len(text.split()) < self.min_words:
+            return
+        with self.lock:
+            if self.current and self.current["text"] == text:
+                return
+            self._cancel_current()
+            speculation = {"text": text, "prompt": self.agent.preview_prompt(text), "future": None}
+            if self.speculate_llm:
+                speculation["future"] = self.executor.submit(self._generate, speculation["prompt"])
+            self.current = speculation
+
+    def _generate(self, prompt):
+        start = time.perf_counter()
+        response = self.agent.request(prompt)
+        return (self.agent.clean_response(response.text), time.perf_counter() - start,
+                usage_tokens(response))
+
+    def _cancel_current(self):
+        if self.current and self.current["future"]:
+            self.current["future"].cancel()
+        self.current = None
+
+    def on_final(self, transcript):
+        """Return the agent's reply to the final transcript, reusing speculation if it matches."""
+        text = normalize_transcript(transcript)
+        with self.lock:
+            speculation, self.current = self.current, None
+
+        if speculation and speculation["text"] == text and speculation["future"]:
+            try:
+                waited_from = time.perf_counter()
+                ai_response, generation_time, tokens = speculation["future"].result()
+                if ai_response:
+                    self.hits += 1
+                    self.time_saved += max(0.0, generation_time - (time.perf_counter() - waited_from))
+                    self.agent.record_exchange(text, ai_response, tokens)
+                    return ai_response
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"Speculative response failed: {str(e)}")
+        elif speculation and speculation["future"]:
+            speculation["future"].cancel()
+
+        self.misses += 1
+        # A matching partial still saves rebuilding the prompt
+        prompt = speculation["prompt"] if speculation and speculation["text"] == text else None
+        return self.agent.generate_response(text, prompt=prompt)
+
+    def stats(self):
+        """Return speculation hit/miss counts and total model time saved."""
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "time_saved": self.time_saved}
+
+    def close(self):
+        self.executor.shutdown(wait=False)
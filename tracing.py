@@ -0,0 +1,241 @@
+"""Per-turn latency spans, trace export and a latency breakdown report.
+
+    python tracing.py report logs/
+    python tracing.py export logs/ -o trace.json    # open in chrome://tracing or Perfetto
+"""
+import os
+import json
+import glob
+import time
+import argparse
+import threading
+import contextvars
+from log_writer import iter_log_records
+from metrics import latency_summary, format_latency_summary
+
+TRACING = os.getenv("TRACING", "false").lower() == "true"
+
+# Stages of a turn, in pipeline order, for the report
+STAGES = ("calibration", "listen", "stt", "prompt_build", "llm", "tts", "playback")
+
+
+class Span:
+    """One timed stage: monotonic start and end plus free-form attributes."""
+
+    __slots__ = ("name", "start", "end", "attrs")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+        self.end = None
+
+    def set(self, key, value):
+        self.attrs[key] = value
+
+    def to_dict(self):
+        span = {"name": self.name, "start": self.start, "end": self.end}
+        if self.attrs:
+            span["attrs"] = self.attrs
+        return span
+
+
+class _SpanContext:
+    __slots__ = ("tracer", "span")
+
+    def __init__(self, tracer, span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self):
+        self.span.start = time.monotonic()
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.span.end = time.monotonic()
+        if exc_type is not None:
+            self.span.attrs["error"] = exc_type.__name__
+        self.tracer._record(self.span)
+        return False
+
+
+class Tracer:
+    """Collects the spans of one call until they are taken for the current turn.
+
+    Spans may be recorded from any thread. wall_start and mono_start anchor
+    the monotonic timestamps to wall-clock time for export.
+    """
+
+    enabled = True
+
+    def __init__(self, call_id=None):
+        self.call_id = call_id
+        self.wall_start = time.time()
+        self.mono_start = time.monotonic()
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def span(self, name, **attrs):
+        """Context manager timing one stage; yields the Span for extra attributes."""
+        return _SpanContext(self, Span(name, attrs))
+
+    def _record(self, span):
+        with self.lock:
+            self.pending.append(span.to_dict())
+
+    def take(self):
+        """Return and clear the spans recorded since the last call."""
+        with self.lock:
+            spans, self.pending = self.pending, []
+        return spans
+
+    @property
+    def clock_offset(self):
+        """Add to a monotonic timestamp to get wall-clock time."""
+        return self.wall_start - self.mono_start
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, key, value):
+        pass
+
+
+class _NullTracer:
+    """Tracer used when tracing is off: span() returns one shared no-op object."""
+
+    enabled = False
+    call_id = None
+    clock_offset = 0.0
+    _span = _NullSpan()
+
+    def span(self, name, **attrs):
+        return self._span
+
+    def take(self):
+        return []
+
+
+NULL_TRACER = _NullTracer()
+
+_current = contextvars.ContextVar("tracer", default=None)
+_default_tracer = NULL_TRACER
+
+
+def new_tracer(call_id=None):
+    """A Tracer for a new call, or the shared no-op tracer when TRACING is off."""
+    return Tracer(call_id) if TRACING else NULL_TRACER
+
+
+def activate(tracer):
+    """Make tracer current for this thread or asyncio task (and contexts copied from it)."""
+    _current.set(tracer)
+
+
+def set_default_tracer(tracer):
+    """Tracer used by threads with no active tracer, e.g. the GUI's single call."""
+    global _default_tracer
+    _default_tracer = tracer or NULL_TRACER
+
+
+def current_tracer():
+    return _current.get() or _default_tracer
+
+
+def span(name, **attrs):
+    """Time a stage on the current tracer."""
+    return current_tracer().span(name, **attrs)
+
+
+def iter_traced_turns(paths):
+    """Yield (call_id, spans, clock_offset) for every traced turn in JSON logs and JSONL segments."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "conversation_*.json"))))
+            files.extend(sorted(glob.glob(os.path.join(path, "conversations-*.jsonl*"))))
+        else:
+            files.append(path)
+    for path in files:
+        if path.endswith(".json"):
+            with open(path, 'r', encoding='utf-8') as f:
+                log = json.load(f)
+            call_id = log.get("call_id") or os.path.basename(path)
+            for turn in log.get("turns", []):
+                if turn.get("spans"):
+                    yield call_id, turn["spans"], turn.get("clock_offset", 0.0)
+        else:
+            for record in iter_log_records(path):
+                if record.get("type") == "spans":
+                    yield record["call_id"], record["spans"], record.get("clock_offset", 0.0)
+
+
+def latency_breakdown(turns):
+    """Per-stage durations (seconds) and per-turn totals from traced turns."""
+    stages = {}
+    totals = []
+    calls = set()
+    for call_id, spans, _ in turns:
+        calls.add(call_id)
+        for s in spans:
+            stages.setdefault(s["name"], []).append(s["end"] - s["start"])
+        totals.append(max(s["end"] for s in spans) - min(s["start"] for s in spans))
+    return {"calls": len(calls), "turns": len(totals), "stages": stages, "turn_total": totals}
+
+
+def format_breakdown(breakdown):
+    lines = [f"{breakdown['calls']} calls, {breakdown['turns']} traced turns"]
+    stages = breakdown["stages"]
+    overall = sum(sum(values) for values in stages.values()) or 1.0
+    ordered = [name for name in STAGES if name in stages] + sorted(set(stages) - set(STAGES))
+    for name in ordered:
+        values = stages[name]
+        lines.append(f"{name:<13} {sum(values) / overall:>4.0%}  "
+                     f"{format_latency_summary(latency_summary(values))}")
+    lines.append(f"{'turn total':<13}       {format_latency_summary(latency_summary(breakdown['turn_total']))}")
+    return "\n".join(lines)
+
+
+def chrome_trace(turns):
+    """Convert traced turns to Chrome trace-event JSON on a wall-clock axis, one row per call."""
+    events = []
+    rows = {}
+    for call_id, spans, clock_offset in turns:
+        tid = rows.setdefault(call_id, len(rows) + 1)
+        for s in spans:
+            events.append({"name": s["name"], "ph": "X", "pid": 1, "tid": tid,
+                           "ts": (s["start"] + clock_offset) * 1e6, "dur": (s["end"] - s["start"]) * 1e6,
+                           "args": s.get("attrs", {})})
+    events.extend({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": call_id}}
+                  for call_id, tid in rows.items())
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn latency traces from conversation logs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="print the per-stage latency breakdown")
+    report.add_argument("paths", nargs="*", default=["logs"])
+    export = commands.add_parser("export", help="write a Chrome trace-event file")
+    export.add_argument("paths", nargs="*", default=["logs"])
+    export.add_argument("-o", "--output", default="trace.json")
+    args = parser.parse_args()
+
+    if args.command == "report":
+        print(format_breakdown(latency_breakdown(iter_traced_turns(args.paths))))
+    else:
+        trace = chrome_trace(iter_traced_turns(args.paths))
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        print(f"Wrote {len(trace['traceEvents'])} events to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import io
+import os
+import re
+import mmap
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def clean_tts_text(text):
+    """Strip characters gTTS would read out literally; cache keys use the cleaned text."""
+    return re.sub(r"[^\w\s.,!?-]", "", text)
+
+
+def audio_extension(data):
+    """File extension for a clip: ".wav" for RIFF/WAVE data (pyttsx3, offline engines), else ".mp3"."""
+    return ".wav" if data[:4] == b"RIFF" and data[8:12] == b"WAVE" else ".mp3"
+
+
+class TTSCache:
+    """Content-addressed cache of synthesized speech keyed on (text, lang, tld).
+
+    Recently used clips are kept in memory under a byte budget with LRU
+    eviction. If a cache directory is given, clips are also written there
+    under their content hash (with a .mp3 or .wav extension matching the
+    data) and served through mmap when they are not in memory, so they
+    survive restarts without another synthesis round trip. The directory
+    has its own byte budget, max_disk_bytes: least recently used files are
+    deleted past it. File modification times carry the LRU order across
+    restarts.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, cache_dir=None, max_disk_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        # key -> (file name, size), least recently used first
+        self.files = OrderedDict()
+        self.disk_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.lock = threading.Lock()
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._scan_disk()
+
+    def _scan_disk(self):
+        """Index the clips already in the cache directory, oldest first, and trim it to the budget."""
+        found = []
+        for entry in os.scandir(self.cache_dir):
+            key, ext = os.path.splitext(entry.name)
+            if ext in (".mp3", ".wav") and entry.is_file():
+                stat = entry.stat()
+                found.append((stat.st_mtime, key, entry.name, stat.st_size))
+        for _, key, name, size in sorted(found):
+            self.files[key] = (name, size)
+            self.disk_bytes += size
+        with self.lock:
+            doomed = self._evict_disk()
+        self._remove_files(doomed)
+
+    @staticmethod
+    def make_key(text, lang, tld):
+        """Return the content hash identifying a clip."""
+        return hashlib.sha256(f"{lang}\0{tld}\0{text}".encode("utf-8")).hexdigest()
+
+    def _evict_disk(self):
+        """Drop least recently used files from the index past the disk budget; returns their names."""
+        doomed = []
+        while self.disk_bytes > self.max_disk_bytes and self.files:
+            _, (name, size) = self.files.popitem(last=False)
+            self.disk_bytes -= size
+            self.disk_evictions += 1
+            doomed.append(name)
+        return doomed
+
+    def _remove_files(self, names):
+        for name in names:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def get(self, text, lang, tld):
+        """Return a readable file object for a cached clip, or None on a miss."""
+        key = self.make_key(text, lang, tld)
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+                self.memory_hits += 1
+                return io.BytesIO(data)
+
+        with self.lock:
+            file = self.files.get(key)
+            if file is not None:
+                self.files.move_to_end(key)
+        if file is not None:
+            path = os.path.join(self.cache_dir, file[0])
+            try:
+                with open(path, "rb") as f:
+                    audio = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                # Keep the LRU order for the next start
+                os.utime(path)
+                with self.lock:
+                    self.disk_hits += 1
+                return audio
+            except (OSError, ValueError):
+                # Deleted by another process sharing the directory
+                with self.lock:
+                    if self.files.get(key) == file:
+                        del self.files[key]
+                        self.disk_bytes -= file[1]
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def contains(self, text, lang, tld):
+        """Check for a clip without touching LRU order or the counters."""
+        key = self.make_key(text, lang, tld)
+        with self.lock:
+            return key in self.entries or key in self.files
+
+    def put(self, text, lang, tld, data):
+        """Store a synthesized clip, evicting least recently used clips if needed."""
+        key = self.make_key(text, lang, tld)
+        data = bytes(data)
+
+        if self.cache_dir and key not in self.files and len(data) <= self.max_disk_bytes:
+            name = key + audio_extension(data)
+            path = os.path.join(self.cache_dir, name)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            with self.lock:
+                if key not in self.files:
+                    self.files[key] = (name, len(data))
+                    self.disk_bytes += len(data)
+                doomed = self._evict_disk()
+            self._remove_files(doomed)
+
+        if len(data) > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= len(self.entries.pop(key))
+            self.entries[key] = data
+            self.current_bytes += len(data)
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss counters and current memory usage."""
+        with self.lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "disk_evictions": self.disk_evictions,
+                "disk_entries": len(self.files),
+                "disk_bytes": self.disk_bytes
+            }
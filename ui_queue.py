@@ -0,0 +1,128 @@
+import os
+import time
+import queue
+import collections
+import tkinter as tk
+
+
+# Milliseconds between drains of queued UI updates on the Tk main loop
+UI_FLUSH_INTERVAL_MS = int(os.getenv("UI_FLUSH_INTERVAL_MS", "50"))
+# Conversation log lines kept in the widget; older lines are dropped
+UI_MAX_LOG_LINES = int(os.getenv("UI_MAX_LOG_LINES", "1000"))
+
+
+class UIQueue:
+    """Thread-safe queue of UI updates applied by the Tk main loop in batches.
+
+    log() and call() only enqueue, so worker threads never wait for the UI
+    and never touch a widget. Every interval_ms the main loop drains up to
+    max_batch queued updates in order. Consecutive log lines are written
+    with one insert, one scroll and one state toggle, and the log widget is
+    trimmed to max_log_lines. A batch holding more lines than fit skips the
+    older ones without inserting them. A queued call that raises is logged
+    to the widget and the rest of the batch is still applied.
+    """
+
+    def __init__(self, root, log_widget, interval_ms=UI_FLUSH_INTERVAL_MS, max_log_lines=UI_MAX_LOG_LINES,
+                 max_batch=10000):
+        self.root = root
+        self.log_widget = log_widget
+        self.interval_ms = interval_ms
+        self.max_log_lines = max_log_lines
+        self.max_batch = max_batch
+        self.queue = queue.SimpleQueue()
+        self.timer = None
+        self.lines_logged = 0
+        self.lines_skipped = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.drain_time = 0.0
+        self.errors = 0
+
+    def log(self, message):
+        """Queue a line for the log widget; safe from any thread."""
+        self.queue.put(str(message))
+
+    def call(self, function, *args, **kwargs):
+        """Queue function(*args, **kwargs) to run on the Tk main loop; safe from any thread."""
+        self.queue.put((function, args, kwargs))
+
+    def start(self):
+        """Start draining on the Tk main loop; call from the main thread."""
+        if self.timer is None:
+            self.timer = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self.timer is not None:
+            self.root.after_cancel(self.timer)
+            self.timer = None
+
+    def _tick(self):
+        try:
+            self.drain()
+        finally:
+            self.timer = self.root.after(self.interval_ms, self._tick)
+
+    def drain(self):
+        """Apply up to max_batch queued updates in order; returns how many were applied."""
+        start = time.perf_counter()
+        lines = collections.deque(maxlen=self.max_log_lines)
+        pending = 0
+        count = 0
+        while count < self.max_batch:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            count += 1
+            if isinstance(item, str):
+                lines.append(item)
+                pending += 1
+                continue
+            # Keep calls ordered with the lines queued around them, e.g. clearing the log
+            self._write_lines(lines, pending)
+            lines.clear()
+            pending = 0
+            function, args, kwargs = item
+            try:
+                function(*args, **kwargs)
+            except Exception as e:
+                # One failed update must not drop the rest of the batch
+                self.errors += 1
+                lines.append(f"UI update {getattr(function, '__name__', function)} failed: {str(e)}")
+                pending += 1
+        self._write_lines(lines, pending)
+        if count:
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, count)
+            self.drain_time += time.perf_counter() - start
+        return count
+
+    def _write_lines(self, lines, pending):
+        if not pending:
+            return
+        self.lines_logged += pending
+        self.lines_skipped += pending - len(lines)
+        widget = self.log_widget
+        widget.config(state=tk.NORMAL)
+        widget.insert(tk.END, "\n".join(lines) + "\n")
+        excess = int(widget.index("end-1c").split(".")[0]) - 1 - self.max_log_lines
+        if excess > 0:
+            widget.delete("1.0", f"{excess + 1}.0")
+        widget.see(tk.END)
+        widget.config(state=tk.DISABLED)
+
+    def clear_log(self):
+        """Queue clearing the log widget; safe from any thread."""
+        self.call(self._clear_log)
+
+    def _clear_log(self):
+        self.log_widget.config(state=tk.NORMAL)
+        self.log_widget.delete("1.0", tk.END)
+        self.log_widget.config(state=tk.DISABLED)
+
+    def stats(self):
+        return {"lines_logged": self.lines_logged, "lines_skipped": self.lines_skipped,
+                "batches": self.batches, "largest_batch": self.largest_batch,
+                "drain_ms": self.drain_time / self.batches * 1000 if self.batches else 0.0,
+                "errors": self.errors, "backlog": self.queue.qsize()}
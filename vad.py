@@ -0,0 +1,87 @@
+SPEECH_START = "start"
+SPEECH_END = "end"
+
+
+class EnergyVAD:
+    """Frame-level voice activity detector based on energy above a noise floor.
+
+    The noise floor is set by calibration and then follows the energy of
+    frames classified as silence, so the detector adapts to a changing
+    background without a separate calibration step.
+    """
+
+    def __init__(self, threshold_ratio=3.0, min_energy_threshold=300, adapt_rate=0.05):
+        self.threshold_ratio = threshold_ratio
+        self.min_energy_threshold = min_energy_threshold
+        self.adapt_rate = adapt_rate
+        self.noise_floor = 0.0
+
+    @property
+    def threshold(self):
+        """Energy above which a frame counts as speech."""
+        return max(self.noise_floor * self.threshold_ratio, self.min_energy_threshold)
+
+    def calibrate(self, energies):
+        """Set the noise floor from the energies of known-silent frames."""
+        energies = list(energies)
+        self.noise_floor = sum(energies) / len(energies) if energies else 0.0
+
+    def is_speech(self, energy, scale=1.0):
+        """Classify one frame; scale raises the bar, e.g. for barge-in over playback."""
+        return energy > self.threshold * scale
+
+    def adapt(self, energy):
+        """Fold a silent frame's energy into the noise floor."""
+        self.noise_floor += self.adapt_rate * (energy - self.noise_floor)
+
+
+class Endpointer:
+    """Turns per-frame VAD decisions into utterance start and end events.
+
+    Speech starts after start_seconds of consecutive voiced frames, which
+    ignores clicks and pops, and ends as soon as end_silence_seconds of
+    trailing silence has been seen.
+    """
+
+    def __init__(self, vad, frame_seconds, start_seconds=0.06, end_silence_seconds=0.5,
+                 threshold_scale=1.0, adapt=True):
+        self.vad = vad
+        self.frame_seconds = frame_seconds
+        self.start_frames = max(1, round(start_seconds / frame_seconds))
+        self.end_frames = max(1, round(end_silence_seconds / frame_seconds))
+        self.threshold_scale = threshold_scale
+        self.adapt = adapt
+        self.reset()
+
+    def reset(self, in_speech=False):
+        """Start looking for a new utterance (or continue one already started)."""
+        self.in_speech = in_speech
+        self.voiced_run = 0
+        self.silence_run = 0
+
+    def process(self, energy):
+        """Feed one frame's energy; return SPEECH_START, SPEECH_END or None."""
+        voiced = self.vad.is_speech(energy, self.threshold_scale)
+
+        if not self.in_speech:
+            if voiced:
+                self.voiced_run += 1
+                if self.voiced_run >= self.start_frames:
+                    self.in_speech = True
+                    self.silence_run = 0
+                    return SPEECH_START
+            else:
+                self.voiced_run = 0
+                if self.adapt:
+                    self.vad.adapt(energy)
+            return None
+
+        if voiced:
+            self.silence_run = 0
+            return None
+        self.silence_run += 1
+        if self.silence_run >= self.end_frames:
+            self.in_speech = False
+            self.voiced_run = 0
+            return SPEECH_END
+        return None
@@ -0,0 +1,356 @@
+import os
+import time
+import zlib
+import asyncio
+import threading
+import collections
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from concurrent.futures import Future, ThreadPoolExecutor
+from call_engine import CallSession
+from log_writer import get_log_writer
+from metrics import latency_summary
+
+
+# Worker processes for sharded calls; defaults to one per CPU core
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 1)))
+# Calls a worker runs at once; the rest of its shard waits in the supervisor
+WORKER_MAX_CALLS = int(os.getenv("WORKER_MAX_CALLS", "32"))
+
+
+def pack_audio(clips):
+    """Copy clips into a new shared memory block; returns a picklable reference (name, sizes).
+
+    The block stays allocated until free_audio() is called on the reference.
+    """
+    sizes = [len(clip) for clip in clips]
+    block = shared_memory.SharedMemory(create=True, size=max(1, sum(sizes)))
+    offset = 0
+    for clip in clips:
+        block.buf[offset:offset + len(clip)] = clip
+        offset += len(clip)
+    name = block.name
+    block.close()
+    return name, sizes
+
+
+def read_audio(ref, free=False):
+    """Return the clips in a shared memory block, freeing it afterwards if asked."""
+    name, sizes = ref
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        clips = []
+        offset = 0
+        for size in sizes:
+            clips.append(bytes(block.buf[offset:offset + size]))
+            offset += size
+    finally:
+        block.close()
+        if free:
+            block.unlink()
+    return clips
+
+
+def free_audio(ref):
+    try:
+        block = shared_memory.SharedMemory(name=ref[0])
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+class ClipInput:
+    """Audio input of a sharded call: the caller's utterances, in order, then a hang-up."""
+
+    def __init__(self, clips):
+        self.clips = collections.deque(clips)
+
+    async def read_utterance(self):
+        return self.clips.popleft() if self.clips else None
+
+
+class ClipOutput:
+    """Audio output of a sharded call: keeps the agent's clips to send back to the supervisor."""
+
+    def __init__(self):
+        self.clips = []
+
+    async def play(self, audio):
+        self.clips.append(audio if isinstance(audio, bytes) else str(audio).encode("utf-8"))
+
+
+class PipeLogWriter:
+    """Log writer of a worker process: sends every record to the supervisor as it is written.
+
+    Sending is synchronous, so a record has left the worker by the time
+    write() returns and survives the worker crashing.
+    """
+
+    def __init__(self, connection, lock, directory):
+        self.connection = connection
+        self.lock = lock
+        self.directory = directory
+
+    def write(self, record):
+        with self.lock:
+            self.connection.send(("log", record))
+
+
+def worker_main(index, setup, jobs, results, log_directory):
+    """Entry point of a worker process: run calls from `jobs` on a CallEngine until told to stop.
+
+    setup() is called once in the worker and returns (engine, make_agent);
+    make_agent(scenario, record, log_writer) creates the agent of one call.
+    """
+    engine, make_agent = setup()
+    lock = threading.Lock()
+    writer = PipeLogWriter(results, lock, log_directory)
+    try:
+        asyncio.run(_serve(index, engine, make_agent, writer, jobs, results, lock))
+    finally:
+        engine.close()
+
+
+async def _serve(index, engine, make_agent, writer, jobs, results, lock):
+    loop = asyncio.get_running_loop()
+    reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jobs")
+    calls = set()
+    while True:
+        job = await loop.run_in_executor(reader, jobs.recv)
+        if job is None:
+            break
+        call = asyncio.create_task(_run_job(index, engine, make_agent, writer, job, results, lock))
+        calls.add(call)
+        call.add_done_callback(calls.discard)
+    if calls:
+        await asyncio.gather(*calls)
+    reader.shutdown(wait=False)
+
+
+async def _run_job(index, engine, make_agent, writer, job, results, lock):
+    output = ClipOutput()
+    result = {"call_id": job["call_id"], "worker": index, "pid": os.getpid()}
+    try:
+        agent = make_agent(job["scenario"], job["record"], writer)
+        session = CallSession(job["call_id"], agent, ClipInput(read_audio(job["audio"])), output,
+                              opening=job["opening"], max_turns=job["max_turns"])
+        await engine.run_call(session)
+        if session.log_saved:
+            # The call's end record goes down the pipe before its result
+            await asyncio.wrap_future(session.log_saved)
+        result.update(outcome=session.outcome, turn_latencies=session.turn_latencies,
+                      log_call_id=agent.logger.call_id)
+    except Exception as e:
+        result.update(outcome="error", error=str(e), turn_latencies=[])
+    result["reply_audio"] = pack_audio(output.clips)
+    result["cpu"] = time.process_time()
+    with lock:
+        results.send(("done", result))
+
+
+class CallSupervisor:
+    """Shards calls across worker processes by call ID.
+
+    Each worker is a separate process with its own GIL, CallEngine and
+    agents, so CPU-bound speech decoding and encoding, prompt building
+    and log processing use every core. A call always goes to worker
+    crc32(call_id) % workers; each worker runs up to max_calls_per_worker
+    calls at once and the rest of its shard waits here.
+
+    Caller audio is known up front (recorded or scripted calls): the clips
+    go to the worker in a shared memory block, and the agent's reply clips
+    come back the same way, so only small references cross the pipes.
+    Workers send log records here as they are written and the supervisor
+    writes them to its LogWriter. A worker that dies is restarted, its
+    unfinished calls get an end record with outcome "worker_crashed", and
+    the calls are run again up to max_retries times.
+
+    setup must be picklable (a module-level function or a partial of one);
+    see worker_main.
+    """
+
+    def __init__(self, setup, workers=WORKER_PROCESSES, max_calls_per_worker=WORKER_MAX_CALLS, max_retries=1,
+                 log_writer=None, log_callback=None):
+        self.setup = setup
+        self.workers = workers
+        self.max_calls_per_worker = max_calls_per_worker
+        self.max_retries = max_retries
+        self.log_writer = log_writer or get_log_writer()
+        self.log_callback = log_callback
+        self.context = multiprocessing.get_context("spawn")
+        self.lock = threading.Lock()
+        self.processes = [None] * workers
+        self.jobs = [None] * workers
+        self.results = [None] * workers
+        self.backlog = [collections.deque() for _ in range(workers)]
+        self.in_flight = [{} for _ in range(workers)]
+        self.open_logs = [set() for _ in range(workers)]
+        self.cpu = [0.0] * workers
+        self.cpu_lost = 0.0
+        self.worker_calls = [0] * workers
+        self.turn_latencies = []
+        self.outcomes = collections.Counter()
+        self.restarts = 0
+        self.retries = 0
+        self.log_records = 0
+        self.closing = False
+        self.monitor = None
+
+    def start(self):
+        for index in range(self.workers):
+            self._spawn(index)
+        self.monitor = threading.Thread(target=self._monitor, name="call-supervisor", daemon=True)
+        self.monitor.start()
+
+    def _spawn(self, index):
+        jobs_reader, jobs_writer = self.context.Pipe(duplex=False)
+        results_reader, results_writer = self.context.Pipe(duplex=False)
+        process = self.context.Process(target=worker_main, name=f"call-worker-{index}", daemon=True,
+                                       args=(index, self.setup, jobs_reader, results_writer,
+                                             self.log_writer.directory))
+        process.start()
+        # The worker holds its own ends of the pipes
+        jobs_reader.close()
+        results_writer.close()
+        self.processes[index] = process
+        self.jobs[index] = jobs_writer
+        self.results[index] = results_reader
+
+    def shard(self, call_id):
+        return zlib.crc32(str(call_id).encode("utf-8")) % self.workers
+
+    def submit(self, call_id, scenario, utterances, record=None, opening=None, max_turns=20):
+        """Queue a call whose caller says the utterances (audio bytes) in order; returns a Future.
+
+        The future's result is a dict with the call's outcome, worker,
+        turn_latencies, log_call_id and reply_audio (the agent's clips).
+        """
+        job = {"call_id": call_id, "scenario": scenario, "record": record, "opening": opening,
+               "max_turns": max_turns, "audio": pack_audio(utterances)}
+        future = Future()
+        index = self.shard(call_id)
+        with self.lock:
+            self.backlog[index].append((job, future, 0))
+            self._dispatch(index)
+        return future
+
+    def run(self, calls):
+        """Submit calls given as dicts of submit() arguments and return their results in order."""
+        futures = [self.submit(**call) for call in calls]
+        return [future.result() for future in futures]
+
+    def _dispatch(self, index):
+        in_flight = self.in_flight[index]
+        backlog = self.backlog[index]
+        while backlog and len(in_flight) < self.max_calls_per_worker:
+            job, future, attempts = backlog.popleft()
+            in_flight[job["call_id"]] = (job, future, attempts)
+            self.jobs[index].send(job)
+
+    def _monitor(self):
+        while True:
+            with self.lock:
+                if self.closing and not any(process.is_alive() for process in self.processes):
+                    break
+                waitables = {}
+                for index in range(self.workers):
+                    if self.closing and not self.processes[index].is_alive():
+                        continue
+                    waitables[self.results[index]] = index
+                    waitables[self.processes[index].sentinel] = index
+            for ready in wait(list(waitables), timeout=0.5):
+                index = waitables[ready]
+                if ready is self.results[index]:
+                    self._receive(index)
+                elif not self.closing:
+                    self._restart(index)
+
+    def _receive(self, index):
+        try:
+            while self.results[index].poll():
+                kind, payload = self.results[index].recv()
+                if kind == "log":
+                    self._log(index, payload)
+                else:
+                    self._finish(index, payload)
+        except (EOFError, OSError):
+            # The worker is gone; its sentinel triggers the restart
+            pass
+
+    def _log(self, index, record):
+        self.log_writer.write(record)
+        self.log_records += 1
+        if record.get("type") == "start":
+            self.open_logs[index].add(record["call_id"])
+        elif record.get("type") == "end":
+            self.open_logs[index].discard(record["call_id"])
+
+    def _finish(self, index, result):
+        result["reply_audio"] = read_audio(result["reply_audio"], free=True)
+        with self.lock:
+            job, future, _ = self.in_flight[index].pop(result["call_id"])
+            self.cpu[index] = result.pop("cpu")
+            self.worker_calls[index] += 1
+            self.outcomes[result["outcome"]] += 1
+            self.turn_latencies.extend(result["turn_latencies"])
+            self._dispatch(index)
+        free_audio(job["audio"])
+        future.set_result(result)
+
+    def _restart(self, index):
+        process = self.processes[index]
+        process.join()
+        # Records sent before the crash are still in the pipe
+        self._receive(index)
+        if self.log_callback:
+            self.log_callback(f"Worker {index} exited with code {process.exitcode}, restarting")
+        for call_id in self.open_logs[index]:
+            self.log_writer.write({"type": "end", "call_id": call_id, "timestamp": time.time(),
+                                   "metadata": {"outcome": "worker_crashed"}})
+        self.open_logs[index].clear()
+        with self.lock:
+            self.restarts += 1
+            self.cpu_lost += self.cpu[index]
+            self.cpu[index] = 0.0
+            self.jobs[index].close()
+            self.results[index].close()
+            crashed = list(self.in_flight[index].values())
+            self.in_flight[index].clear()
+            for job, future, attempts in reversed(crashed):
+                if attempts < self.max_retries:
+                    self.retries += 1
+                    self.backlog[index].appendleft((job, future, attempts + 1))
+                else:
+                    self.outcomes["worker_crashed"] += 1
+                    free_audio(job["audio"])
+                    future.set_result({"call_id": job["call_id"], "worker": index, "outcome": "worker_crashed",
+                                       "turn_latencies": [], "reply_audio": []})
+            self._spawn(index)
+            self._dispatch(index)
+
+    def stats(self):
+        """Metrics aggregated over every worker, including ones that were restarted."""
+        with self.lock:
+            return {"workers": self.workers, "calls": sum(self.worker_calls),
+                    "worker_calls": list(self.worker_calls), "outcomes": dict(self.outcomes),
+                    "turn_latency": latency_summary(self.turn_latencies),
+                    "cpu_seconds": sum(self.cpu) + self.cpu_lost, "restarts": self.restarts,
+                    "retries": self.retries, "log_records": self.log_records,
+                    "queued": sum(len(backlog) for backlog in self.backlog),
+                    "in_flight": sum(len(calls) for calls in self.in_flight)}
+
+    def close(self):
+        """Stop the workers once their calls are done; call it after the submitted calls have finished."""
+        with self.lock:
+            self.closing = True
+            for jobs in self.jobs:
+                try:
+                    jobs.send(None)
+                except OSError:
+                    pass
+        if self.monitor:
+            self.monitor.join()
+        for process in self.processes:
+            process.join()